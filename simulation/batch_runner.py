@@ -0,0 +1,188 @@
+################################################################################################################################
+# *** Copyright Notice ***
+#
+# "Price Based Local Power Distribution Management System (Local Power Distribution Manager) v1.0"
+# Copyright (c) 2016, The Regents of the University of California, through Lawrence Berkeley National Laboratory
+# (subject to receipt of any required approvals from the U.S. Dept. of Energy).  All rights reserved.
+#
+# If you have questions about your rights to use or distribute this software, please contact
+# Berkeley Lab's Innovation & Partnerships Office at  IPO@lbl.gov.
+################################################################################################################################
+
+"""
+Run a batch of scenarios in parallel, each in its own process.
+
+Usage (from the simulation folder):
+    python batch_runner.py [-j processes] [--memory-limit MB] [--index FILE] [scenario files...]
+
+Without any scenario files all of the files in the scenarios folder are run.
+When a run finishes a line is added to the index (logs/index.jsonl by default) with the scenario,
+the run id, the log folder and whether it finished without errors.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import datetime
+import traceback
+import multiprocessing
+from shutil import copyfile
+
+def run_scenario(conn, file_path, memory_limit_mb=None, console_log_level=None, log_path=None):
+    """Run a scenario in a worker process, report the run id and the result through conn"""
+    result = {"status": "failed", "run_id": None, "log_path": None, "error": None}
+    try:
+        if memory_limit_mb:
+            import resource
+            limit = int(memory_limit_mb * 1024 * 1024)
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+        from simulation import Simulation
+        sim = Simulation()
+        sim.load_config(file_path)
+        if not console_log_level is None:
+            sim.config["console_log_level"] = console_log_level
+        if not log_path is None:
+            sim.config["log_path"] = log_path
+        sim.init_logger()
+        result["run_id"] = sim.log_manager.log_id
+        result["log_path"] = sim.log_manager.simulation_log_path()
+        conn.send(("started", result))
+
+        results = sim.run()
+        # copy the config file to the log file path
+        copyfile(file_path, os.path.join(result["log_path"], os.path.basename(file_path)))
+        failed = [name for name, ok in results if not ok]
+        if len(failed):
+            result["error"] = "errors in {}".format(", ".join(failed))
+        else:
+            result["status"] = "ok"
+    except BaseException as e:
+        result["error"] = "".join(traceback.format_exception(*sys.exc_info()))
+    conn.send(("finished", result))
+    conn.close()
+
+class BatchRunner(object):
+    """
+    Runs scenario files in separate processes, at most `processes` at a time.
+    A scenario that fails or crashes its process is recorded as failed and the rest of the batch keeps running.
+    """
+    def __init__(self, scenario_files, processes=None, memory_limit_mb=None, index_file=None,
+            console_log_level=None, log_path=None, poll_interval=0.1):
+        self.scenario_files = scenario_files
+        self.processes = processes if processes else multiprocessing.cpu_count()
+        self.memory_limit_mb = memory_limit_mb
+        self.log_path = log_path
+        self.index_file = index_file if index_file else os.path.join(log_path if log_path else "logs", "index.jsonl")
+        self.console_log_level = console_log_level
+        self.poll_interval = poll_interval
+
+    def report(self, message):
+        """Print a progress message"""
+        print message
+        sys.stdout.flush()
+
+    def start(self, file_path):
+        """Start the process for a scenario"""
+        parent_conn, child_conn = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(
+            target=run_scenario,
+            args=(child_conn, file_path, self.memory_limit_mb, self.console_log_level, self.log_path)
+        )
+        process.start()
+        child_conn.close()
+        return {
+            "scenario": file_path,
+            "process": process,
+            "conn": parent_conn,
+            "started": time.time(),
+            "result": {"status": "failed", "run_id": None, "log_path": None, "error": None}
+        }
+
+    def read_messages(self, run):
+        """Read the messages sent by a run's process"""
+        try:
+            while run["conn"].poll():
+                status, result = run["conn"].recv()
+                run["result"] = result
+                if status == "started":
+                    self.report("started {} (run {}, {})".format(run["scenario"], result["run_id"], result["log_path"]))
+        except (EOFError, IOError):
+            pass
+
+    def finish(self, run, n_finished):
+        """Record a finished run in the index, returns the index entry"""
+        run["process"].join()
+        self.read_messages(run)
+        result = run["result"]
+        if run["process"].exitcode != 0 and result["status"] == "ok":
+            result["status"] = "failed"
+        if result["status"] != "ok" and result["error"] is None:
+            result["error"] = "process exited with code {}".format(run["process"].exitcode)
+        entry = {
+            "scenario": run["scenario"],
+            "run_id": result["run_id"],
+            "log_path": result["log_path"],
+            "status": result["status"],
+            "error": result["error"],
+            "started": datetime.datetime.utcfromtimestamp(run["started"]).isoformat(),
+            "wall_time": time.time() - run["started"],
+            "exitcode": run["process"].exitcode
+        }
+        self.write_index(entry)
+        self.report("[{}/{}] {} {} in {:.1f} s".format(
+            n_finished, len(self.scenario_files), entry["status"], run["scenario"], entry["wall_time"]
+        ))
+        return entry
+
+    def write_index(self, entry):
+        """Add a line to the index of completed runs, only the parent process writes to it"""
+        path = os.path.dirname(self.index_file)
+        if path and not os.path.exists(path):
+            os.makedirs(path)
+        with open(self.index_file, "a") as f:
+            f.write(json.dumps(entry, sort_keys=True) + "\n")
+
+    def run(self):
+        """Run the batch, returns the index entries in the order the runs finished"""
+        pending = list(self.scenario_files)
+        running = []
+        entries = []
+        while len(pending) or len(running):
+            while len(pending) and len(running) < self.processes:
+                running.append(self.start(pending.pop(0)))
+            for run in list(running):
+                self.read_messages(run)
+                if not run["process"].is_alive():
+                    running.remove(run)
+                    entries.append(self.finish(run, len(entries) + 1))
+            if len(running):
+                time.sleep(self.poll_interval)
+        return entries
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a batch of scenarios in parallel.")
+    parser.add_argument("scenarios", nargs="*", help="scenario files, defaults to all of the files in the scenarios folder")
+    parser.add_argument("-j", "--processes", type=int, default=None, help="number of scenarios to run at a time")
+    parser.add_argument("--memory-limit", type=float, default=None, help="memory limit of each run (MB)")
+    parser.add_argument("--index", default=None, help="file for the index of completed runs")
+    parser.add_argument("--console-log-level", type=int, default=None, help="override the scenarios' console_log_level")
+    args = parser.parse_args()
+
+    scenario_files = args.scenarios
+    if not len(scenario_files):
+        scenario_files = sorted(
+            [os.path.join("scenarios", f) for f in os.listdir("scenarios") if os.path.isfile(os.path.join("scenarios", f))]
+        )
+    runner = BatchRunner(
+        scenario_files,
+        processes=args.processes,
+        memory_limit_mb=args.memory_limit,
+        index_file=args.index,
+        console_log_level=args.console_log_level
+    )
+    entries = runner.run()
+    failed = [e for e in entries if e["status"] != "ok"]
+    print "{} runs, {} failed".format(len(entries), len(failed))
+    sys.exit(1 if len(failed) else 0)
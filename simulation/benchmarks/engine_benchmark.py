@@ -0,0 +1,46 @@
+"""
+Compare the run time of a scenario with the "threaded" and "inline" engines.
+
+Logging is turned off so the times reflect the simulation and the event dispatching.
+
+Usage (from the simulation folder):
+    PYTHONPATH=. python benchmarks/engine_benchmark.py [scenario_file] [run_time_days]
+"""
+import sys
+import json
+import time
+import logging
+from supervisor.supervisor import Supervisor
+
+def load_config(scenario_file, run_time_days=None):
+    """Load a fresh copy of the scenario, the device configs are modified when the devices are created"""
+    with open(scenario_file) as f:
+        config = json.load(f)
+    if run_time_days:
+        config["run_time_days"] = run_time_days
+    return config
+
+def run(config, engine):
+    """Run the scenario with the engine, return the time in seconds"""
+    config["engine"] = engine
+    supervisor = Supervisor()
+    supervisor.load_config(config)
+    start = time.time()
+    supervisor.run_simulation()
+    return time.time() - start
+
+if __name__ == "__main__":
+    scenario_file = sys.argv[1] if len(sys.argv) > 1 else "scenarios/pv_only.json"
+    run_time_days = int(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    logger = logging.getLogger("lpdm")
+    logger.addHandler(logging.NullHandler())
+    logger.setLevel(logging.CRITICAL)
+
+    config = load_config(scenario_file, run_time_days)
+    t_threaded = run(config, "threaded")
+    t_inline = run(load_config(scenario_file, run_time_days), "inline")
+    print "{} ({} days)".format(scenario_file, config.get("run_time_days", 7))
+    print "threaded: {:.3f} s".format(t_threaded)
+    print "inline:   {:.3f} s".format(t_inline)
+    print "speedup:  {:.1f}x".format(t_threaded / t_inline)
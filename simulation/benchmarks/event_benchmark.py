@@ -0,0 +1,105 @@
+"""
+Compare the slotted lpdm events against the original events with a __dict__, with and without the event pool.
+
+allocation: create n power events and keep them, reports the time and the bytes per event
+throughput: create an event, read its fields and drop it (or release it to the pool), like a broadcast
+            delivered by the supervisor
+simulation: a simulation run with and without the event pool
+
+Usage (from the simulation folder):
+    PYTHONPATH=. python benchmarks/event_benchmark.py [n_events]
+"""
+import sys
+import time
+import logging
+from lpdm_event import LpdmPowerEvent, enable_event_pool, disable_event_pool, release_event
+from supervisor.supervisor import Supervisor
+
+class DictBaseEvent(object):
+    """The original base event class"""
+    type_code = None
+
+    def __init__(self, source_device_id=None, target_device_id=None, time=None, value=None):
+        self.source_device_id = source_device_id
+        self.target_device_id = target_device_id
+        self.time = time
+        self.value = value
+        self.event_type = None
+
+class DictPowerEvent(DictBaseEvent):
+    """The original power event class"""
+    type_code = 2
+
+    def __init__(self, source_device_id, target_device_id, time, value):
+        DictBaseEvent.__init__(self, source_device_id, target_device_id, time, value)
+        self.event_type = "power"
+
+def event_size(e):
+    """Bytes used by an event object, including its __dict__"""
+    size = sys.getsizeof(e)
+    if hasattr(e, "__dict__"):
+        size += sys.getsizeof(e.__dict__)
+    return size
+
+def allocation(EventClass, n):
+    """Create and keep n events, returns (seconds, bytes per event)"""
+    start = time.time()
+    events = [EventClass("eud_1", "gc_1", i, 100.0) for i in xrange(n)]
+    return time.time() - start, event_size(events[0])
+
+def throughput(EventClass, n, release=None):
+    """Create, read and drop n events, returns events per second"""
+    start = time.time()
+    for i in xrange(n):
+        e = EventClass("eud_1", "gc_1", i, 100.0)
+        e.source_device_id, e.target_device_id, e.time, e.value
+        if release:
+            release(e)
+    return n / (time.time() - start)
+
+def simulation(pool):
+    """Run a 7 day simulation with 20 euds, returns the time in seconds"""
+    config = {
+        "run_time_days": 7,
+        "engine": "inline",
+        "event_pool": pool,
+        "devices": {
+            "grid_controllers": [{"device_id": "gc_1", "device_type": "grid_controller"}],
+            "power_sources": [{"device_id": "pv_1", "grid_controller_id": "gc_1", "device_type": "pv"}],
+            "euds": [
+                {
+                    "device_id": "eud_{}".format(i),
+                    "device_type": "eud",
+                    "grid_controller_id": "gc_1",
+                    "max_power_output": 100.0,
+                    "schedule": [[i % 12, "on"], [12 + i % 12, "off"]]
+                } for i in range(20)
+            ]
+        }
+    }
+    supervisor = Supervisor()
+    supervisor.load_config(config)
+    start = time.time()
+    supervisor.run_simulation()
+    return time.time() - start
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    logger = logging.getLogger("lpdm")
+    logger.addHandler(logging.NullHandler())
+    logger.setLevel(logging.CRITICAL)
+
+    print "{} events".format(n)
+    print "{:<24} {:>14} {:>14} {:>18}".format("", "allocation (s)", "bytes/event", "throughput (ev/s)")
+    for name, EventClass in [("dict events", DictPowerEvent), ("slotted events", LpdmPowerEvent)]:
+        seconds, size = allocation(EventClass, n)
+        print "{:<24} {:>14.3f} {:>14} {:>18,.0f}".format(name, seconds, size, throughput(EventClass, n))
+    enable_event_pool()
+    print "{:<24} {:>14} {:>14} {:>18,.0f}".format(
+        "slotted events + pool", "", "", throughput(LpdmPowerEvent, n, release_event)
+    )
+    disable_event_pool()
+
+    print "{:<24} {:>10.3f} s".format("simulation", simulation(False))
+    print "{:<24} {:>10.3f} s".format("simulation + pool", simulation(True))
+    disable_event_pool()
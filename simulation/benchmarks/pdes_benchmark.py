@@ -0,0 +1,71 @@
+"""
+Run a scenario with several grid controllers sequentially and with the conservative parallel runner
+at 1, 2, 4 and 8 workers.
+
+Each grid controller has a pv and a group of euds with staggered schedules.
+Logging is turned off so the times reflect the simulation and the synchronization between the workers.
+
+Usage (from the simulation folder):
+    PYTHONPATH=. python benchmarks/pdes_benchmark.py [n_grid_controllers] [euds_per_grid_controller] [run_time_days]
+"""
+import sys
+import time
+import logging
+from supervisor.supervisor import Supervisor
+from supervisor.conservative_runner import ConservativeRunner
+
+def build_config(n_gcs, n_euds, run_time_days):
+    """Build a scenario with n_gcs grid controllers, each with a pv and n_euds euds"""
+    config = {
+        "run_time_days": run_time_days,
+        "engine": "inline",
+        "lookahead": 60,
+        "devices": {"grid_controllers": [], "power_sources": [], "euds": []}
+    }
+    for i in range(n_gcs):
+        gc_id = "gc_{}".format(i)
+        config["devices"]["grid_controllers"].append({"device_id": gc_id, "device_type": "grid_controller"})
+        config["devices"]["power_sources"].append(
+            {"device_id": "pv_{}".format(i), "grid_controller_id": gc_id, "device_type": "pv"}
+        )
+        for j in range(n_euds):
+            config["devices"]["euds"].append(
+                {
+                    "device_id": "eud_{}_{}".format(i, j),
+                    "device_type": "eud",
+                    "grid_controller_id": gc_id,
+                    "max_power_output": 100.0,
+                    "schedule": [[(i + j) % 12, "on"], [12 + (i + j) % 12, "off"]]
+                }
+            )
+    return config
+
+def run_sequential(config):
+    """Run all of the grid controllers in a single supervisor, return the time in seconds"""
+    supervisor = Supervisor()
+    supervisor.load_config(config)
+    start = time.time()
+    supervisor.run_simulation()
+    return time.time() - start
+
+def run_parallel(config, workers):
+    """Run the grid controllers with the conservative runner, return the time in seconds"""
+    start = time.time()
+    ConservativeRunner(config, workers=workers).run()
+    return time.time() - start
+
+if __name__ == "__main__":
+    n_gcs = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    n_euds = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    run_time_days = int(sys.argv[3]) if len(sys.argv) > 3 else 7
+
+    logger = logging.getLogger("lpdm")
+    logger.addHandler(logging.NullHandler())
+    logger.setLevel(logging.CRITICAL)
+
+    print "{} grid controllers x {} euds, {} days".format(n_gcs, n_euds, run_time_days)
+    t_sequential = run_sequential(build_config(n_gcs, n_euds, run_time_days))
+    print "{:>12} {:>10.3f} s".format("sequential", t_sequential)
+    for workers in [1, 2, 4, 8]:
+        t = run_parallel(build_config(n_gcs, n_euds, run_time_days), workers)
+        print "{:>4} workers {:>10.3f} s {:>8.2f}x".format(workers, t, t_sequential / t)
@@ -0,0 +1,126 @@
+"""
+Run generated scenarios of increasing size as a regression baseline for how the simulation scales.
+
+Each size runs in its own process with the inline engine and file logging, and reports
+    events:      number of events delivered to the devices (ttie, power, price, capacity, ...)
+    wall_time:   seconds to run the simulation
+    events/s:    events / wall_time
+    peak_rss:    peak resident memory of the process (MB)
+    log_bytes:   size of the simulation's log files
+
+The euds are spread over grid controllers of at most --euds-per-gc euds, each with 2 power sources and a battery.
+With --vectorized-euds the simple euds are run as fleets with the given timestep (seconds).
+
+Usage (from the simulation folder):
+    PYTHONPATH=. python benchmarks/scaling_benchmark.py [--sizes 10,100,1000,10000] [--hours 24] [--euds-per-gc 100]
+        [--timeout seconds] [--vectorized-euds timestep] [--output results.json]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import multiprocessing
+from scenario_generator import generate_scenario
+
+def run_size(conn, config, log_path, file_log_level):
+    """Run a scenario in a worker process and send back the results"""
+    import logging
+    import resource
+    from simulation import Simulation
+    from supervisor.device_inline import DeviceInline
+
+    # count the events delivered to the devices
+    counter = [0]
+    dispatch = DeviceInline.dispatch
+    def counted_dispatch(self, the_event):
+        counter[0] += 1
+        return dispatch(self, the_event)
+    DeviceInline.dispatch = counted_dispatch
+
+    config = dict(config, engine="inline", console_log_level=logging.CRITICAL, file_log_level=file_log_level, log_path=log_path)
+    sim = Simulation()
+    sim.config = config
+    sim.init_logger()
+    start = time.time()
+    results = sim.run()
+    wall_time = time.time() - start
+    logging.shutdown()
+
+    log_bytes = 0
+    for root, dirs, files in os.walk(log_path):
+        log_bytes += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+    conn.send({
+        "status": "ok" if all(ok for name, ok in results) else "failed",
+        "events": counter[0],
+        "wall_time": wall_time,
+        "events_per_second": counter[0] / wall_time if wall_time > 0 else None,
+        # ru_maxrss is in KB on linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0,
+        "log_bytes": log_bytes
+    })
+    conn.close()
+
+def benchmark(n_euds, hours, euds_per_gc, timeout, file_log_level, seed=0, vectorized_euds=None):
+    """Generate and run a scenario with n_euds euds, returns the results"""
+    n_gcs = max(1, (n_euds + euds_per_gc - 1) // euds_per_gc)
+    config = generate_scenario(
+        n_euds, n_power_sources=2 * n_gcs, n_grid_controllers=n_gcs, batteries=True, seed=seed, run_time_days=hours / 24.0
+    )
+    if vectorized_euds:
+        config["vectorized_euds"] = {"timestep": vectorized_euds}
+    result = {"n_euds": n_euds, "grid_controllers": n_gcs, "power_sources": 2 * n_gcs, "hours": hours, "status": "failed"}
+    log_path = tempfile.mkdtemp()
+    try:
+        parent_conn, child_conn = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(target=run_size, args=(child_conn, config, log_path, file_log_level))
+        process.start()
+        child_conn.close()
+        if parent_conn.poll(timeout):
+            result.update(parent_conn.recv())
+        else:
+            result["status"] = "timeout"
+            process.terminate()
+        process.join()
+    except EOFError:
+        result["status"] = "failed"
+    finally:
+        shutil.rmtree(log_path)
+    return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run generated scenarios of increasing size.")
+    parser.add_argument("--sizes", default="10,100,1000,10000", help="numbers of euds, comma separated")
+    parser.add_argument("--hours", type=float, default=24.0, help="simulated hours")
+    parser.add_argument("--euds-per-gc", type=int, default=100, help="maximum number of euds per grid controller")
+    parser.add_argument("--timeout", type=float, default=3600.0, help="maximum wall time for each size (seconds)")
+    parser.add_argument("--file-log-level", type=int, default=20, help="log level of the simulation's log file")
+    parser.add_argument("--vectorized-euds", type=float, default=None, help="run the simple euds as fleets with this timestep (seconds)")
+    parser.add_argument("--output", default=None, help="json file for the results")
+    args = parser.parse_args()
+
+    results = []
+    print "{:>8} {:>5} {:>10} {:>12} {:>12} {:>14} {:>14}  {}".format(
+        "euds", "gcs", "events", "wall time (s)", "events/s", "peak rss (MB)", "log (MB)", "status"
+    )
+    for n_euds in [int(n) for n in args.sizes.split(",")]:
+        r = benchmark(
+            n_euds, args.hours, args.euds_per_gc, args.timeout, args.file_log_level, vectorized_euds=args.vectorized_euds
+        )
+        results.append(r)
+        if "wall_time" in r:
+            print "{:>8} {:>5} {:>10} {:>12.1f} {:>12,.0f} {:>14.1f} {:>14.1f}  {}".format(
+                r["n_euds"], r["grid_controllers"], r["events"], r["wall_time"], r["events_per_second"],
+                r["peak_rss_mb"], r["log_bytes"] / 1e6, r["status"]
+            )
+        else:
+            print "{:>8} {:>5} {:>10} {:>12} {:>12} {:>14} {:>14}  {}".format(
+                r["n_euds"], r["grid_controllers"], "", "", "", "", "", r["status"]
+            )
+        sys.stdout.flush()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
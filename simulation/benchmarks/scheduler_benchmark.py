@@ -0,0 +1,119 @@
+"""
+Compare the compiled schedules against the original list based Scheduler.
+
+Each device gets a 1 year on/off schedule (an on and an off time every day), drawn from a pool of distinct
+schedules so that devices of the same kind have identical schedules.  The benchmark times building the schedulers
+of all of the devices and looking up the next task at random times, then does the same with the equivalent
+weekday/weekend calendar schedules.
+
+Usage (from the simulation folder):
+    PYTHONPATH=. python benchmarks/scheduler_benchmark.py [--devices 10000] [--schedules 100] [--lookups 20000]
+"""
+import argparse
+import random
+import time
+from device.scheduler import Scheduler, LpdmEvent
+from device.scheduler.last_day_time import LastDayTime
+from device.scheduler.schedule_item import ScheduleItem
+
+SECS_IN_DAY = 24 * 60 * 60
+DAYS = 365
+
+class ListScheduler(object):
+    """The original Scheduler, which builds its own items and looks through them in order"""
+    def __init__(self, schedule):
+        self.schedule = schedule
+        self.last_day_time = LastDayTime()
+        self.scheduled_items = []
+
+    def parse_schedule(self):
+        for schedule_item in self.schedule:
+            self.scheduled_items.append(ScheduleItem(self.last_day_time, *schedule_item))
+
+    def get_next_scheduled_task(self, time_seconds):
+        day = int(time_seconds / SECS_IN_DAY)
+        secs = time_seconds % SECS_IN_DAY
+        found_item = None
+        for item in self.scheduled_items:
+            if item.day == day and item.time > secs:
+                found_item = item
+                break
+            elif item.day > day:
+                found_item = item
+                break
+        if found_item is None:
+            last_day = None
+            last_day_items = []
+            for item in self.scheduled_items[::-1]:
+                if last_day is None:
+                    last_day = item.day
+                if item.day != last_day:
+                    break
+                last_day_items.insert(0, item)
+            if secs < last_day_items[0].time or secs >= last_day_items[-1].time:
+                found_item = last_day_items[0]
+            else:
+                for item in last_day_items:
+                    found_item = item
+                    if item.time > secs:
+                        break
+        ttie = (day * SECS_IN_DAY) + found_item.time
+        if ttie <= time_seconds:
+            ttie += SECS_IN_DAY
+        return LpdmEvent(ttie, found_item.value)
+
+def year_schedule(rand):
+    """A year of daily on/off times, on earlier on the weekends"""
+    on_hour = rand.randint(5, 9)
+    off_hour = rand.randint(17, 22)
+    schedule = []
+    for day in range(DAYS):
+        # the hours are times of day, each item is on the first day after the previous one that it can be
+        schedule.append([on_hour - 2 if day % 7 >= 5 else on_hour, "on"])
+        schedule.append([off_hour, "off"])
+    return schedule
+
+def calendar_schedule(schedule):
+    """The weekday/weekend calendar schedule equivalent to a year schedule from year_schedule"""
+    return {
+        "weekday": [[schedule[0][0], "on"], [schedule[1][0], "off"]],
+        "weekend": [[schedule[10][0], "on"], [schedule[11][0], "off"]]
+    }
+
+def run(scheduler_class, schedules, n_lookups, seed=0):
+    """Time building the schedulers and n_lookups lookups, return (build seconds, lookup microseconds)"""
+    start = time.time()
+    schedulers = []
+    for schedule in schedules:
+        scheduler = scheduler_class(schedule)
+        scheduler.parse_schedule()
+        schedulers.append(scheduler)
+    build_time = time.time() - start
+
+    rand = random.Random(seed)
+    lookups = [(rand.choice(schedulers), rand.randint(0, DAYS * SECS_IN_DAY)) for i in range(n_lookups)]
+    start = time.time()
+    for (scheduler, time_seconds) in lookups:
+        scheduler.get_next_scheduled_task(time_seconds)
+    return (build_time, 1e6 * (time.time() - start) / n_lookups)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the compiled schedules.")
+    parser.add_argument("--devices", type=int, default=10000, help="number of devices")
+    parser.add_argument("--schedules", type=int, default=100, help="number of distinct schedules")
+    parser.add_argument("--lookups", type=int, default=20000, help="number of next task lookups")
+    args = parser.parse_args()
+
+    rand = random.Random(1)
+    pool = [year_schedule(rand) for i in range(args.schedules)]
+    # each device has its own copy of its schedule, as when a scenario is loaded
+    schedules = [[list(item) for item in rand.choice(pool)] for i in range(args.devices)]
+    calendars = [calendar_schedule(schedule) for schedule in schedules]
+
+    print "{} devices, {} distinct 1 year schedules".format(args.devices, args.schedules)
+    print "{:>24} {:>12} {:>16}".format("", "build (s)", "lookup (us)")
+    for (name, scheduler_class, device_schedules) in [
+        ("list", ListScheduler, schedules), ("compiled", Scheduler, schedules), ("calendar", Scheduler, calendars)
+    ]:
+        (build_time, lookup_time) = run(scheduler_class, device_schedules, args.lookups)
+        print "{:>24} {:>12.2f} {:>16.2f}".format(name, build_time, lookup_time)
@@ -0,0 +1,79 @@
+"""
+Measure the startup time of short scenario runs: the time to import the simulation and the device classes
+a scenario uses, in a new python process like each run of the batch runner.
+
+lazy:  the current code, requests, pytz, paramiko and psycopg2 are only imported when they're used
+eager: the same with those modules imported up front, like the device modules used to
+
+The time saved per run is extrapolated to 1000 runs.
+
+Usage (from the simulation folder):
+    PYTHONPATH=. python benchmarks/startup_benchmark.py [runs per scenario] [scenario files...]
+"""
+import os
+import sys
+import json
+import subprocess
+
+HEAVY_MODULES = ["requests", "pytz", "paramiko", "psycopg2"]
+
+# run in a new process: import the supervisor and the scenario's device classes, print the time and the heavy modules loaded
+STARTUP = """
+import sys, time, json
+start = time.time()
+for name in {eager}:
+    try:
+        __import__(name)
+    except ImportError:
+        pass
+from supervisor.supervisor import Supervisor
+from common.device_class_loader import DeviceClassLoader
+loader = DeviceClassLoader()
+for module_name in {modules}:
+    loader.get_device_class_from_name(module_name)
+print json.dumps([time.time() - start, [m for m in {heavy} if m in sys.modules]])
+"""
+
+def scenario_modules(file_name):
+    """The device modules used by a scenario"""
+    with open(file_name) as f:
+        config = json.load(f)
+    devices = config["devices"]
+    return sorted(set(
+        "device.{}.{}".format(dc.get("simulated_or_real", "simulated"), dc["device_type"])
+        for section in ["grid_controllers", "power_sources", "euds"] for dc in devices.get(section, [])
+    ))
+
+def startup(modules, eager):
+    """Start a python process that loads the device modules, returns (seconds, heavy modules loaded)"""
+    code = STARTUP.format(eager=repr(HEAVY_MODULES if eager else []), modules=repr(modules), heavy=repr(HEAVY_MODULES))
+    with open(os.devnull, "w") as devnull:
+        output = subprocess.check_output(
+            [sys.executable, "-c", code], env=dict(os.environ, PYTHONPATH="."), stderr=devnull
+        )
+    seconds, loaded = json.loads(output.strip().split("\n")[-1])
+    return seconds, loaded
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    scenario_files = sys.argv[2:] if len(sys.argv) > 2 else [
+        "scenarios/scenario.json", "scenarios/pv_only.json", "scenarios/hvac.json", "scenarios/battery.json"
+    ]
+
+    print "{} runs per scenario, median startup time".format(runs)
+    print "{:<32} {:>10} {:>10} {:>12} {:>18}  {}".format(
+        "scenario", "eager (s)", "lazy (s)", "saved (s)", "saved/1000 runs (s)", "heavy modules loaded (lazy)"
+    )
+    for file_name in scenario_files:
+        modules = scenario_modules(file_name)
+        eager = median([startup(modules, True)[0] for i in range(runs)])
+        lazy_runs = [startup(modules, False) for i in range(runs)]
+        lazy = median([seconds for seconds, loaded in lazy_runs])
+        loaded = lazy_runs[-1][1]
+        print "{:<32} {:>10.3f} {:>10.3f} {:>12.3f} {:>18.1f}  {}".format(
+            os.path.basename(file_name), eager, lazy, eager - lazy, 1000 * (eager - lazy), ", ".join(loaded) or "-"
+        )
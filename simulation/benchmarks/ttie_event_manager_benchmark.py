@@ -0,0 +1,55 @@
+"""
+Compare the heap based TtieEventManager against the original list based implementation.
+
+Each device gets an initial ttie, then the benchmark repeatedly pulls the next ttie and
+schedules a new one for the same device, which is what the supervisor does during a run.
+
+Usage (from the simulation folder):
+    PYTHONPATH=. python benchmarks/ttie_event_manager_benchmark.py [n_devices ...]
+"""
+import sys
+import time
+import random
+from lpdm_event import LpdmTtieEvent
+from supervisor.event_manager import EventManager
+from supervisor.ttie_event_manager import TtieEventManager
+
+class ListTtieEventManager(EventManager):
+    """The original sorted list implementation (linear scan insert, pop(0))"""
+    def add(self, lpdm_ttie_event):
+        if len(self.events):
+            for i, e in enumerate(self.events):
+                if lpdm_ttie_event.value < e.value:
+                    self.events.insert(i, lpdm_ttie_event)
+                    return
+        self.events.append(lpdm_ttie_event)
+
+def load(manager, ttie_events):
+    """Fill the manager with the initial ttie for each device"""
+    if isinstance(manager, ListTtieEventManager):
+        # filling the list one at a time is quadratic, so start from an already sorted list
+        manager.events = sorted(ttie_events, key=lambda e: e.value)
+    else:
+        for e in ttie_events:
+            manager.add(e)
+
+def run(manager, n_devices, n_dispatches, seed=0):
+    """Time n_dispatches get/add cycles, return the time in seconds"""
+    rand = random.Random(seed)
+    load(manager, [LpdmTtieEvent("device_{}".format(i), rand.randint(0, 3600)) for i in range(n_devices)])
+    start = time.time()
+    for i in range(n_dispatches):
+        the_event = manager.get()
+        manager.add(LpdmTtieEvent(the_event.target_device_id, the_event.value + rand.randint(1, 3600)))
+    return time.time() - start
+
+if __name__ == "__main__":
+    sizes = [int(n) for n in sys.argv[1:]] or [10000, 100000]
+    n_dispatches = 1000
+    print "{:>10} {:>16} {:>16} {:>10}".format("devices", "list (us/event)", "heap (us/event)", "speedup")
+    for n in sizes:
+        t_list = run(ListTtieEventManager(), n, n_dispatches)
+        t_heap = run(TtieEventManager(), n, n_dispatches)
+        print "{:>10} {:>16.2f} {:>16.2f} {:>9.1f}x".format(
+            n, 1e6 * t_list / n_dispatches, 1e6 * t_heap / n_dispatches, t_list / t_heap
+        )
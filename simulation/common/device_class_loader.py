@@ -1,12 +1,87 @@
+import os
+import re
 import importlib
 import logging
 
+# folder with the device packages (device/simulated/<device_type>, device/real/<device_type>)
+DEVICE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "device")
+
+# "from module import ClassName" in a device package's __init__.py
+INIT_IMPORT = re.compile(r"^\s*from\s+([\w\.]+)\s+import\s+(\w+)", re.MULTILINE)
+
+# "class ClassName" in a device's module
+CLASS_DEF = re.compile(r"^class\s+(\w+)", re.MULTILINE)
+
+def class_name_for_module(module_name):
+    """The class name for a device module, the camelcase version of the snakecase folder name, eg diesel_generator = DieselGenerator"""
+    return "".join([p.capitalize() for p in module_name.split(".")[-1].split("_")])
+
+def matches_device_type(class_name, device_type):
+    """True if the class name is the device type without the underscores, eg DieselGenerator or Philips_Light"""
+    return class_name.replace("_", "").lower() == device_type.replace("_", "").lower()
+
+def find_device_class(package_path, package_name, device_type):
+    """
+    Find a device package's class without importing it, returns (module name, class name) or None.
+    The class is the one the package's __init__.py imports, or if it doesn't import it,
+    the one defined in the module with the same name as the package (eg philips_light/philips_light.py).
+    """
+    candidates = []
+    with open(os.path.join(package_path, "__init__.py")) as f:
+        for module, class_name in INIT_IMPORT.findall(f.read()):
+            # implicit relative imports are relative to the package
+            if os.path.isfile(os.path.join(package_path, module.split(".")[0] + ".py")):
+                module = "{}.{}".format(package_name, module)
+            candidates.append((module, class_name))
+    module_file = os.path.join(package_path, device_type + ".py")
+    if os.path.isfile(module_file):
+        with open(module_file) as f:
+            candidates.extend([("{}.{}".format(package_name, device_type), c) for c in CLASS_DEF.findall(f.read())])
+    for module, class_name in candidates:
+        if matches_device_type(class_name, device_type):
+            return (module, class_name)
+    return None
+
+def build_device_registry(device_path=DEVICE_PATH):
+    """
+    Find the device classes without importing them.
+    Returns a dict of device package name (eg device.simulated.eud) -> (module name, class name), eg
+    (device.simulated.eud.eud, Eud), for each package under device/simulated and device/real that has a device class.
+    """
+    registry = {}
+    for simulated_or_real in ["simulated", "real"]:
+        path = os.path.join(device_path, simulated_or_real)
+        if not os.path.isdir(path):
+            continue
+        for device_type in sorted(os.listdir(path)):
+            package_path = os.path.join(path, device_type)
+            if not os.path.isfile(os.path.join(package_path, "__init__.py")):
+                continue
+            package_name = "device.{}.{}".format(simulated_or_real, device_type)
+            device_class = find_device_class(package_path, package_name, device_type)
+            if not device_class is None:
+                registry[package_name] = device_class
+    return registry
+
+# the device registry and the loaded classes are shared by all of the loaders in a process
+_device_registry = None
+_class_cache = {}
+
+def get_device_registry():
+    """The device registry, built the first time it's needed"""
+    global _device_registry
+    if _device_registry is None:
+        _device_registry = build_device_registry()
+    return _device_registry
+
 class DeviceClassLoader(object):
     """
     Get a LPDM device class from a string.
     This is assuming a module structure for the device classes as 'device.name',
     where all the specific implementations of a device, such as an air conditioner, are
     stored as subfolders under a main 'device' folder, e.g. device.air_conditioner.
+    A device's module is only imported the first time its class is needed, so a scenario
+    only pays for importing the devices it uses.
     """
 
     def __init__(self):
@@ -14,16 +89,18 @@ class DeviceClassLoader(object):
 
     def get_device_class_from_name(self, module_name):
         """Get a device class from the folder name"""
-        # build the class name
-        # which should be the camelcase version of the device_name, which is snakecase
-        # eg diesel_generator = DieselGenerator
-        parts = module_name.split(".")
-        class_name = "".join([p.capitalize() for p in parts[-1].split("_")])
-        return self.class_for_name(module_name, class_name)
+        device_class = get_device_registry().get(module_name)
+        if device_class is None:
+            # not a device package, build the class name from the module name
+            device_class = (module_name, class_name_for_module(module_name))
+        return self.class_for_name(*device_class)
 
     def class_for_name(self, module_name, class_name):
-        # load the module, will raise ImportError if module cannot be loaded
-        m = importlib.import_module(module_name)
-        # get the class, will raise AttributeError if class cannot be found
-        c = getattr(m, class_name)
+        c = _class_cache.get((module_name, class_name))
+        if c is None:
+            # load the module, will raise ImportError if module cannot be loaded
+            m = importlib.import_module(module_name)
+            # get the class, will raise AttributeError if class cannot be found
+            c = getattr(m, class_name)
+            _class_cache[(module_name, class_name)] = c
         return c
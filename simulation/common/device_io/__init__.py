@@ -0,0 +1,3 @@
+from io_loop import IoLoop, get_io_loop
+from async_driver import AsyncDriver
+from http_driver import HttpDriver
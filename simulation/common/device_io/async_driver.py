@@ -0,0 +1,72 @@
+import time
+import threading
+from io_loop import get_io_loop
+
+class AsyncDriver(object):
+    """
+    Wrap a blocking device driver so its calls run on the io loop.
+    Commands are sent in the order they're given, and if they're given faster than the device takes them only the
+    latest waiting command is sent.  Reads return the last known value and refresh it in the background.
+    """
+    def __init__(self, driver, name, timeout=5.0, io_loop=None):
+        self.driver = driver
+        self.name = name
+        self.timeout = timeout
+        self.io_loop = io_loop
+        self.lock = threading.Lock()
+        # method name -> (last value read, wall clock time it was read)
+        self.state = {}
+        self.last_error = None
+
+    def __getstate__(self):
+        """The io loop and the lock aren't saved with a checkpoint"""
+        state = dict(self.__dict__)
+        state["io_loop"] = None
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def loop(self):
+        """The io loop for the calls, the shared io loop is started the first time it's needed"""
+        if self.io_loop is None:
+            self.io_loop = get_io_loop()
+        return self.io_loop
+
+    def send(self, method, *args):
+        """Send a command to the device without waiting for it"""
+        self.loop().submit((self.name, "send"), getattr(self.driver, method), args, self.timeout, self.on_sent)
+
+    def read(self, method, *args):
+        """Get the last known value of a read, None until the first read finishes, and refresh it in the background"""
+        self.loop().submit(
+            (self.name, method),
+            getattr(self.driver, method),
+            args,
+            self.timeout,
+            lambda result, error: self.on_read(method, result, error)
+        )
+        return self.last_known(method)
+
+    def last_known(self, method, default=None):
+        """The last value read from the device by method"""
+        with self.lock:
+            return self.state[method][0] if method in self.state else default
+
+    def last_read_time(self, method):
+        """Wall clock time of the last successful read by method"""
+        with self.lock:
+            return self.state[method][1] if method in self.state else None
+
+    def on_sent(self, result, error):
+        if not error is None:
+            self.last_error = error
+
+    def on_read(self, method, result, error):
+        with self.lock:
+            if error is None:
+                self.state[method] = (result, time.time())
+            else:
+                self.last_error = error
@@ -0,0 +1,37 @@
+import json
+import httplib
+import urlparse
+
+class HttpDriver(object):
+    """Send JSON requests to a device's HTTP API, every request has a timeout"""
+    def __init__(self, url, timeout=5.0, headers=None):
+        parsed = urlparse.urlparse(url)
+        self.host = parsed.hostname
+        self.port = parsed.port
+        self.base_path = parsed.path.rstrip("/")
+        self.timeout = timeout
+        self.headers = {"Content-Type": "application/json"}
+        if headers:
+            self.headers.update(headers)
+
+    def request(self, method, path, body=None):
+        """Send a request, returns the decoded JSON response"""
+        conn = httplib.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            conn.request(method, self.base_path + path, None if body is None else json.dumps(body), self.headers)
+            response = conn.getresponse()
+            data = response.read()
+            if response.status >= 400:
+                raise Exception("{} {} returned {}".format(method, path, response.status))
+            return json.loads(data) if data else None
+        finally:
+            conn.close()
+
+    def get(self, path):
+        return self.request("GET", path)
+
+    def put(self, path, body):
+        return self.request("PUT", path, body)
+
+    def post(self, path, body):
+        return self.request("POST", path, body)
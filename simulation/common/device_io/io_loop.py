@@ -0,0 +1,117 @@
+import time
+import socket
+import logging
+import threading
+from multiprocessing.pool import ThreadPool
+
+class IoLoop(object):
+    """
+    Run the blocking calls to real devices in a pool of threads, so the simulation never waits on the hardware.
+    Each call has a key (usually the device and the kind of call): calls with different keys run concurrently,
+    calls with the same key run one at a time in the order they're submitted, and while a call is running only
+    the latest call waiting for the same key is kept.
+    """
+    def __init__(self, workers=8):
+        self.pool = ThreadPool(workers)
+        self.lock = threading.Lock()
+        self.idle = threading.Condition(self.lock)
+        # keys with a call running
+        self.running = set()
+        # key -> the next call for the key
+        self.waiting = {}
+        self.counts = {"submitted": 0, "completed": 0, "failed": 0, "timed_out": 0, "replaced": 0}
+        self.logger = logging.getLogger("lpdm")
+
+    def submit(self, key, fn, args=(), timeout=None, callback=None):
+        """
+        Run fn(*args) in the background and return without waiting for it.
+        callback(result, error) is called from the pool when the call finishes, a call that hasn't returned after
+        timeout seconds gives a timeout error right away and the next call for the key doesn't wait for it.
+        """
+        call = (fn, args, timeout, callback)
+        with self.lock:
+            self.counts["submitted"] += 1
+            if key in self.running:
+                if key in self.waiting:
+                    self.counts["replaced"] += 1
+                self.waiting[key] = call
+                return
+            self.running.add(key)
+        self.pool.apply_async(self.run_call, (key, call))
+
+    def call(self, fn, args, outcome):
+        """Run fn(*args) and put its result or error in outcome"""
+        try:
+            outcome["result"] = fn(*args)
+        except Exception as e:
+            outcome["error"] = e
+
+    def run_call(self, key, call):
+        """
+        Run a call, then the next call waiting for the same key.
+        A call with a timeout runs in its own thread: when the timeout passes the call is abandoned, its pool thread
+        and key are freed for the next call, and whatever it returns later is ignored.
+        """
+        fn, args, timeout, callback = call
+        outcome = {}
+        if timeout is None:
+            self.call(fn, args, outcome)
+        else:
+            thread = threading.Thread(target=self.call, args=(fn, args, outcome))
+            thread.daemon = True
+            thread.start()
+            thread.join(timeout)
+            if thread.is_alive():
+                outcome = {"error": socket.timeout("call to {} didn't return within {} s".format(key, timeout))}
+        result = outcome.get("result")
+        error = outcome.get("error")
+
+        with self.lock:
+            if error is None:
+                self.counts["completed"] += 1
+            elif isinstance(error, socket.timeout):
+                self.counts["timed_out"] += 1
+            else:
+                self.counts["failed"] += 1
+        if not error is None:
+            self.logger.warning("device io call {} failed: {}".format(key, error))
+
+        if callback:
+            try:
+                callback(result, error)
+            except Exception as e:
+                self.logger.error("device io callback for {} failed: {}".format(key, e))
+
+        with self.lock:
+            next_call = self.waiting.pop(key, None)
+            if next_call is None:
+                self.running.discard(key)
+                if not len(self.running):
+                    self.idle.notify_all()
+        if next_call:
+            self.pool.apply_async(self.run_call, (key, next_call))
+
+    def wait(self, timeout=None):
+        """Wait until all of the calls have finished, returns False if they haven't finished after timeout seconds"""
+        end = None if timeout is None else time.time() + timeout
+        with self.lock:
+            while len(self.running):
+                remaining = None if end is None else end - time.time()
+                if not remaining is None and remaining <= 0:
+                    return False
+                # wake up periodically, a Condition wait without a timeout can't be interrupted
+                self.idle.wait(0.1 if remaining is None else min(0.1, remaining))
+        return True
+
+    def close(self):
+        """Stop the pool, calls that haven't started are dropped"""
+        self.pool.close()
+
+io_loop = None
+
+def get_io_loop():
+    """The io loop shared by the real devices"""
+    global io_loop
+    if io_loop is None:
+        io_loop = IoLoop()
+    return io_loop
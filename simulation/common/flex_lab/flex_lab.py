@@ -1,4 +1,5 @@
-import paramiko
+import json
+from common.device_io import AsyncDriver
 
 class FlexLab(object):
     def __init__(self, config={}):
@@ -9,8 +10,12 @@ class FlexLab(object):
         self._key_file = config.get("key_file", None)
         # the minimum amount of time that needs to pass before a new set point can be posted
         self._actuation_lockout_time = config.get("actuation_lockout_time", 60.0 * 5.0)
+        # timeout (seconds) for the commands sent to flex lab
+        self._timeout = config.get("io_timeout", 30.0)
 
         self._ssh = None
+        # the commands are sent in the background so the simulation doesn't wait on the connection
+        self._link = AsyncDriver(self, name="flex_lab_{}".format(self._host), timeout=self._timeout)
 
     def init(self):
         """Initialize the object"""
@@ -22,34 +27,34 @@ class FlexLab(object):
         self._time = new_time
 
     def connect(self):
+        # paramiko is slow to import, only load it when connecting to flex lab
+        import paramiko
         self._ssh = paramiko.SSHClient()
         self._ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        self._ssh.connect(self._host, username=self._flex_user, key_filename=self._key_file)
+        self._ssh.connect(self._host, username=self._flex_user, key_filename=self._key_file, timeout=self._timeout)
 
     def post_value(self, value):
         """Post a value to flex lab"""
         # only post a value if the minimum posting interval has been met or nothing has been posted yet
         if self._last_post_time is None or self._time - self._last_post_time > self._actuation_lockout_time:
-            # self.run_cws_cmd(
-                # user=self._flex_user,
-                # passw=None,
-                # system="the_system",
-                # channel="the_channel",
-                # value=value,
-                # cmd="set"
-            # )
+            if not self._ssh is None:
+                self._link.send(
+                    "run_cws_cmd",
+                    self._flex_user,
+                    None,
+                    "the_system",
+                    "the_channel",
+                    value,
+                    "set"
+                )
             self._last_post_time = self._time
 
     def run_cws_cmd(self, user, passw, system, channel, value, cmd):
         if cmd == 'set':
-            string = '{"cmd":"SETDAQ","sys":"{}","chn":"{}","val":"{}","user":"{}","pass":"{}"}'.format(
-                system, channel, value, user, passw
-            )
+            string = json.dumps({"cmd": "SETDAQ", "sys": system, "chn": channel, "val": str(value), "user": user, "pass": passw})
         else:
-            string = '{"cmd":"GETDAQ","sys":"{}","chn":"{}",""user":"{}","pass":"{}"}'.format(
-                system, channel, user, passw
-            )
-        stdin, stdout, stderr = ssh.exec_command(string)
+            string = json.dumps({"cmd": "GETDAQ", "sys": system, "chn": channel, "user": user, "pass": passw})
+        stdin, stdout, stderr = self._ssh.exec_command(string, timeout=self._timeout)
         result = ""
         for line in stdout.readlines():
            result += line.strip()
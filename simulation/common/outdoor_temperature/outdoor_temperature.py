@@ -1,9 +1,12 @@
 import os
 import json
+import bisect
 
 class OutdoorTemperature(object):
     def __init__(self):
         self._hourly_profile = None
+        # the seconds of the profile items, for looking up the temperature at a time of day
+        self._profile_seconds = None
         self._temperature_file_name = "weather_5_secs.json"
 
     def init(self):
@@ -13,3 +16,9 @@ class OutdoorTemperature(object):
         "load the temperature profile from a json file"
         with open(os.path.join(os.path.dirname(os.path.realpath(__file__)), self._temperature_file_name), 'r') as content_file:
             self._hourly_profile = json.loads(content_file.read())
+        self._profile_seconds = [item["seconds"] for item in self._hourly_profile]
+
+    def find(self, time_of_day):
+        """The first profile item at or after time_of_day (seconds), None if there isn't one"""
+        i = bisect.bisect_left(self._profile_seconds, time_of_day)
+        return self._hourly_profile[i] if i < len(self._hourly_profile) else None
@@ -1,7 +1,7 @@
 from datetime import datetime
 import logging
-import requests
-import pytz
+
+# requests and pytz are slow to import and only needed when smap is enabled, they're imported on first use
 
 class SmapQuery(object):
     def __init__(self, config={}):
@@ -12,6 +12,7 @@ class SmapQuery(object):
         """
             Returns a map of uuid to some metadata (currently just path and timezone)
         """
+        import requests
         query = "select uuid, Properties/Timezone where Path = '{s}'".format(s = stream)
         url = smap_root + "/backend/api/query?"
 
@@ -35,6 +36,8 @@ class SmapQuery(object):
 
             returns the uuid of the stream with the latest point, a timezone aware datetime, and a float
         """
+        import requests
+        import pytz
         newest_ts = None
         newest_val = None
         newest_uuid = None
@@ -76,6 +79,7 @@ def get_stream_UUIDs_and_metadata(smap_root, stream):
     """
         Returns a map of uuid to some metadata (currently just path and timezone)
     """
+    import requests
     query = "select uuid, Properties/Timezone where Path = '{s}'".format(s = stream)
     url = smap_root + "/backend/api/query?"
 
@@ -99,6 +103,8 @@ def download_most_recent_point(smap_root, stream):
 
         returns the uuid of the stream with the latest point, a timezone aware datetime, and a float
     """
+    import requests
+    import pytz
     newest_ts = None
     newest_val = None
     newest_uuid = None
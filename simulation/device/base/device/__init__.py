@@ -1 +1,2 @@
 from device import Device
+from price_window import PriceWindow
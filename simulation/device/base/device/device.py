@@ -1,4 +1,3 @@
-from lpdm_event.lpdm_init_event import LpdmInitEvent
 
 
 ################################################################################################################################
@@ -22,13 +21,15 @@ import pprint
 import datetime
 import json
 from notification import NotificationReceiver, NotificationSender
+from price_window import PriceWindow
 from simulation_logger import message_formatter
 # getting an error when trying to import using the absolute path (device.scheduler)
 # so used a relative path import
-from ...scheduler import Scheduler, LpdmEvent
-from lpdm_event import LpdmTtieEvent, LpdmPowerEvent, LpdmPriceEvent, LpdmKillEvent, \
-    LpdmConnectDeviceEvent, LpdmAssignGridControllerEvent, LpdmRunTimeErrorEvent, \
-    LpdmCapacityEvent
+from ...scheduler import Scheduler, LpdmEvent, EventStore
+from lpdm_event import LpdmTtieEvent, LpdmPowerEvent, LpdmPriceEvent, LpdmCapacityEvent, event_type
+
+# the most quiescent wake ups skipped with one ttie
+MAX_QUIESCENT_WAKE_UPS = 1000
 
 class Device(NotificationReceiver, NotificationSender):
     """
@@ -49,6 +50,10 @@ class Device(NotificationReceiver, NotificationSender):
                     broadcast_new_price,
                     broadcast_new_ttie
     """
+    # does on_price_change ignore a price that's the same as the device's current price?
+    # a grid controller with skip_repeated_prices set doesn't send these devices the same price again
+    ignores_repeated_price = False
+
     def __init__(self, config):
         self._device_id = config.get("device_id")
         self._device_name = config.get("device_name", "device")
@@ -71,14 +76,18 @@ class Device(NotificationReceiver, NotificationSender):
         # setup the price scheduler
         self._price_scheduler = None
         self._price_schedule_array = config.get("price_schedule", None)
-        self._events = []
+        # the pending LpdmEvents, ordered by ttie and indexed by (name, value)
+        self._events = EventStore()
         self._current_event = None
 
         # hourly average price tracking
         # stores the last 24 average values
-        self._hourly_prices = []
-        # stores the price changes in the past hour
-        self._hourly_price_list = []
+        self._hourly_prices = PriceWindow(24)
+        # is the window shared from another device, only its owner adds the hourly prices
+        self._shares_price_history = False
+        # running sum and count of the price changes in the past hour
+        self._hourly_price_sum = 0
+        self._hourly_price_count = 0
 
         self._power_level = 0.0
         self._time = 0
@@ -89,6 +98,14 @@ class Device(NotificationReceiver, NotificationSender):
 
         self._is_initialized = False
 
+        # skip the wake ups for quiescent events and catch up on them later, see fast_forward
+        self._fast_forward = config.get("fast_forward", False)
+        # the time of the first skipped wake up that hasn't been caught up on
+        self._next_skipped = None
+
+        # event type code -> handler for events received from the supervisor
+        self._event_handlers = self.build_event_handlers()
+
         self._broadcast_callback = None
         if config.has_key("broadcast") and callable(config["broadcast"]):
             self._broadcast_callback = config["broadcast"]
@@ -100,6 +117,16 @@ class Device(NotificationReceiver, NotificationSender):
             self.build_message("initialized device #{} - {}".format(self._uuid, self._device_type))
         )
 
+    def __getstate__(self):
+        """The event handler table holds lambdas that can't be pickled, it's rebuilt when the device is loaded"""
+        state = dict(self.__dict__)
+        del state["_event_handlers"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._event_handlers = self.build_event_handlers()
+
     def init(self):
         """Run any initialization functions for the device"""
         self.setup_schedule()
@@ -120,13 +147,13 @@ class Device(NotificationReceiver, NotificationSender):
 
     def setup_on_off_schedule(self):
         """Setup the on/off schedule if one has been defined"""
-        if type(self._schedule_array) is list:
+        if type(self._schedule_array) in (list, dict):
             self._scheduler = Scheduler(self._schedule_array)
             self._scheduler.parse_schedule()
 
     def setup_price_schedule(self):
         """Setup the price schedule if one has been defined"""
-        if type(self._price_schedule_array) is list:
+        if type(self._price_schedule_array) in (list, dict):
             self._price_scheduler = Scheduler(self._price_schedule_array)
             self._price_scheduler.set_task_name("price")
             self._price_scheduler.parse_schedule()
@@ -135,10 +162,9 @@ class Device(NotificationReceiver, NotificationSender):
         "set the next event to calculate the avg hourly prices"
         new_event = LpdmEvent(self._time + 60 * 60.0, "hourly_price_calculation")
         # check if the event is already there
-        found_items = filter(lambda d: d.value == new_event.value, self._events)
-        if len(found_items) == 0:
-            self._events.append(new_event)
-            self._hourly_price_list = []
+        if len(self._events.find(new_event.value)) == 0:
+            self._events.add(new_event)
+            self.reset_hourly_price()
 
     def assign_grid_controller(self, grid_controller_id):
         """set the grid controller for the device"""
@@ -152,6 +178,12 @@ class Device(NotificationReceiver, NotificationSender):
         self.set_power_level(0.0)
         self.write_calcs()
 
+    def on_kill(self, end_time=None):
+        """The simulation has ended, catch up on any quiescent events before end_time and finish"""
+        if not end_time is None:
+            self.fast_forward(end_time)
+        self.finish()
+
     def uuid(self):
         return self._uuid;
 
@@ -181,44 +213,57 @@ class Device(NotificationReceiver, NotificationSender):
     def set_next_scheduled_on_off_event(self):
         """If there's a schedule, find the next on/off event"""
         # check if there's already one scheduled
-        found = filter(lambda d: d.value in ['on', 'off'], self._events)
-        if len(found) == 0:
+        if len(self._events.find("on")) == 0 and len(self._events.find("off")) == 0:
             sched_event = self._scheduler.get_next_scheduled_task(self._time if self._is_initialized else self._time - 1)
-            self._events.append(sched_event)
-            self._logger.debug(self.build_message(message="set next on/off event {}".format(sched_event)))
+            # a calendar schedule may not have any more tasks
+            if not sched_event is None:
+                self._events.add(sched_event)
+                self._logger.debug(self.build_message(message="set next on/off event {}".format(sched_event)))
 
     def set_next_scheduled_price_event(self):
         """If there's a schedule, find the next price event"""
         # check if there's already one scheduled
-        found = filter(lambda d: d.name == "price", self._events)
-        if len(found) == 0:
+        if len(self._events.find_named("price")) == 0:
             sched_event = self._price_scheduler.get_next_scheduled_task(self._time if self._is_initialized else self._time - 1)
-            self._events.append(sched_event)
-            self._logger.debug(self.build_message(
-                message="set next price event {}".format(sched_event),
-                tag="next_price_event",
-                value=sched_event.ttie))
+            if not sched_event is None:
+                self._events.add(sched_event)
+                self._logger.debug(self.build_message(
+                    message="set next price event {}".format(sched_event),
+                    tag="next_price_event",
+                    value=sched_event.ttie))
 
     def set_price(self, new_price):
         """set the energy current price"""
         if self._price != new_price and not new_price is None:
             self._price = new_price
-            self._hourly_price_list.append(new_price)
+            self._hourly_price_sum += new_price
+            self._hourly_price_count += 1
             # send a message to the grid controller if there is one assigned
             # if not self._grid_controller_id is None:
                 # self.broadcast_new_price(self._price, self._grid_controller_id)
 
     def calculate_next_ttie(self):
         "calculate the next TTIE - look through the pending events for the one that will happen first"
-        found_event = None
-        # search through the non-scheduled events first
-        for event in self._events:
-            if (event.ttie > self._time or (found_event is None and not self._is_initialized)) and (found_event is None or (event.ttie < found_event.ttie)):
-                found_event = event
+        if self._is_initialized:
+            found_event = self._events.next_after(self._time)
+        else:
+            # before the device is initialized its first event is used even if it's due
+            found_event = None
+            for event in self._events:
+                if (event.ttie > self._time or found_event is None) and (found_event is None or (event.ttie < found_event.ttie)):
+                    found_event = event
 
         if not found_event is None and (self._ttie is None or self._ttie < found_event.ttie):
-            self.broadcast_new_ttie(found_event.ttie)
-            self._ttie = found_event.ttie
+            if self._fast_forward and self.is_quiescent_event(found_event):
+                # only wake up the device for the last wake up, it catches up on the ones before it then
+                wake_ups = self.quiescent_wake_ups(found_event)
+                self.broadcast_new_ttie(wake_ups[-1], skipped=wake_ups[:-1])
+                self._ttie = wake_ups[-1]
+                if len(wake_ups) > 1:
+                    self._next_skipped = wake_ups[0]
+            else:
+                self.broadcast_new_ttie(found_event.ttie)
+                self._ttie = found_event.ttie
             
         if found_event is None:
             self.broadcast_new_ttie(1e100)
@@ -274,10 +319,15 @@ class Device(NotificationReceiver, NotificationSender):
         else:
             raise Exception("broadcast_new_capacity has not been set for this device!")
 
-    def broadcast_new_ttie(self, new_ttie, debug_level=logging.DEBUG):
-        "Broadcast the new TTIE if a callback has been setup, otherwise raise an exception."
+    def broadcast_new_ttie(self, new_ttie, debug_level=logging.DEBUG, skipped=None):
+        """
+        Broadcast the new TTIE if a callback has been setup, otherwise raise an exception.
+        skipped are the times of the quiescent wake ups before new_ttie that the device isn't woken up for.
+        """
         if callable(self._broadcast_callback):
-            self._broadcast_callback(LpdmTtieEvent(target_device_id=self._device_id, value=new_ttie))
+            self._broadcast_callback(
+                LpdmTtieEvent(target_device_id=self._device_id, value=new_ttie, skipped=skipped)
+            )
         else:
             raise Exception("broadcast_new_ttie has not been set for this device!")
         return
@@ -339,7 +389,7 @@ class Device(NotificationReceiver, NotificationSender):
     def refresh(self):
         "Refresh the eud. For a basic eud this means resetting the operation schedule."
         self._ttie = None
-        self._events = []
+        self._events = EventStore()
 
         # turn on/off the device based on the updated schedule
         should_be_in_operation = self.should_be_in_operation()
@@ -356,51 +406,141 @@ class Device(NotificationReceiver, NotificationSender):
         for key in scenario.keys():
             setattr(self, "_" + key, scenario[key])
 
+    def update_config(self, config):
+        """
+        Change the configuration of a device during a simulation, used for the variants of a branched simulation.
+        The on/off and price schedules are rebuilt, other keys are set the same way as set_scenario.
+        """
+        for key, value in config.items():
+            if key == "schedule":
+                self._schedule_array = value
+                self._scheduler = None
+                for event in self._events.find("on") + self._events.find("off"):
+                    self._events.remove(event)
+                self.setup_on_off_schedule()
+                if self._scheduler:
+                    self.set_next_scheduled_on_off_event()
+            elif key == "price_schedule":
+                self._price_schedule_array = value
+                self._price_scheduler = None
+                for event in self._events.find_named("price"):
+                    self._events.remove(event)
+                self.setup_price_schedule()
+                if self._price_scheduler:
+                    self.set_next_scheduled_price_event()
+            else:
+                self.set_scenario({key: value})
+        self._logger.info(self.build_message("updated the device configuration {}".format(config)))
+        # the next event may now be earlier than the one the supervisor has
+        if callable(self._broadcast_callback):
+            self._ttie = None
+            self.calculate_next_ttie()
+
     def process_events(self):
         """Process any base class events"""
-        remove_items = []
-        for event in self._events:
-            if self._time >= event.ttie and event.value == "hourly_price_calculation":
+        for event in self._events.find("hourly_price_calculation"):
+            if self._time >= event.ttie:
                 self.calculate_hourly_price()
-                remove_items.append(event)
-        # remove the processed events from the list
-        for event in remove_items:
-            self._events.remove(event)
+                self._events.remove(event)
+
+    def quiescent_interval(self, event):
+        """
+        The interval an event repeats at while the device is quiescent, or None if the device has to be woken up for it.
+        A quiescent event is rescheduled at the interval after it's processed and doesn't cause the device to send any
+        events, so the device can skip its wake ups and process it later in fast_forward, which must give the same state
+        as processing it at its ttie.  The event has to stay quiescent until it's processed.
+        Devices that can be fast forwarded override this.
+        """
+        return None
 
-    def process_supervisor_event(self, the_event):
-        if isinstance(the_event, LpdmTtieEvent):
-            self.on_time_change(the_event.value)
-        elif isinstance(the_event, LpdmInitEvent):
-            self.init()
-        elif isinstance(the_event, LpdmPowerEvent):
-            self.on_power_change(
-                source_device_id=the_event.source_device_id,
-                target_device_id=the_event.target_device_id,
-                time=the_event.time,
-                new_power=the_event.value
-            )
-        elif isinstance(the_event, LpdmPriceEvent):
-            self.on_price_change(
-                source_device_id=the_event.source_device_id,
-                target_device_id=the_event.target_device_id,
-                time=the_event.time,
-                new_price=the_event.value
-            )
-        elif isinstance(the_event, LpdmCapacityEvent):
-            self.on_capacity_change(
-                source_device_id=the_event.source_device_id,
-                target_device_id=the_event.target_device_id,
-                time=the_event.time,
-                capacity=the_event.value
-            )
-        elif isinstance(the_event, LpdmConnectDeviceEvent):
-            self.add_device(the_event.device_id, the_event.DeviceClass, the_event.uuid)
-        elif isinstance(the_event, LpdmAssignGridControllerEvent):
-            self.assign_grid_controller(the_event.grid_controller_id)
-        elif isinstance(the_event, LpdmKillEvent):
-            self.finish()
+    def is_quiescent_event(self, event):
+        return not self.quiescent_interval(event) is None
+
+    def quiescent_wake_ups(self, found_event):
+        """
+        The times of the wake ups from the quiescent found_event up to the first one that isn't quiescent,
+        for a device that is woken up for each of its events and then sends its next ttie.
+        """
+        pending = [e for e in self._events if not self.is_quiescent_event(e)]
+        if len(filter(lambda e: e.ttie <= self._time, pending)):
+            # an event that's due is processed at the next wake up
+            return [found_event.ttie]
+        later = [e.ttie for e in pending if e.ttie > self._time]
+        wake_up = min(later) if len(later) else None
+        # [next ttie, interval] of the quiescent events
+        repeats = [[e.ttie, self.quiescent_interval(e)] for e in self._events if self.is_quiescent_event(e)]
+        wake_ups = []
+        time = found_event.ttie
+        while (wake_up is None or time < wake_up) and len(wake_ups) < MAX_QUIESCENT_WAKE_UPS:
+            wake_ups.append(time)
+            for r in repeats:
+                if r[0] <= time:
+                    r[0] = time + r[1]
+            time = min([r[0] for r in repeats])
+        if wake_up is None or time < wake_up:
+            wake_ups.append(time)
         else:
+            # the ttie of the first event at that time, the same as without skipping the wake ups
+            wake_ups.append(filter(lambda e: e.ttie == wake_up, self._events)[0].ttie)
+        return wake_ups
+
+    def fast_forward(self, time):
+        """
+        Catch up on the quiescent events before time that the device wasn't woken up for.
+        The events are processed in order of their ttie, the same way as when the device is woken up for them.
+        """
+        if self._next_skipped is None or time <= self._next_skipped:
+            return
+        while True:
+            skipped = [e for e in self._events.due(time) if e.ttie < time and self.is_quiescent_event(e)]
+            if not len(skipped):
+                break
+            first = min(skipped, key=lambda e: e.ttie)
+            self._time = first.ttie
+            self.process_events()
+            self.schedule_next_events()
+            if first in self._events:
+                raise Exception("Quiescent event {} was not processed".format(first))
+        # the wake ups from the device's ttie on aren't skipped
+        later = [e.ttie for e in self._events if self.is_quiescent_event(e) and e.ttie < self._ttie]
+        self._next_skipped = min(later) if len(later) else None
+
+    def build_event_handlers(self):
+        """
+        Build the table for looking up the handler of a supervisor event from its type code.
+        Subclasses that handle additional events should extend the table returned by this method.
+        """
+        return {
+            event_type.TTIE: lambda e: self.on_time_change(e.value),
+            event_type.INIT: lambda e: self.init(),
+            event_type.POWER_CHANGE: lambda e: self.on_power_change(
+                source_device_id=e.source_device_id,
+                target_device_id=e.target_device_id,
+                time=e.time,
+                new_power=e.value
+            ),
+            event_type.PRICE_CHANGE: lambda e: self.on_price_change(
+                source_device_id=e.source_device_id,
+                target_device_id=e.target_device_id,
+                time=e.time,
+                new_price=e.value
+            ),
+            event_type.CAPACITY_CHANGE: lambda e: self.on_capacity_change(
+                source_device_id=e.source_device_id,
+                target_device_id=e.target_device_id,
+                time=e.time,
+                capacity=e.value
+            ),
+            event_type.CONNECT_DEVICE: lambda e: self.add_device(e.device_id, e.DeviceClass, e.uuid),
+            event_type.ASSIGN_GRID_CONTROLLER: lambda e: self.assign_grid_controller(e.grid_controller_id),
+            event_type.KILL: lambda e: self.on_kill(e.value)
+        }
+
+    def process_supervisor_event(self, the_event):
+        handler = self._event_handlers.get(the_event.type_code)
+        if handler is None:
             raise Exception("Event {} not found".format(the_event))
+        handler(the_event)
 
     def sum_kwh(self):
         """Keep a running total of the energy used by the device"""
@@ -424,8 +564,8 @@ class Device(NotificationReceiver, NotificationSender):
     def calculate_hourly_price(self):
         """This should be called every hour to calculate the previous hour's average fuel price"""
         hour_avg = None
-        if len(self._hourly_price_list):
-            hour_avg = sum(self._hourly_price_list) / float(len(self._hourly_price_list))
+        if self._hourly_price_count:
+            hour_avg = self._hourly_price_sum / float(self._hourly_price_count)
         elif self._price is not None:
             hour_avg = self._price
         self._logger.debug(self.build_message(
@@ -434,8 +574,20 @@ class Device(NotificationReceiver, NotificationSender):
                 value=hour_avg
             ))
 
-        self._hourly_prices.append(hour_avg)
-        if len(self._hourly_prices) > 24:
-            # remove the oldest item if more than 24 hours worth of data
-            self._hourly_prices.pop(0)
-        self._hourly_price_list = []
+        # the window keeps the last 24 hours, there's nothing to add until there's a price
+        if not hour_avg is None and not self._shares_price_history:
+            self._hourly_prices.append(hour_avg)
+        self.reset_hourly_price()
+
+    def reset_hourly_price(self):
+        """Start tracking the price changes of a new hour"""
+        self._hourly_price_sum = 0
+        self._hourly_price_count = 0
+
+    def set_price_history(self, hourly_prices):
+        """
+        Use the hourly price window of another device that observes the same price, e.g. the battery of a
+        grid controller.  The window is updated by its owner, so this device stops adding its own hourly prices.
+        """
+        self._hourly_prices = hourly_prices
+        self._shares_price_history = True
@@ -0,0 +1,105 @@
+from array import array
+from bisect import bisect_left, bisect_right, insort
+
+class PriceWindow(object):
+    """
+    The last size hourly average prices, oldest first.
+    The prices are kept in a fixed size array used as a ring buffer along with a running sum and a sorted copy, so
+    adding a price and querying the average, min, max and percentiles don't look through the whole history.
+    A window can be shared by several devices, e.g. a grid controller and its battery, only its owner adds prices.
+    """
+    def __init__(self, size=24):
+        if not size > 0:
+            raise Exception("The price window size must be greater than 0 ({})".format(size))
+        self._size = int(size)
+        self._prices = array("d", [0.0] * self._size)
+        # index of the oldest price and the number of prices in the window
+        self._start = 0
+        self._count = 0
+        # running sum of the prices, with the compensation for the rounding error of the updates
+        self._sum = 0.0
+        self._sum_error = 0.0
+        # the prices in the window in sorted order
+        self._sorted = []
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        return iter([self._prices[(self._start + i) % self._size] for i in range(self._count)])
+
+    def __getitem__(self, i):
+        """The i'th price of the window, 0 is the oldest, -1 the newest"""
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("price window index out of range")
+        return self._prices[(self._start + i) % self._size]
+
+    def __repr__(self):
+        return "PriceWindow({})".format(list(self))
+
+    def size(self):
+        return self._size
+
+    def is_full(self):
+        return self._count == self._size
+
+    def append(self, price):
+        """Add the newest price, dropping the oldest if the window is full"""
+        price = float(price)
+        if self._count == self._size:
+            oldest = self._prices[self._start]
+            self._prices[self._start] = price
+            self._start = (self._start + 1) % self._size
+            self.add_to_sum(-oldest)
+            del self._sorted[bisect_left(self._sorted, oldest)]
+        else:
+            self._prices[(self._start + self._count) % self._size] = price
+            self._count += 1
+        self.add_to_sum(price)
+        insort(self._sorted, price)
+
+    def add_to_sum(self, value):
+        """Update the running sum, keeping track of the rounding error (Neumaier summation)"""
+        total = self._sum + value
+        if abs(self._sum) >= abs(value):
+            self._sum_error += (self._sum - total) + value
+        else:
+            self._sum_error += (value - total) + self._sum
+        self._sum = total
+
+    def clear(self):
+        self._start = 0
+        self._count = 0
+        self._sum = 0.0
+        self._sum_error = 0.0
+        self._sorted = []
+
+    def total(self):
+        return self._sum + self._sum_error if self._count else 0.0
+
+    def average(self):
+        """Average of the prices in the window, None if it's empty"""
+        return self.total() / self._count if self._count else None
+
+    def min(self):
+        return self._sorted[0] if self._count else None
+
+    def max(self):
+        return self._sorted[-1] if self._count else None
+
+    def percentile(self, percent):
+        """The nearest rank percentile (0-100) of the prices in the window, None if it's empty"""
+        if not self._count:
+            return None
+        if not 0 <= percent <= 100:
+            raise Exception("The percentile must be between 0 and 100 ({})".format(percent))
+        rank = int(-(-percent * self._count // 100))
+        return self._sorted[max(rank, 1) - 1]
+
+    def percent_rank(self, price):
+        """The fraction of the prices in the window that are <= price, None if it's empty"""
+        if not self._count:
+            return None
+        return bisect_right(self._sorted, price) / float(self._count)
@@ -15,6 +15,7 @@
     Base class for power sources (diesel generator, battery, pv, ...)
 """
 from device.base.device import Device
+from device.scheduler import EventStore
 from abc import ABCMeta, abstractmethod
 
 class PowerSource(Device):
@@ -26,7 +27,7 @@ class PowerSource(Device):
         self._current_capacity = 0.0
 
         self._current_fuel_price = config.get("current_fuel_price", None)
-        self._events = []
+        self._events = EventStore()
 
     @abstractmethod
     def on_power_change(self, source_device_id, target_device_id, time, power):
@@ -17,13 +17,19 @@
 from eud import Eud
 from hue_control import HueBridge
 from hue_light import HueLight
+from common.device_io import AsyncDriver
 
 class Light(Eud):
     def __init__(self, config = None):
         # call the super constructor
         Eud.__init__(self, config)
         self._hardware_link_bridge = HueBridge()
-        self._hardware_link_light  = HueLight(self._hardware_link_bridge, '1')
+        # commands to the light are sent in the background
+        self._hardware_link_light = AsyncDriver(
+            HueLight(self._hardware_link_bridge, '1'),
+            name=self._device_id,
+            timeout=config.get("io_timeout", 5.0) if type(config) is dict else 5.0
+        )
         print("light init")
 
     def turnOn(self):
@@ -34,7 +40,7 @@ class Light(Eud):
 
         # turn on the physical light
         # need to pass it a value from 1-255
-        self._hardware_link_light.on(int((255.0 - 1.0)/(100.0 - 0.0) * self._power_level))
+        self._hardware_link_light.send("on", int((255.0 - 1.0)/(100.0 - 0.0) * self._power_level))
 
     def turnOff(self):
         "Turn on the device - Override the base class method to add the functionality to interact with the light hardware"
@@ -44,4 +50,4 @@ class Light(Eud):
 
             # turn on the physical light
             # need to pass it a value from 1-255
-        self._hardware_link_light.off()
+        self._hardware_link_light.send("off")
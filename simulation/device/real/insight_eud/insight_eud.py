@@ -17,6 +17,7 @@ Implementation of a WeMo Insight based EUD device
 
 from eud import Eud
 from wemo_control.wemo_switch import WemoInsight
+from common.device_io import AsyncDriver
 
 
 class InsightEud(Eud):
@@ -31,13 +32,17 @@ class InsightEud(Eud):
         # Server on which WeMo connections are running
         self._insight_server_url = config["insight_server_url"] if type(config) is dict and "insight_server_url" in config.keys() else None
 
-        # Build hardware link
-        self._insight = WemoInsight(self._insight_name, self._insight_server_url)
+        # Build hardware link, the switch is turned on and off in the background
+        self._insight = AsyncDriver(
+            WemoInsight(self._insight_name, self._insight_server_url),
+            name=self._device_id,
+            timeout=config["io_timeout"] if type(config) is dict and "io_timeout" in config.keys() else 5.0
+        )
 
     # Override with device specific functions
     def turnOn(self):
         "Turns device attached to insight on"
-        self._insight.on()
+        self._insight.send("on")
         # call super
         Eud.turnOn(self)
 
@@ -45,7 +50,7 @@ class InsightEud(Eud):
     def turnOff(self):
         "Turns device attached to Insight off"
         print('*******turn off insight*******')
-        self._insight.off()
+        self._insight.send("off")
         # call super
         Eud.turnOff(self)
 
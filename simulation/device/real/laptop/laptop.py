@@ -17,6 +17,7 @@
 
 from insight_eud import InsightEud
 from laptop_power_control.remote_laptop_control import RemoteLaptopControl
+from common.device_io import AsyncDriver
 
 
 class Laptop(InsightEud):
@@ -53,9 +54,14 @@ class Laptop(InsightEud):
         # No laptop is set up, so IP is a dummy for now.
         self._insight_server_url = config['insight_server_url'] if type(config) is dict and 'insight_ipaddr' in config.keys() else None
         self._insight_name = config['insight_name'] if type(config) is dict and 'insight_name' in config.keys() else 'WeMo Insight'
-        self._laptop_link = RemoteLaptopControl(self.ipaddr)
-        self._current_plan = self._laptop_link.getPlan()
-        self._current_soc = self._laptop_link.getSoc()
+        # the laptop is read in the background, its last known state is used
+        self._laptop_link = AsyncDriver(
+            RemoteLaptopControl(self.ipaddr),
+            name="{}_laptop".format(config["device_id"]),
+            timeout=config.get("io_timeout", 5.0)
+        )
+        self._current_plan = self._laptop_link.read("getPlan")
+        self._current_soc = self.read_soc()
 
         # call the super constructor
         InsightEud.__init__(self, config)
@@ -70,6 +76,11 @@ class Laptop(InsightEud):
         InsightEud.onPriceChange(self, source_device_id, target_device_id, time, new_price)
         return
 
+    def read_soc(self):
+        "Returns the last known SOC of the laptop and refreshes it in the background"
+        soc = self._laptop_link.read("getSoc")
+        return self._current_soc if soc is None else soc
+
     def isCharging(self):
         return self._current_soc > 100
 
@@ -80,7 +91,7 @@ class Laptop(InsightEud):
     def setPowerLevel(self):
         "Set the power level of the Laptop"
         InsightEud.setPowerLevel(self)
-        soc = self._laptop_link.getSoc()
+        soc = self.read_soc()
         if soc < 20:
             self.turnOn(self._time)
         elif self._price > 40:
@@ -91,9 +102,9 @@ class Laptop(InsightEud):
     def updateStateOfCharge(self, time, load_on_laptop):
         "Updates state of charge and logs to tug logger"
         self._time = time
-        self._current_soc = self._laptop_link.getSoc()
+        self._current_soc = self.read_soc()
         if not self._last_update_time or time - self._last_update_time > self._min_soc_refresh_rate:
             if self._current_soc > 100:
-                self._current_soc = self._laptop_link.getSoc()
+                self._current_soc = self._laptop_link.last_known("getSoc", self._current_soc)
                 self.tugSendMessage(action="state_of_charge", is_initial_event=False, value=self._current_soc, description="")
             self._last_update_time = time
@@ -16,12 +16,18 @@
 """
 from eud import Eud
 from wemo_control.wemo_light import WemoLight
+from common.device_io import AsyncDriver
 
 class Light(Eud):
     def __init__(self, config = None):
         # call the super constructor
         Eud.__init__(self, config)
-        self._hardware_link = WemoLight('Lightbulb 01')
+        # commands to the light are sent in the background
+        self._hardware_link = AsyncDriver(
+            WemoLight('Lightbulb 01'),
+            name=self._device_id,
+            timeout=config.get("io_timeout", 5.0) if type(config) is dict else 5.0
+        )
         self.current_light_power = 0
 
     def turnOn(self):
@@ -38,7 +44,7 @@ class Light(Eud):
         # if self._power_level and self._in_operation:
         Eud.turnOff(self)
 
-        self._hardware_link.off()
+        self._hardware_link.send("off")
         self.current_light_power = 0
 
     def adjustHardwarePower(self):
@@ -50,5 +56,5 @@ class Light(Eud):
         new_light_power = int((255.0 - 1.0)/(self._max_power_use - 0.0) * self._power_level)
         if new_light_power and (not self.current_light_power or abs(new_light_power - self.current_light_power) >= 15):
             print('update light power {0}'.format(new_light_power))
-            self._hardware_link.on(new_light_power)
+            self._hardware_link.send("on", new_light_power)
             self.current_light_power = new_light_power
@@ -22,13 +22,17 @@ with open("/tmp/LPDM_light_pythonpath", "a") as f:
 #from eud import Eud
 from device.simulated.eud import Eud
 from philips_lights.light_driver import Light_Driver
-from common.smap_tools.smap_tools import download_most_recent_point
+from common.smap_tools import smap_tools
+from common.device_io import AsyncDriver
 import logging
 logging.basicConfig()
 logger = logging.getLogger(__name__)
 import json
 
 class Philips_Light(Eud):
+    # the light level is set for every price received
+    ignores_repeated_price = False
+
     def __init__(self, config = None):
         self._device_type = "philips_light"
         # Call super constructor
@@ -41,7 +45,10 @@ class Philips_Light(Eud):
         url = self.light_server_info.get("url")
         username = self.light_server_info.get("user") 
         pw = self.light_server_info.get("password")
-        self.driver = Light_Driver(url, (username, pw))
+        io_timeout = config.get("io_timeout", 5.0)
+        # the light level is set and the power is read in the background
+        self.driver = AsyncDriver(Light_Driver(url, (username, pw)), name=self._device_id, timeout=io_timeout)
+        self._smap_reader = AsyncDriver(smap_tools, name="{}_smap".format(self._device_id), timeout=io_timeout)
 
         
     def on_price_change(self, source_device_id, target_device_id, time, new_price):
@@ -54,10 +61,14 @@ class Philips_Light(Eud):
         super(Philips_Light, self).on_price_change(source_device_id, target_device_id, time, new_price)
         
     def lookup_power(self):
+        """The last known power use of the light, the current power level until the first reading is available"""
+        value = self._power_level
         if self._smap_info:
                 stream_info = self._smap_info.get("power", None)
                 if stream_info:
-                    _, ts, value = download_most_recent_point(stream_info["smap_root"], stream_info["stream"])
+                    point = self._smap_reader.read("download_most_recent_point", stream_info["smap_root"], stream_info["stream"])
+                    if not point is None:
+                        _, ts, value = point
 
         return value
 
@@ -68,6 +79,5 @@ class Philips_Light(Eud):
         super(Philips_Light, self).on_time_change(new_time)
         
     def set_light_level(self, light_level):
-        res = self.driver.set_light_level(light_level)        
-        return res
+        self.driver.send("set_light_level", light_level)
 
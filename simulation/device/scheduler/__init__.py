@@ -1,3 +1,5 @@
 from scheduler import Scheduler
 from schedule_item import ScheduleItem
 from lpdm_event import LpdmEvent
+from event_store import EventStore
+from compiled_schedule import compile_schedule, CompiledSchedule, CalendarSchedule
@@ -0,0 +1,205 @@
+"""
+Schedules compiled into sorted arrays of times and values, so the next scheduled task is found by bisection.
+
+A schedule is either the original list of [time, value, time_unit] items, which repeats its last day once it's
+past the end, or a calendar dict with daily schedules for the days of the week, weekdays/weekends and holidays:
+
+    {
+        "weekday": [[8, "on"], [17, "off"]],
+        "weekend": [[10, "on"], [14, "off"]],
+        "saturday": [[9, "on"], [12, "off"]],
+        "holiday": [],
+        "holidays": [0, 185],
+        "start_day_of_week": "monday"
+    }
+
+The times of a daily schedule are times of day.  "weekend" defaults to the "weekday" schedule, a day of the week
+("monday", ..., "sunday") defaults to the weekday/weekend schedule, and "holiday" is used on the simulation days
+listed in "holidays" (day 0 is the first day), it defaults to the weekend schedule.  "start_day_of_week" is the
+day of the week of day 0, a name or 0 (monday) to 6 (sunday).
+
+Identical schedules are compiled once and the compiled object is shared.
+"""
+import json
+import math
+from bisect import bisect_right
+from last_day_time import LastDayTime
+from schedule_item import ScheduleItem
+from lpdm_exception import LpdmScheduleInvalid
+
+SECS_IN_DAY = (24 * 60 * 60)
+DAY_NAMES = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+CALENDAR_KEYS = DAY_NAMES + ["weekday", "weekend", "holiday", "holidays", "start_day_of_week"]
+
+# compiled schedules by their json, shared by the devices with the same schedule
+_compiled = {}
+MAX_COMPILED = 10000
+
+def compile_schedule(schedule):
+    """The compiled schedule for a schedule list or calendar dict, identical schedules share one compiled object"""
+    if not type(schedule) in (list, dict):
+        raise Exception("Schedule is not a List or a dict object.")
+    # sorting the keys is slow in python 2, and a schedule list is already in order
+    key = json.dumps(schedule, sort_keys=type(schedule) is dict)
+    compiled = _compiled.get(key)
+    if compiled is None:
+        compiled = CalendarSchedule(schedule) if type(schedule) is dict else CompiledSchedule(schedule)
+        if len(_compiled) >= MAX_COMPILED:
+            _compiled.clear()
+        _compiled[key] = compiled
+    return compiled
+
+def parse_items(schedule):
+    """Build the ScheduleItems of a schedule list"""
+    last_day_time = LastDayTime()
+    items = []
+    for schedule_item in schedule:
+        if type(schedule_item) is list:
+            if len(schedule_item) in (2,3):
+                items.append(ScheduleItem(last_day_time, *schedule_item))
+        elif type(schedule_item) is dict:
+            items.append(ScheduleItem(last_day_time, **schedule_item))
+    return items
+
+def is_sorted(values):
+    return all(values[i] <= values[i + 1] for i in range(len(values) - 1))
+
+class CompiledSchedule(object):
+    """
+    A schedule list, the items are in order of (day, time) so the next one is found by bisecting their times
+    (seconds since the start of day 0).  Past the last item the last day of the schedule repeats.
+    """
+    def __init__(self, schedule):
+        self.items = parse_items(schedule)
+        self.times = [item.day * SECS_IN_DAY + item.time for item in self.items]
+        self.values = [item.value for item in self.items]
+        # the items of the last day, which repeats after the end of the schedule
+        first = len(self.items) - 1
+        while first > 0 and self.items[first - 1].day == self.items[-1].day:
+            first -= 1
+        self.last_day_times = [item.time for item in self.items[first:]]
+        self.last_day_values = [item.value for item in self.items[first:]]
+        # time units can be mixed so that the items aren't in order, those schedules are searched in order
+        self.is_sorted = (
+            is_sorted(self.times) and is_sorted(self.last_day_times)
+            and all(item.day == int(item.day) for item in self.items)
+        )
+
+    def __repr__(self):
+        return "CompiledSchedule({})".format(self.items)
+
+    def next_task(self, time_seconds):
+        """The (ttie, value) of the next scheduled task after time_seconds, None if the schedule is empty"""
+        if not len(self.items):
+            return None
+        if not self.is_sorted:
+            return self.next_task_in_order(time_seconds)
+        # calculate the current day number and the number of seconds that have elapsed since midnight
+        day = int(time_seconds / SECS_IN_DAY)
+        secs = time_seconds % SECS_IN_DAY
+
+        i = bisect_right(self.times, day * SECS_IN_DAY + secs)
+        if i < len(self.times):
+            task_time = self.items[i].time
+            value = self.values[i]
+        else:
+            # past the end of the schedule, so repeat the last day
+            i = bisect_right(self.last_day_times, secs)
+            if i == len(self.last_day_times):
+                i = 0
+            task_time = self.last_day_times[i]
+            value = self.last_day_values[i]
+
+        ttie = (day * SECS_IN_DAY) + task_time
+        if ttie <= time_seconds:
+            ttie += SECS_IN_DAY
+        return (ttie, value)
+
+    def next_task_in_order(self, time_seconds):
+        """Look through the items in order for the next task, for the schedules with items out of order"""
+        day = int(time_seconds / SECS_IN_DAY)
+        secs = time_seconds % SECS_IN_DAY
+
+        found_item = None
+        for item in self.items:
+            if (item.day == day and item.time > secs) or item.day > day:
+                found_item = item
+                break
+
+        if found_item is None:
+            # repeat the last day of the schedule
+            last_day_items = []
+            for item in self.items[::-1]:
+                if item.day != self.items[-1].day:
+                    break
+                last_day_items.insert(0, item)
+            if secs < last_day_items[0].time or secs >= last_day_items[-1].time:
+                found_item = last_day_items[0]
+            else:
+                for item in last_day_items:
+                    found_item = item
+                    if item.time > secs:
+                        break
+
+        ttie = (day * SECS_IN_DAY) + found_item.time
+        if ttie <= time_seconds:
+            ttie += SECS_IN_DAY
+        return (ttie, found_item.value)
+
+class DailySchedule(object):
+    """The sorted times of day and values of one day's schedule"""
+    def __init__(self, schedule):
+        if not type(schedule) is list:
+            raise LpdmScheduleInvalid("A daily schedule must be a list ({})".format(schedule))
+        # the times are times of day, so they don't roll over to the next day like in a schedule list
+        items = sorted(parse_items(schedule), key=lambda item: item.time)
+        self.times = [item.time for item in items]
+        self.values = [item.value for item in items]
+
+class CalendarSchedule(object):
+    """A weekly schedule with weekday/weekend and holiday variants, see the module docstring"""
+    def __init__(self, schedule):
+        unknown = [key for key in schedule.keys() if not key in CALENDAR_KEYS]
+        if len(unknown):
+            raise LpdmScheduleInvalid("Unknown calendar schedule keys {}".format(unknown))
+        weekday = schedule.get("weekday", [])
+        weekend = schedule.get("weekend", weekday)
+        self.days_of_week = [
+            DailySchedule(schedule.get(name, weekend if i >= 5 else weekday)) for (i, name) in enumerate(DAY_NAMES)
+        ]
+        self.holiday = DailySchedule(schedule.get("holiday", weekend))
+        self.holidays = set(schedule.get("holidays", []))
+        start_day_of_week = schedule.get("start_day_of_week", 0)
+        if start_day_of_week in DAY_NAMES:
+            start_day_of_week = DAY_NAMES.index(start_day_of_week)
+        if not start_day_of_week in range(7):
+            raise LpdmScheduleInvalid("Invalid start_day_of_week ({})".format(start_day_of_week))
+        self.start_day_of_week = start_day_of_week
+        # a task can only be found if some day has one
+        self.is_empty = not any(len(daily.times) for daily in self.days_of_week + [self.holiday])
+        # the last day that can be a holiday, after it the days of the week repeat
+        self.last_holiday = max(self.holidays) if len(self.holidays) else None
+
+    def daily_schedule(self, day):
+        """The schedule of a simulation day"""
+        if day in self.holidays:
+            return self.holiday
+        return self.days_of_week[(self.start_day_of_week + day) % 7]
+
+    def next_task(self, time_seconds):
+        """The (ttie, value) of the next scheduled task after time_seconds, None if there isn't one"""
+        if self.is_empty:
+            return None
+        day = int(math.floor(time_seconds / float(SECS_IN_DAY)))
+        secs = time_seconds - day * SECS_IN_DAY
+        daily = self.daily_schedule(day)
+        i = bisect_right(daily.times, secs)
+        # at most a week after the last holiday there's a day with a task, unless only the holidays have tasks
+        last_day = max(day, self.last_holiday) + 7 if not self.last_holiday is None else day + 7
+        while i == len(daily.times):
+            day += 1
+            if day > last_day:
+                return None
+            daily = self.daily_schedule(day)
+            i = 0
+        return (day * SECS_IN_DAY + daily.times[i], daily.values[i])
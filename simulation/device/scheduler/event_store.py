@@ -0,0 +1,149 @@
+import heapq
+from operator import itemgetter
+
+class EventStore(object):
+    """
+    The pending LpdmEvents of a device.
+    The events are kept in a heap ordered by ttie, then by the order they were added, with an index by (name, value)
+    for finding an event without looking through all of them.  Removed events are dropped from the heap lazily.
+    Iterating over the store gives the events in the order they were added, the same as the list it replaces.
+    """
+    def __init__(self, events=None):
+        # [ttie, sequence number, event], the event is None once it's been removed
+        self._heap = []
+        self._count = 0
+        # (name, value) -> heap entries of the events with that name and value, in the order they were added
+        self._index = {}
+        self._removed = 0
+        if events:
+            for event in events:
+                self.add(event)
+
+    def __len__(self):
+        return len(self._heap) - self._removed
+
+    def __iter__(self):
+        entries = sorted([entry for entry in self._heap if not entry[2] is None], key=lambda entry: entry[1])
+        return iter([entry[2] for entry in entries])
+
+    def __contains__(self, event):
+        return not self.find_entry(event) is None
+
+    def __repr__(self):
+        return "EventStore({})".format(list(self))
+
+    def add(self, event):
+        """Add a pending event"""
+        entry = [event.ttie, self._count, event]
+        self._count += 1
+        heapq.heappush(self._heap, entry)
+        self._index.setdefault((event.name, event.value), []).append(entry)
+
+    def find_entry(self, event):
+        for entry in self._index.get((event.name, event.value), []):
+            if entry[2] is event:
+                return entry
+        return None
+
+    def remove(self, event):
+        """Remove a pending event, raises ValueError if it isn't in the store"""
+        entry = self.find_entry(event)
+        if entry is None:
+            raise ValueError("{} is not in the event store".format(event))
+        entries = self._index[(event.name, event.value)]
+        entries.remove(entry)
+        if not len(entries):
+            del self._index[(event.name, event.value)]
+        entry[2] = None
+        heap = self._heap
+        if heap[0] is entry:
+            heapq.heappop(heap)
+        else:
+            self._removed += 1
+        # drop the removed events from the top of the heap, and rebuild the heap when most of it has been removed
+        while len(heap) and heap[0][2] is None:
+            heapq.heappop(heap)
+            self._removed -= 1
+        if self._removed > 16 and self._removed * 2 > len(heap):
+            self._heap = [entry for entry in self._heap if not entry[2] is None]
+            heapq.heapify(self._heap)
+            self._removed = 0
+
+    def clear(self):
+        """Remove all of the events"""
+        self._heap = []
+        self._index = {}
+        self._removed = 0
+
+    def find(self, value, name=None):
+        """The events with the value and name, in the order they were added"""
+        return [entry[2] for entry in self._index.get((name, value), [])]
+
+    def find_named(self, name):
+        """The events with the name, in the order they were added"""
+        entries = []
+        for key, key_entries in self._index.items():
+            if key[0] == name:
+                entries.extend(key_entries)
+        return [entry[2] for entry in sorted(entries, key=lambda entry: entry[1])]
+
+    def has(self, value, ttie, name=None):
+        """Is there an event with the value and name at ttie?"""
+        for entry in self._index.get((name, value), []):
+            if entry[0] == ttie:
+                return True
+        return False
+
+    def first(self):
+        """The event with the earliest ttie, the one added first when there are several at the same time"""
+        # removed events are never left at the top of the heap
+        return self._heap[0][2] if len(self._heap) else None
+
+    def due(self, time):
+        """The events with ttie <= time, in the order they were added"""
+        heap = self._heap
+        if not len(heap) or heap[0][0] > time:
+            return []
+        # the entries at or before time are at the top of the heap
+        n = len(heap)
+        entries = []
+        stack = [0]
+        while len(stack):
+            i = stack.pop()
+            entry = heap[i]
+            if entry[0] <= time:
+                if not entry[2] is None:
+                    entries.append(entry)
+                i = 2 * i + 1
+                if i < n:
+                    stack.append(i)
+                    if i + 1 < n:
+                        stack.append(i + 1)
+        if len(entries) > 1:
+            entries.sort(key=itemgetter(1))
+        return [entry[2] for entry in entries]
+
+    def next_after(self, time):
+        """The first event with ttie > time, the one added first when there are several at the same time"""
+        heap = self._heap
+        if not len(heap):
+            return None
+        if heap[0][0] > time:
+            return heap[0][2]
+        n = len(heap)
+        found = None
+        stack = [0]
+        while len(stack):
+            i = stack.pop()
+            entry = heap[i]
+            if entry[0] > time and not entry[2] is None:
+                # the children of the entry come after it
+                if found is None or entry[:2] < found[:2]:
+                    found = entry
+            else:
+                i = 2 * i + 1
+                if i < n:
+                    stack.append(i)
+                    if i + 1 < n:
+                        stack.append(i + 1)
+        return None if found is None else found[2]
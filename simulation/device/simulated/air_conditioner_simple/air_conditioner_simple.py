@@ -19,6 +19,8 @@ from device.scheduler import LpdmEvent
 from common.outdoor_temperature import OutdoorTemperature
 
 class AirConditionerSimple(Device):
+    ignores_repeated_price = True
+
     def __init__(self, config):
         # call the super constructor
         Device.__init__(self, config)
@@ -117,6 +119,7 @@ class AirConditionerSimple(Device):
 
     def on_power_change(self, source_device_id, target_device_id, time, new_power):
         "Receives messages when a power change has occured"
+        self.fast_forward(time)
         if target_device_id == self._device_id:
             if new_power == 0 and self._in_operation:
                 self._time = time
@@ -124,6 +127,7 @@ class AirConditionerSimple(Device):
 
     def on_price_change(self, source_device_id, target_device_id, time, new_price):
         "Receives message when a price change has occured"
+        self.fast_forward(time)
         if not self._static_price and target_device_id == self._device_id:
             self._time = time
             if new_price != self._price:
@@ -143,13 +147,15 @@ class AirConditionerSimple(Device):
 
     def on_time_change(self, new_time):
         "Receives message when time for an 'initial event' change has occured"
+        self.fast_forward(new_time)
         self._time = new_time
         self.process_events()
         self.schedule_next_events()
         self.calculate_next_ttie()
 
-    def on_capacity_change(self, source_device_id, target_device_id, time, value):
+    def on_capacity_change(self, source_device_id, target_device_id, time, capacity):
         """A device has changed its capacity, check if the ac should be in operation"""
+        self.fast_forward(time)
         self._time = time
         if not self._in_operation and self.should_be_in_operation():
             self._logger.debug(
@@ -173,21 +179,20 @@ class AirConditionerSimple(Device):
 
         # loop through the current events
         remove_items = []
-        for event in self._events:
-            if event.ttie <= self._time:
-                events_occurred[event.value] = True
-                remove_items.append(event)
+        for event in self._events.due(self._time):
+            events_occurred[event.value] = True
+            remove_items.append(event)
 
         if events_occurred["on"]:
             # self._logger.debug(self.build_message(message="on event found"))
             self.turn_on()
-            found = filter(lambda d: d.value == "on", self._events)
+            found = self._events.find("on")
             if len(found):
                 self._current_event = found[0]
         elif events_occurred["off"]:
             # self._logger.debug(self.build_message(message="off event found"))
             self.turn_off()
-            found = filter(lambda d: d.value == "off", self._events)
+            found = self._events.find("off")
             if len(found):
                 self._current_event = found[0]
 
@@ -204,6 +209,22 @@ class AirConditionerSimple(Device):
         for event in remove_items:
             self._events.remove(event)
 
+    def quiescent_interval(self, event):
+        """
+        While the ac isn't in operation and isn't scheduled to be on, the periodic events don't turn on the compressor,
+        so the indoor temperature, outdoor temperature and set point can be updated when the ac catches up.
+        Precooling can turn on the ac from those events, so an ac with precooling is always woken up.
+        """
+        if self._in_operation or self._precooling_enabled or self.should_be_in_operation():
+            return None
+        elif event.value == "update_outdoor_temperature":
+            return self._temperature_update_interval
+        elif event.value == "reasses_setpoint":
+            return self._setpoint_reassesment_interval
+        elif event.value == "hourly_price_calculation":
+            return 60 * 60.0
+        return None
+
     def schedule_next_events(self):
         "Schedule upcoming events if necessary"
         Device.schedule_next_events(self)
@@ -215,9 +236,8 @@ class AirConditionerSimple(Device):
         "set the next event to calculate the set point"
         new_event = LpdmEvent(self._time + self._setpoint_reassesment_interval, "reasses_setpoint")
         # check if the event is already there
-        found_items = filter(lambda d: d.ttie == new_event.ttie and d.value == new_event.value, self._events)
-        if len(found_items) == 0:
-            self._events.append(new_event)
+        if not self._events.has(new_event.value, new_event.ttie):
+            self._events.add(new_event)
 
     def set_new_fuel_price(self, new_price):
         """Set a new fuel price"""
@@ -377,9 +397,8 @@ class AirConditionerSimple(Device):
         """schedule the next temperature update (in one hour)"""
         new_event = LpdmEvent(self._time + self._temperature_update_interval, "update_outdoor_temperature")
         # check if the event is already there
-        found_items = filter(lambda d: d.ttie == new_event.ttie and d.value == new_event.value, self._events)
-        if len(found_items) == 0:
-            self._events.append(new_event)
+        if not self._events.has(new_event.value, new_event.ttie):
+            self._events.add(new_event)
 
     def process_outdoor_temperature_change(self):
         """Update the current outdoor temperature"""
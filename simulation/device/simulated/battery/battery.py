@@ -101,6 +101,12 @@ class Battery(PowerSource):
         self._status_logic = LogicClass(self)
         self._logger.info(self.build_message("Set status logic class to {}".format(LogicClass)))
 
+    def update_config(self, config):
+        """Change the configuration of the battery, reload the status logic if it's changed"""
+        PowerSource.update_config(self, config)
+        if "status_logic_class_name" in config:
+            self.set_status_logic()
+
     def set_event_list(self, events):
         """Set the event list to one that has been passed in"""
         self._events = events
@@ -109,10 +115,6 @@ class Battery(PowerSource):
         """Set the power source manager"""
         self.power_source_manager = psm
 
-    def set_price_history(self, hourly_prices):
-        """Set the hourly_price list (shared from the gc)"""
-        self._hourly_prices = hourly_prices
-
     def get_load(self):
         """Get the current load on the battery"""
         return self._power_level
@@ -346,12 +348,11 @@ class Battery(PowerSource):
     def process_events(self):
         """Process any events that need to be processed"""
         remove_items = []
-        for event in self._events:
-            if event.ttie <= self._time:
-                if event.value == "battery_status":
-                    # self.update_status()
-                    self.power_source_manager.optimize_load()
-                    remove_items.append(event)
+        for event in self._events.due(self._time):
+            if event.value == "battery_status":
+                # self.update_status()
+                self.power_source_manager.optimize_load()
+                remove_items.append(event)
 
         # remove the processed events from the list
         for event in remove_items:
@@ -359,17 +360,15 @@ class Battery(PowerSource):
 
     def schedule_next_events(self):
         """Set up any events that needs to be processed in the future"""
-        items = filter(lambda e: e.value == "battery_status", self._events)
-        if len(items) == 0:
+        if len(self._events.find("battery_status")) == 0:
             self.set_next_battery_update_event()
 
     def set_next_battery_update_event(self):
         "If the battery is on update its state of charge every X number of seconds"
         new_event = LpdmEvent(self._time + self._check_soc_rate, "battery_status")
         # check if the event is already there
-        found_items = filter(lambda d: d.ttie == new_event.ttie and d.value == "battery_status", self._events)
-        if len(found_items) == 0:
-            self._events.append(new_event)
+        if not self._events.has("battery_status", new_event.ttie):
+            self._events.add(new_event)
 
     def sum_charge_kwh(self):
         """Keep a running total of the energy used for charging"""
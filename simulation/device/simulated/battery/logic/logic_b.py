@@ -24,9 +24,9 @@ class LogicB(object):
     def calculate_price_thresholds(self):
         if not len(self.di._hourly_prices):
             return
-        avg_24 = sum(self.di._hourly_prices) / len(self.di._hourly_prices)
-        min_24 = min(self.di._hourly_prices)
-        max_24 = max(self.di._hourly_prices)
+        avg_24 = self.di._hourly_prices.average()
+        min_24 = self.di._hourly_prices.min()
+        max_24 = self.di._hourly_prices.max()
 
         # set the starting/ending threshold at 10% above/below the average
         price_threshold_discharge = avg_24 * 1.10
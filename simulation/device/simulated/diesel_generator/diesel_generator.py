@@ -148,12 +148,7 @@ class DieselGenerator(PowerSource):
 
     def remove_refresh_events(self):
         "Remove events that need to be recalculated when the device status is refreshed.  For the diesel generator this is just the refuel event."
-        next_refuels = []
-        for event in self._events:
-            if event.value == 'refuel':
-                next_refuels.append(event)
-
-        for event in next_refuels:
+        for event in self._events.find("refuel"):
             self._events.remove(event)
 
     def on_power_change(self, source_device_id, target_device_id, time, new_power):
@@ -212,17 +207,15 @@ class DieselGenerator(PowerSource):
         "Setup the next event for the calculation of the hourly consumption"
         new_event = LpdmEvent(self._time + 60 * 60, "hourly_consumption")
         # check if the event is already there
-        found_items = filter(lambda d: d.ttie == new_event.ttie and d.value == "hourly_consumption", self._events)
-        if len(found_items) == 0:
-            self._events.append(new_event)
+        if not self._events.has("hourly_consumption", new_event.ttie):
+            self._events.add(new_event)
 
     def set_next_price_change_event(self):
         "Setup the next event for a price change"
         new_event = LpdmEvent(self._time + self._price_reassess_time, "price")
         # check if the event is already there
-        found_items = filter(lambda d: d.ttie == new_event.ttie and d.value == "price", self._events)
-        if len(found_items) == 0:
-            self._events.append(new_event)
+        if not self._events.has("price", new_event.ttie):
+            self._events.add(new_event)
 
     def set_next_reasses_fuel_change_event(self):
         "Setup the next event for reassessing the fuel level"
@@ -232,32 +225,28 @@ class DieselGenerator(PowerSource):
             new_event = LpdmEvent(self._time + 60 * 60 * 6, "reasses_fuel")
 
         # check if the event is already there
-        found_items = filter(lambda d: d.ttie == new_event.ttie and d.value == "reasses_fuel", self._events)
-        if len(found_items) == 0:
-            self._events.append(new_event)
+        if not self._events.has("reasses_fuel", new_event.ttie):
+            self._events.add(new_event)
 
     def set_initial_price_event(self):
         """Let all other devices know of the initial price of energy"""
         new_event = LpdmEvent(0, "emit_initial_price")
         # check if the event is already there
-        found_items = filter(lambda d: d.ttie == new_event.ttie and d.value == "emit_initial_price", self._events)
-        if len(found_items) == 0:
-            self._events.append(new_event)
+        if not self._events.has("emit_initial_price", new_event.ttie):
+            self._events.add(new_event)
 
     def set_initial_capacity_event(self):
         """Let all other devices know of the initial price of energy"""
         new_event = LpdmEvent(0, "emit_initial_capacity")
         # check if the event is already there
-        found_items = filter(lambda d: d.ttie == new_event.ttie and d.value == "emit_initial_capacity", self._events)
-        if len(found_items) == 0:
-            self._events.append(new_event)
+        if not self._events.has("emit_initial_capacity", new_event.ttie):
+            self._events.add(new_event)
 
     def set_next_refuel_event(self):
         new_event = LpdmEvent(self._time + self._days_to_refuel * 3600.0 * 24.0, "refuel")
         # check if the event is already there
-        found_items = filter(lambda d: d.ttie == new_event.ttie and d.value == "refuel", self._events)
-        if len(found_items) == 0:
-            self._events.append(new_event)
+        if not self._events.has("refuel", new_event.ttie):
+            self._events.add(new_event)
 
     def log_power_change(self, time, power):
         "Store the changes in power usage"
@@ -267,33 +256,32 @@ class DieselGenerator(PowerSource):
         "Process any events that need to be processed"
         PowerSource.process_events(self)
         remove_items = []
-        for event in self._events:
-            if event.ttie <= self._time:
-                if event.value == "price":
-                    if self.is_on():
-                        self.update_fuel_level()
-                        self.calculate_electricity_price()
-
-                    self.set_next_price_change_event()
-                    remove_items.append(event)
-                elif event.value == "hourly_consumption":
-                    self.calculate_hourly_consumption(is_initial_event=True)
-                    self.set_next_hourly_consumption_calculation_event()
-                    remove_items.append(event)
-                elif event.value == "reasses_fuel":
-                    self.reasses_fuel()
-                    self.set_next_reasses_fuel_change_event()
-                    remove_items.append(event)
-                elif event.value == "refuel":
-                    self.refuel()
-                    self.set_next_refuel_event()
-                    remove_items.append(event)
-                elif event.value == "emit_initial_price":
+        for event in self._events.due(self._time):
+            if event.value == "price":
+                if self.is_on():
+                    self.update_fuel_level()
                     self.calculate_electricity_price()
-                    remove_items.append(event)
-                elif event.value == "emit_initial_capacity":
-                    self.broadcast_new_capacity()
-                    remove_items.append(event)
+
+                self.set_next_price_change_event()
+                remove_items.append(event)
+            elif event.value == "hourly_consumption":
+                self.calculate_hourly_consumption(is_initial_event=True)
+                self.set_next_hourly_consumption_calculation_event()
+                remove_items.append(event)
+            elif event.value == "reasses_fuel":
+                self.reasses_fuel()
+                self.set_next_reasses_fuel_change_event()
+                remove_items.append(event)
+            elif event.value == "refuel":
+                self.refuel()
+                self.set_next_refuel_event()
+                remove_items.append(event)
+            elif event.value == "emit_initial_price":
+                self.calculate_electricity_price()
+                remove_items.append(event)
+            elif event.value == "emit_initial_capacity":
+                self.broadcast_new_capacity()
+                remove_items.append(event)
 
         # remove the processed events from the list
         if len(remove_items):
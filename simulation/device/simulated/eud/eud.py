@@ -18,6 +18,8 @@ from device.base.device import Device
 import logging
 
 class Eud(Device):
+    ignores_repeated_price = True
+
     def __init__(self, config = None):
         # call the super constructor
         Device.__init__(self, config)
@@ -144,18 +146,17 @@ class Eud(Device):
         Device.process_events(self)
 
         remove_items = []
-        for event in self._events:
-            if event.ttie <= self._time:
-                if event.value == "off":
-                    if self._in_operation:
-                        self.turn_off()
-                    remove_items.append(event)
-                    self._current_event = event
-                elif event.value == "on" and not self._in_operation:
-                    if not self._in_operation:
-                        self.turn_on()
-                    remove_items.append(event)
-                    self._current_event = event
+        for event in self._events.due(self._time):
+            if event.value == "off":
+                if self._in_operation:
+                    self.turn_off()
+                remove_items.append(event)
+                self._current_event = event
+            elif event.value == "on" and not self._in_operation:
+                if not self._in_operation:
+                    self.turn_on()
+                remove_items.append(event)
+                self._current_event = event
 
         # remove the processed events from the list
         if len(remove_items):
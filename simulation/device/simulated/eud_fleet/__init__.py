@@ -0,0 +1 @@
+from eud_fleet import EudFleet
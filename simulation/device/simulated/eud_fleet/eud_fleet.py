@@ -0,0 +1,256 @@
+################################################################################################################################
+# *** Copyright Notice ***
+#
+# "Price Based Local Power Distribution Management System (Local Power Distribution Manager) v1.0"
+# Copyright (c) 2016, The Regents of the University of California, through Lawrence Berkeley National Laboratory
+# (subject to receipt of any required approvals from the U.S. Dept. of Energy).  All rights reserved.
+#
+# If you have questions about your rights to use or distribute this software, please contact
+# Berkeley Lab's Innovation & Partnerships Office at  IPO@lbl.gov.
+################################################################################################################################
+
+"""
+    A fleet of simple euds of the same type run in fixed time steps.
+
+    The state of the members is held in numpy arrays and all of them are advanced together at each step.
+    The grid controller sees the fleet as one device: the fleet sends it the total power of its members
+    and the grid controller's price is applied to every member.
+"""
+import logging
+from device.base.device import Device
+from device.scheduler import Scheduler
+from common.outdoor_temperature import OutdoorTemperature
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class EudFleet(Device):
+    ignores_repeated_price = True
+
+    def __init__(self, config):
+        if np is None:
+            raise Exception("The eud_fleet device requires numpy.")
+        # call the super constructor
+        Device.__init__(self, config)
+
+        self._device_type = "eud_fleet"
+        self._device_name = config.get("device_name", "eud_fleet")
+
+        # the device type of the members, eud or air_conditioner_simple
+        self._member_type = config.get("member_type", "eud")
+        if not self._member_type in ["eud", "air_conditioner_simple"]:
+            raise Exception("Unable to run a fleet of {} devices.".format(self._member_type))
+        # seconds between the steps
+        self._timestep = float(config.get("timestep", 60.0))
+
+        members = config.get("members", [])
+        self._member_ids = [m["device_id"] for m in members]
+        self._schedule_arrays = [m.get("schedule", None) for m in members]
+        # the on/off scheduler of each member, built on init
+        self._schedulers = None
+
+        is_ac = self._member_type == "air_conditioner_simple"
+        self._max_power = self.member_array(members, "max_power_output", 500.0 if is_ac else 0.0)
+        self._member_price = self.member_array(members, "price", 0.1)
+        self._member_static_price = self.member_array(members, "static_price", False, dtype=bool)
+        self._in_operation_members = np.zeros(len(members), dtype=bool)
+        self._member_power = np.zeros(len(members))
+        # is the member scheduled to be on, and the time and value of its next on/off event
+        self._scheduled_on = np.zeros(len(members), dtype=bool)
+        self._next_switch_time = np.full(len(members), np.inf)
+        self._next_switch_on = np.zeros(len(members), dtype=bool)
+
+        if is_ac:
+            self._temperature = self.member_array(members, "current_temperature", 25.0)
+            self._set_point = self.member_array(members, "set_point", 23.0)
+            self._temperature_max_delta = self.member_array(members, "temperature_max_delta", 0.5)
+            # C/hr while the compressor is on, and per C of indoor/outdoor difference
+            self._temperature_change_rate_hr_comp = self.member_array(members, "temperature_change_rate_hr_comp", 2.0)
+            self._temperature_change_rate_hr_oa = self.member_array(members, "temperature_change_rate_hr_oa", 0.1)
+            self._compressor_is_on = np.zeros(len(members), dtype=bool)
+            self._outdoor_temperature = None
+            self._current_outdoor_temperature = None
+            self._temperature_update_interval = 60.0 * 5.0
+            self._next_temperature_update_time = self._temperature_update_interval
+            self._last_temperature_update_time = 0.0
+        else:
+            self._price_dim_start = self.member_array(members, "price_dim_start", 0.3)
+            self._price_dim_end = self.member_array(members, "price_dim_end", 0.7)
+            self._price_off = self.member_array(members, "price_off", 0.9)
+            self._power_level_low = self.member_array(members, "power_level_low", 20.0)
+            # power doesn't depend on the price
+            self._constant_power_output = (
+                self.member_array(members, "constant_power_output", False, dtype=bool) | self._member_static_price
+            )
+
+        self._units = "W"
+
+    def member_array(self, members, key, default, dtype=float):
+        """Array of a configuration value of the members"""
+        return np.array([m.get(key, default) for m in members], dtype=dtype)
+
+    def init(self):
+        """Build the members' schedules and schedule the first step"""
+        self._schedulers = []
+        for i, schedule_array in enumerate(self._schedule_arrays):
+            scheduler = None
+            if type(schedule_array) in (list, dict):
+                scheduler = Scheduler(schedule_array)
+                scheduler.parse_schedule()
+                # the same as a device that isn't initialized, an event at t=0 is included
+                self.set_next_switch(i, scheduler.get_next_scheduled_task(self._time - 1))
+            self._schedulers.append(scheduler)
+        if self._member_type == "air_conditioner_simple":
+            self._outdoor_temperature = OutdoorTemperature()
+            self._outdoor_temperature.init()
+        self._ttie = self._time
+        self.broadcast_new_ttie(self._ttie)
+
+    def set_next_switch(self, i, task):
+        """Set the next on/off event of member i"""
+        if task is None:
+            self._next_switch_time[i] = np.inf
+        else:
+            self._next_switch_time[i] = task.ttie
+            self._next_switch_on[i] = task.value == "on"
+
+    def status(self):
+        return {
+            "type": self._device_type,
+            "name": self._device_name,
+            "member_type": self._member_type,
+            "members": len(self._member_ids),
+            "in_operation": int(np.sum(self._in_operation_members)),
+            "power_level": self._power_level
+        }
+
+    def on_time_change(self, new_time):
+        """Advance the members to new_time and schedule the next step"""
+        self._time = new_time
+        self.step()
+        self._ttie = new_time + self._timestep
+        self.broadcast_new_ttie(self._ttie)
+
+    def step(self):
+        """Process the members' on/off events, then update their temperature and compressors"""
+        due = self._next_switch_time <= self._time
+        if due.any():
+            turn_on = due & self._next_switch_on
+            turn_off = due & ~self._next_switch_on
+            self._scheduled_on[turn_on] = True
+            self._scheduled_on[turn_off] = False
+            self.turn_off_members(turn_off & self._in_operation_members)
+            self.turn_on_members(turn_on & ~self._in_operation_members)
+            for i in np.flatnonzero(due):
+                self.set_next_switch(i, self._schedulers[i].get_next_scheduled_task(self._time))
+
+        if self._member_type == "air_conditioner_simple":
+            self.adjust_internal_temperature()
+            if self._time >= self._next_temperature_update_time:
+                found_temp = self._outdoor_temperature.find(self.time_of_day_seconds())
+                if found_temp:
+                    self._current_outdoor_temperature = found_temp["value"]
+                self._next_temperature_update_time = self._time + self._temperature_update_interval
+            self.control_compressor_operation()
+
+        self.update_load()
+
+    def calculate_power_levels(self):
+        """The power of each member at its price when it's on, the vectorized Eud.calculate_power_level"""
+        if self._member_type == "air_conditioner_simple":
+            return np.where(self._compressor_is_on, self._max_power, 0.0)
+        price = self._member_price
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Eud.interpolate_power
+            power_reduction_ratio = (price - self._price_dim_start) / (self._price_dim_end - self._price_dim_start)
+            power_level_percent = 100.0 - (100.0 - self._power_level_low) * power_reduction_ratio
+            interpolated = self._max_power * power_level_percent / 100.0
+        return np.select(
+            [self._constant_power_output | (price <= self._price_dim_start), price <= self._price_dim_end, price <= self._price_off],
+            [self._max_power, interpolated, self._max_power * (self._power_level_low / 100.0)],
+            0.0
+        )
+
+    def turn_on_members(self, members):
+        """Turn on the members selected by the boolean array"""
+        if members.any():
+            self._in_operation_members |= members
+            if self._member_type == "eud":
+                self._member_power[members] = self.calculate_power_levels()[members]
+
+    def turn_off_members(self, members):
+        """Turn off the members selected by the boolean array"""
+        if members.any():
+            self._in_operation_members &= ~members
+            self._member_power[members] = 0.0
+            if self._member_type == "air_conditioner_simple":
+                self._compressor_is_on[members] = False
+
+    def adjust_internal_temperature(self):
+        """Update the indoor temperature of the members since the last update, see AirConditionerSimple"""
+        if self._time > self._last_temperature_update_time:
+            delta_t = (self._time - self._last_temperature_update_time) / 3600.0
+            self._temperature -= np.where(self._compressor_is_on, delta_t * self._temperature_change_rate_hr_comp, 0.0)
+            if not self._current_outdoor_temperature is None:
+                delta_indoor_outdoor = self._current_outdoor_temperature - self._temperature
+                self._temperature += delta_t * delta_indoor_outdoor * self._temperature_change_rate_hr_oa
+                self._last_temperature_update_time = self._time
+
+    def control_compressor_operation(self):
+        """Turn the compressors of the members that are on on/off when the temperature is outside of the set point's range"""
+        delta = self._temperature - self._set_point
+        outside = np.abs(delta) > self._temperature_max_delta
+        self._compressor_is_on[self._in_operation_members & outside & (delta > 0)] = True
+        self._compressor_is_on[self._in_operation_members & outside & (delta < 0)] = False
+        self._member_power = self.calculate_power_levels()
+
+    def update_load(self):
+        """Send the total power of the members to the grid controller if it has changed"""
+        self._in_operation = bool(self._in_operation_members.any())
+        total = float(np.sum(self._member_power))
+        if total != self._power_level:
+            self.set_power_level(total)
+            self.broadcast_new_power(self._power_level, target_device_id=self._grid_controller_id)
+
+    def on_price_change(self, source_device_id, target_device_id, time, new_price):
+        """The grid controller's price applies to all of the members"""
+        if target_device_id == self._device_id:
+            self._time = time
+            changed = ~self._member_static_price & (self._member_price != new_price)
+            if changed.any():
+                self._logger.debug(
+                    self.build_message(
+                        message="new price",
+                        tag="receive_price",
+                        value=new_price
+                    )
+                )
+                self.set_price(new_price)
+                self._member_price[changed] = new_price
+                if self._member_type == "eud":
+                    adjust = changed & self._in_operation_members
+                    self._member_power[adjust] = self.calculate_power_levels()[adjust]
+                    self.update_load()
+
+    def on_power_change(self, source_device_id, target_device_id, time, new_power):
+        """The grid controller can't supply the fleet, turn off all of its members"""
+        if target_device_id == self._device_id and new_power == 0 and self._in_operation:
+            self._time = time
+            self.turn_off_members(self._in_operation_members.copy())
+            self.turn_off()
+
+    def on_capacity_change(self, source_device_id, target_device_id, time, capacity):
+        """A device has changed its capacity, turn on the members that should be in operation"""
+        self._time = time
+        members = self._scheduled_on & ~self._in_operation_members
+        if members.any():
+            self._logger.debug(
+                self.build_message(
+                    message="fleet members should be on",
+                    tag="capacity_change_on",
+                    value=int(np.sum(members))
+                )
+            )
+            self.turn_on_members(members)
+            self.update_load()
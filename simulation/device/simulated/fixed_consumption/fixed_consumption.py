@@ -16,6 +16,8 @@ from device.scheduler import LpdmEvent
 import logging
 
 class FixedConsumption(Device):
+    ignores_repeated_price = True
+
     def __init__(self, config = None):
         # call the super constructor
         Device.__init__(self, config)
@@ -33,7 +35,7 @@ class FixedConsumption(Device):
     def set_initial_event(self):
         """Setup the initial event to turn on the device at t=0"""
         new_event = LpdmEvent(0.0, "turn_on")
-        self._events.append(new_event)
+        self._events.add(new_event)
         self.broadcast_new_ttie(new_event.ttie)
 
     def should_be_in_operation(self):
@@ -42,10 +44,9 @@ class FixedConsumption(Device):
 
     def process_events(self):
         """Process the ttie event"""
-        if len(self._events) > 0:
-            for evt in self._events:
-                if evt.ttie <= self._time and evt.value == "turn_on":
-                    self.turn_on()
+        for evt in self._events.find("turn_on"):
+            if evt.ttie <= self._time:
+                self.turn_on()
 
     def status(self):
         return {
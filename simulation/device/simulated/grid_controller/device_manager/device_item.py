@@ -1,9 +1,13 @@
-class DeviceItem:
-    def __init__(self, device_id, DeviceClass, uuid=None):
+class DeviceItem(object):
+    def __init__(self, device_id, DeviceClass, uuid=None, manager=None):
         self.device_id = device_id
         self.DeviceClass = DeviceClass
         self.uuid = uuid
         self.load = 0.0
+        # the DeviceManager that keeps the total load of its devices
+        self._manager = manager
 
     def set_load(self, new_load):
+        if not self._manager is None:
+            self._manager.load_changed(self.load, new_load)
         self.load = new_load
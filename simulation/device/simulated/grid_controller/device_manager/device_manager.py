@@ -3,7 +3,10 @@ from device_item import DeviceItem
 
 class DeviceManager(object):
     def __init__(self):
+        # the devices in the order they were added, and indexed by device_id
         self.device_list = []
+        self._devices = {}
+        self._total_load = 0.0
         self.logger = logging.getLogger("lpdm")
 
     def count(self):
@@ -19,12 +22,13 @@ class DeviceManager(object):
         """remove load from all power sources"""
         [p.set_load(0.0) for p in self.device_list]
 
-    def add(self, device_id, DeviceClass, uuid):
+    def add(self, device_id, DeviceClass, uuid=None):
         """Register a device"""
         # make sure a device with the same id does not exist
-        found = filter(lambda d: d.device_id == device_id, self.device_list)
-        if len(found) == 0:
-            self.device_list.append(DeviceItem(device_id, DeviceClass, uuid))
+        if not device_id in self._devices:
+            d = DeviceItem(device_id, DeviceClass, uuid, manager=self)
+            self.device_list.append(d)
+            self._devices[device_id] = d
             self.logger.debug("message: registered a device {} - {}".format(device_id, DeviceClass))
         else:
             raise Exception("The device_id already exists {}".format(device_id))
@@ -32,16 +36,22 @@ class DeviceManager(object):
     def set_load(self, device_id, load):
         """set the load for a device"""
         d = self.get(device_id)
-        d.load = load
+        d.set_load(load)
+
+    def load_changed(self, old_load, new_load):
+        """Update the total load when the load of a device changes"""
+        self._total_load += (new_load or 0.0) - (old_load or 0.0)
+        if abs(self._total_load) < 1e-7:
+            self._total_load = 0.0
 
     def total_load(self):
         """calculate the total load for all devices"""
-        return sum(d.load for d in self.device_list if not d.load is None)
+        return self._total_load
 
     def get(self, device_id):
         """Get the info for a device by its ID"""
-        found = filter(lambda d: d.device_id == device_id, self.device_list)
-        if len(found) == 1:
-            return found[0]
+        d = self._devices.get(device_id)
+        if not d is None:
+            return d
         else:
             raise Exception("An error occured trying to retrieve the device {}".format(device_id))
@@ -24,7 +24,7 @@ from device.base.device import Device
 from device.simulated.battery import Battery
 from common.device_class_loader import DeviceClassLoader
 from device.scheduler import LpdmEvent
-from lpdm_event import LpdmBuyPowerPriceEvent, LpdmBuyMaxPowerEvent, LpdmBuyPowerEvent
+from lpdm_event import LpdmBuyPowerEvent, LpdmFlushEvent, event_type
 import logging
 
 class GridController(Device):
@@ -46,6 +46,7 @@ class GridController(Device):
                 "diesel_output_threshold" (float): Percentage of output capacity of the diesel generator to keep above using the battery
                 "check_battery_soc_rate" (int): Rate at which to update the battery state of charge when charging or discharging (seconds)
                 "battery_config" (Dict): Configuration object for the battery attached to the grid controller
+                "skip_repeated_prices" (bool): Don't send an unchanged price again after each power change of a burst
         """
         # call the super constructor
         Device.__init__(self, config)
@@ -65,6 +66,13 @@ class GridController(Device):
 
         self._total_load = 0.0
 
+        # when a burst of power changes is routed, the price is only sent again to the devices that ignore a repeated
+        # price if it has changed.  The prices sent are kept (device_id -> price) until the flush event sent with the
+        # first of them is delivered, by then the devices have had all of them.
+        self._skip_repeated_prices = config.get("skip_repeated_prices", False)
+        self._prices_sent = {}
+        self._flush_queued = False
+
         # setup the managers for devices and power sources
         self.device_manager = DeviceManager()
         self.power_source_manager = PowerSourceManager()
@@ -103,6 +111,19 @@ class GridController(Device):
             self._battery.init()
             self._logger.info(self.build_message(message="Initialized the battery."))
 
+    def update_config(self, config):
+        """Change the configuration of the grid controller, the "battery" key has the changes for its battery"""
+        config = dict(config)
+        battery_config = config.pop("battery", None)
+        if battery_config:
+            if self._battery is None:
+                raise Exception("Grid controller {} doesn't have a battery".format(self._device_id))
+            self._battery.update_config(battery_config)
+        if "price_logic_class" in config:
+            self._price_logic_class_name = config.pop("price_logic_class")
+            self.set_price_logic()
+        Device.update_config(self, config)
+
     def set_price_logic(self):
         """Set the logic for calculating the GC's price"""
         # get the class object from the class name
@@ -355,7 +376,28 @@ class GridController(Device):
         # send the new price to the non-power-sources
         for d in self.device_manager.devices():
             if not self._price is None:
+                if self._skip_repeated_prices and getattr(d.DeviceClass, "ignores_repeated_price", False):
+                    if self._prices_sent.get(d.device_id) == self._price:
+                        # the device already has this price
+                        continue
+                    self._prices_sent[d.device_id] = self._price
                 self.broadcast_new_price(self._price, d.device_id)
+        if len(self._prices_sent):
+            self.broadcast_flush()
+
+    def broadcast_flush(self):
+        """Send the grid controller a flush event, unless there's one on the way"""
+        if not self._flush_queued:
+            if callable(self._broadcast_callback):
+                self._flush_queued = True
+                self._broadcast_callback(LpdmFlushEvent(self._device_id, self._device_id, self._time))
+            else:
+                raise Exception("broadcast_flush has not been set for this device!")
+
+    def on_flush(self, the_event):
+        """The devices have received the prices sent before the flush event, the next price is sent to all of them"""
+        self._prices_sent = {}
+        self._flush_queued = False
 
     def shutdown(self):
         """
@@ -391,14 +433,13 @@ class GridController(Device):
         remove_items = []
         set_power_sources_called = False
 
-        for event in self._events:
-            if event.ttie <= self._time:
-                if event.value == "emit_initial_price":
-                    self.send_price_change_to_devices()
-                    remove_items.append(event)
-                elif event.value == "battery_status":
-                    self.power_source_update()
-                    remove_items.append(event)
+        for event in self._events.due(self._time):
+            if event.value == "emit_initial_price":
+                self.send_price_change_to_devices()
+                remove_items.append(event)
+            elif event.value == "battery_status":
+                self.power_source_update()
+                remove_items.append(event)
 
         # remove the processed events from the list
         for event in remove_items:
@@ -420,49 +461,33 @@ class GridController(Device):
         """Let all other devices know of the initial price of energy"""
         new_event = LpdmEvent(0, "emit_initial_price")
         # check if the event is already there
-        found_items = filter(lambda d: d.ttie == new_event.ttie and d.value == "emit_initial_price", self._events)
-        if len(found_items) == 0:
-            self._events.append(new_event)
+        if not self._events.has("emit_initial_price", new_event.ttie):
+            self._events.add(new_event)
 
     def calculate_next_ttie(self):
         "calculate the next TTIE - look through the pending events for the one that will happen first"
-        ttie = None
-        the_event = None
-        for event in self._events:
-            if ttie == None or event.ttie < ttie:
-                ttie = event.ttie
-                the_event = event
+        the_event = self._events.first()
+        ttie = None if the_event is None else the_event.ttie
 
         if ttie != None and ttie != self._ttie:
             self._ttie = ttie
             self.broadcast_new_ttie(ttie)
 
+    def build_event_handlers(self):
+        """Add the power buyer events to the device base class handlers"""
+        handlers = Device.build_event_handlers(self)
+        # A power buyer is informing the GC of the max amount of power it can buy
+        handlers[event_type.BUY_MAX_POWER] = self.on_buy_max_power_change
+        # a power buyer is informing the GC of the buy price threshold
+        handlers[event_type.BUY_POWER_PRICE] = self.on_buy_power_price_change
+        # the events queued before the flush event have been routed
+        handlers[event_type.FLUSH] = self.on_flush
+        return handlers
+
     def process_supervisor_event(self, the_event):
         """Override the device base class"""
         self._time = the_event.time
-        if isinstance(the_event, LpdmBuyMaxPowerEvent):
-            # A power buyer is informing the GC of the max amount of power it can buy
-            # self._logger.debug(
-                # self.build_message(
-                    # message="buy power max event received {}".format(the_event),
-                    # tag="buy_max_power",
-                    # value=the_event.value
-                # )
-            # )
-            self.on_buy_max_power_change(the_event)
-        elif isinstance(the_event, LpdmBuyPowerPriceEvent):
-            # a power buyer is informing the GC of the buy price threshold
-            # self._logger.debug(
-                # self.build_message(
-                    # message="buy power price event received {}".format(the_event),
-                    # tag="buy_power_price",
-                    # value=the_event.value
-                # )
-            # )
-            self.on_buy_power_price_change(the_event)
-        else:
-            # divert all other events to the base class
-            Device.process_supervisor_event(self, the_event)
+        Device.process_supervisor_event(self, the_event)
 
     def on_buy_power_price_change(self, the_event):
         """a power buyer has changed its buy price threshold"""
@@ -5,7 +5,9 @@ from simulation_logger import message_formatter
 
 class PowerBuyerManager(object):
     def __init__(self):
+        # the power buyers in the order they were added, and indexed by device_id
         self.power_sources = []
+        self._power_sources = {}
         self.logger = logging.getLogger("lpdm")
         self._device_id = "power_buyer_manager"
         self._load = 0.0
@@ -47,9 +49,10 @@ class PowerBuyerManager(object):
             raise Exception("The PowerBuyerManager can only accepts PowerSourceBuyer devices.")
 
         # make sure a device with the same id does not exist
-        found = filter(lambda d: d.device_id == device_id, self.power_sources)
-        if len(found) == 0:
-            self.power_sources.append(PowerBuyerItem(device_id, DeviceClass, device_instance))
+        if not device_id in self._power_sources:
+            p = PowerBuyerItem(device_id, DeviceClass, device_instance)
+            self.power_sources.append(p)
+            self._power_sources[device_id] = p
         else:
             raise Exception("The device_id already exists {}".format(device_id))
 
@@ -106,11 +109,7 @@ class PowerBuyerManager(object):
             # return all devices
             return self.power_sources
         else:
-            found = filter(lambda d: d.device_id == device_id, self.power_sources)
-            if len(found) == 1:
-                return found[0]
-            else:
-                return None
+            return self._power_sources.get(device_id)
 
     def total_capacity(self):
         """calculate the total capacity for all power sources"""
@@ -1,12 +1,15 @@
 import logging
 
-class PowerSourceItem:
-    def __init__(self, device_id, DeviceClass, device_instance=None):
+class PowerSourceItem(object):
+    def __init__(self, device_id, DeviceClass, device_instance=None, manager=None, index=0):
         self.device_id = device_id
         self.DeviceClass = DeviceClass
-        self.capacity = None
+        # the PowerSourceManager that keeps the merit order of the power sources, and the order the item was added in
+        self._manager = manager
+        self.index = index
+        self._capacity = None
         self.load = 0.0
-        self.price = None
+        self._price = None
         self.device_instance = device_instance
 
         self.capacity_changed = False
@@ -23,6 +26,29 @@ class PowerSourceItem:
             self.price
         )
 
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @capacity.setter
+    def capacity(self, capacity):
+        was_available = self.is_available()
+        self._capacity = capacity
+        if not self._manager is None:
+            self._manager.merit_order_changed(self, was_available, self._price)
+
+    @property
+    def price(self):
+        return self._price
+
+    @price.setter
+    def price(self, price):
+        was_available = self.is_available()
+        old_price = self._price
+        self._price = price
+        if not self._manager is None:
+            self._manager.merit_order_changed(self, was_available, old_price)
+
     def update_status(self):
         if not self.device_instance is None:
             self.device_instance.update_status()
@@ -63,6 +89,8 @@ class PowerSourceItem:
         if load != self.load:
             self.load_changed = True
         self.load = load
+        if not self._manager is None:
+            self._manager.load_changed(self)
         # if there's an actual device instance connected then set that load as well
         if self.device_instance:
             self.device_instance.set_load(load)
@@ -75,6 +103,8 @@ class PowerSourceItem:
         if capacity != self.capacity:
             self.capacity_changed = True
             self.capacity = capacity
+            if not self._manager is None:
+                self._manager.flag_changed(self)
         # if self.load > self.capacity:
             # raise Exception("Load > capacity ({} > {})".format(self.load, self.capacity))
 
@@ -1,4 +1,5 @@
 import logging
+from bisect import bisect_left
 from device.base.power_source import PowerSource
 from device.simulated.battery import Battery
 from power_source_item import PowerSourceItem
@@ -6,7 +7,17 @@ from simulation_logger import message_formatter
 
 class PowerSourceManager(object):
     def __init__(self):
+        # the power sources in the order they were added, and indexed by device_id
         self.power_sources = []
+        self._power_sources = {}
+        # the merit order: the (price, index) of the available power sources sorted by price, ties in the order added,
+        # and the power sources in the same order
+        self._merit_keys = []
+        self._merit_order = []
+        # the power sources with a load, the ones with a changed flag set, and the batteries
+        self._loaded = {}
+        self._changed = {}
+        self._rechargeable = []
         self.logger = logging.getLogger("lpdm")
         self._device_id = "power_source_manager"
         self._load = 0.0
@@ -48,9 +59,12 @@ class PowerSourceManager(object):
             raise Exception("The PowerSourceManager can only accepts PowerSource devices.")
 
         # make sure a device with the same id does not exist
-        found = filter(lambda d: d.device_id == device_id, self.power_sources)
-        if len(found) == 0:
-            self.power_sources.append(PowerSourceItem(device_id, DeviceClass, device_instance))
+        if not device_id in self._power_sources:
+            p = PowerSourceItem(device_id, DeviceClass, device_instance, manager=self, index=len(self.power_sources))
+            self.power_sources.append(p)
+            self._power_sources[device_id] = p
+            if DeviceClass is Battery:
+                self._rechargeable.append(p)
         else:
             raise Exception("The device_id already exists {}".format(device_id))
 
@@ -102,11 +116,7 @@ class PowerSourceManager(object):
             # return all devices
             return self.power_sources
         else:
-            found = filter(lambda d: d.device_id == device_id, self.power_sources)
-            if len(found) == 1:
-                return found[0]
-            else:
-                return None
+            return self._power_sources.get(device_id)
 
     def total_capacity(self):
         """calculate the total capacity for all power sources"""
@@ -128,7 +138,32 @@ class PowerSourceManager(object):
 
     def has_available_power_sources(self):
         """Are there powersources configured and available for use?"""
-        return True if len([p for p in self.power_sources if p.is_available()]) else False
+        return len(self._merit_order) > 0
+
+    def merit_order_changed(self, power_source, was_available, old_price):
+        """Move a power source in the merit order after its capacity or price has changed"""
+        if was_available:
+            i = bisect_left(self._merit_keys, (old_price, power_source.index))
+            del self._merit_keys[i]
+            del self._merit_order[i]
+        if power_source.is_available():
+            key = (power_source.price, power_source.index)
+            i = bisect_left(self._merit_keys, key)
+            self._merit_keys.insert(i, key)
+            self._merit_order.insert(i, power_source)
+
+    def load_changed(self, power_source):
+        """Keep track of the power sources with a load and the ones with a changed load"""
+        if power_source.load:
+            self._loaded[power_source.device_id] = power_source
+        else:
+            self._loaded.pop(power_source.device_id, None)
+        if power_source.load_changed:
+            self._changed[power_source.device_id] = power_source
+
+    def flag_changed(self, power_source):
+        """Keep track of the power sources with a changed flag set"""
+        self._changed[power_source.device_id] = power_source
 
     def add_load(self, new_load):
         """
@@ -142,8 +177,8 @@ class PowerSourceManager(object):
 
     def update_rechargeable_items(self):
         """Update the status of rechargeable items"""
-        for p in self.power_sources:
-            if p.DeviceClass is Battery and p.device_instance:
+        for p in self._rechargeable:
+            if p.device_instance:
                 # update the battery (direct connect)
                 p.device_instance.update_status()
 
@@ -155,38 +190,43 @@ class PowerSourceManager(object):
         # update the status of rechargeable itmes
         self.update_rechargeable_items()
         # get the current total load on the system
-        # add the new load
         remaining_load = self._load
         starting_load = remaining_load
 
-        # get the power sources and sort by the cheapest price
-        power_sources = [p for p in self.power_sources if p.is_configured()]
-        power_sources = sorted(power_sources, lambda a, b: cmp(a.price, b.price))
-        for ps in power_sources:
-            # how much power is available for the device
+        # fill the available power sources in merit order until the load has been placed, the same as going through
+        # all of the configured power sources sorted by price, but only the ones that have or get a load are visited
+        changes = []
+        dispatched = set()
+        # the merit key after which the power sources get no load, None if the load is more than the capacity
+        zero_after = (None, -1) if remaining_load == 0 else None
+        for ps in self._merit_order:
             if remaining_load == 0:
-                # no more load left to distribute, remove power
-                ps.set_load(0.0)
+                break
+            dispatched.add(ps.device_id)
+            if remaining_load > ps.capacity:
+                # can't put all the remaining load on this power source
+                # set to 100% and try the next power source
+                if ps.load != ps.capacity:
+                    changes.append((ps, ps.capacity))
+                remaining_load -= ps.capacity
             else:
-                # there is power available for this device and power left to distribute
-                if not ps.is_available():
-                    if ps.load > 0:
-                        # self.logger.debug(self.build_message(message="set load for {} to {}".format(ps, 0)))
-                        ps.set_load(0.0)
-                else:
-                    if remaining_load > ps.capacity:
-                        # can't put all the remaining load on this power source
-                        # set to 100% and try the next power source
-                        if ps.load != ps.capacity:
-                            # self.logger.debug(self.build_message(message="set load for {} to {}".format(ps, ps.capacity)))
-                            ps.set_load(ps.capacity)
-                        remaining_load -= ps.capacity
-                    else:
-                        # this power source can handle all of the remaining load
-                        # self.logger.debug(self.build_message(message="set load for {} to {}".format(ps, remaining_load)))
-                        if ps.load != remaining_load:
-                            ps.set_load(remaining_load)
-                        remaining_load = 0
+                # this power source can handle all of the remaining load
+                if ps.load != remaining_load:
+                    changes.append((ps, remaining_load))
+                remaining_load = 0
+                zero_after = (ps.price, ps.index)
+
+        # remove the load from the rest of the power sources that have one
+        for ps in self._loaded.values():
+            if not ps.device_id in dispatched and ps.is_configured():
+                if (not zero_after is None and (ps.price, ps.index) > zero_after) or ps.load > 0:
+                    # an unavailable power source before the last one with load only has a positive load removed
+                    changes.append((ps, 0.0))
+
+        # set the loads in merit order
+        changes.sort(key=lambda change: (change[0].price, change[0].index))
+        for (ps, load) in changes:
+            ps.set_load(load)
 
         diff = abs(starting_load - self._load)
         if remaining_load > 1e-7:
@@ -218,13 +258,14 @@ class PowerSourceManager(object):
 
     def get_available_power_sources(self):
         """get the power sources that have a non-zero capacity"""
-        return filter(lambda d: d.is_available(), self.power_sources)
+        return sorted(self._merit_order, key=lambda p: p.index)
 
     def get_changed_power_sources(self):
         """return a list of powersources that have been changed"""
-        return [p for p in self.power_sources if p.load_changed]
+        return sorted([p for p in self._changed.values() if p.load_changed], key=lambda p: p.index)
 
     def reset_changed(self):
         """Reset all the changed flags on all power sources"""
-        [p.reset_changed() for p in self.power_sources]
+        [p.reset_changed() for p in self._changed.values()]
+        self._changed = {}
 
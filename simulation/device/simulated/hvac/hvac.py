@@ -272,6 +272,7 @@ class Hvac(Device, SmapQuery):
 
     def on_power_change(self, source_device_id, target_device_id, time, new_power):
         "Receives messages when a power change has occured"
+        self.fast_forward(time)
         if target_device_id == self._device_id:
             if new_power == 0 and self._operation_status != OperationStatus.OFF:
                 self._time = time
@@ -279,6 +280,7 @@ class Hvac(Device, SmapQuery):
 
     def on_price_change(self, source_device_id, target_device_id, time, new_price):
         "Receives message when a price change has occured"
+        self.fast_forward(time)
         self._time = time
         self.set_new_fuel_price(new_price)
         if self.is_real_device():
@@ -296,13 +298,15 @@ class Hvac(Device, SmapQuery):
 
     def on_time_change(self, new_time):
         "Receives message when time for an 'initial event' change has occured"
+        self.fast_forward(new_time)
         self._time = new_time
         self.process_events()
         self.schedule_next_events()
         self.calculate_next_ttie()
 
-    def on_capacity_change(self, source_device_id, target_device_id, time, value):
+    def on_capacity_change(self, source_device_id, target_device_id, time, capacity):
         """A device has changed its capacity, check if the ac should be in operation"""
+        self.fast_forward(time)
         self._time = time
         if not self._in_operation and self.should_be_in_operation():
             self._logger.debug(
@@ -328,10 +332,9 @@ class Hvac(Device, SmapQuery):
 
         # loop through the current events
         remove_items = []
-        for event in self._events:
-            if event.ttie <= self._time:
-                events_occurred[event.value] = True
-                remove_items.append(event)
+        for event in self._events.due(self._time):
+            events_occurred[event.value] = True
+            remove_items.append(event)
 
         # execute the found events in order
         if events_occurred["set_nominal_price"]:
@@ -343,13 +346,13 @@ class Hvac(Device, SmapQuery):
         if events_occurred["on"]:
             # self._logger.debug(self.build_message(message="on event found"))
             self.turn_on()
-            found = filter(lambda d: d.value == "on", self._events)
+            found = self._events.find("on")
             if len(found):
                 self._current_event = found[0]
         elif events_occurred["off"]:
             # self._logger.debug(self.build_message(message="off event found"))
             self.turn_off()
-            found = filter(lambda d: d.value == "off", self._events)
+            found = self._events.find("off")
             if len(found):
                 self._current_event = found[0]
 
@@ -369,6 +372,22 @@ class Hvac(Device, SmapQuery):
         for event in remove_items:
             self._events.remove(event)
 
+    def quiescent_interval(self, event):
+        """
+        While the hvac is off and isn't scheduled to be on, the periodic events don't turn on the heating or cooling,
+        so the indoor temperature, outdoor temperature and set points can be updated when the hvac catches up.
+        The hvac can only be turned on again by an on event, which isn't quiescent.
+        """
+        if self.is_real_device() or not self.is_off() or self.should_be_in_operation():
+            return None
+        elif event.value == "update_outdoor_temperature":
+            return self._temperature_update_interval
+        elif event.value == "reasses_setpoint":
+            return self._setpoint_reassesment_interval
+        elif event.value == "set_point_range" or event.value == "hourly_price_calculation":
+            return 60 * 60.0
+        return None
+
     def set_nominal_price_calculation_event(self):
         """
         calculate the nominal price using the avg of the first hour of operation
@@ -379,9 +398,8 @@ class Hvac(Device, SmapQuery):
         self._nominal_price_calc_running = True
         new_event = LpdmEvent(self._time + 60.0 * 60.0, "set_nominal_price")
         # check if the event is already there
-        found_items = filter(lambda d: d.ttie == new_event.ttie and d.value == new_event.value, self._events)
-        if len(found_items) == 0:
-            self._events.append(new_event)
+        if not self._events.has(new_event.value, new_event.ttie):
+            self._events.add(new_event)
 
     def calculate_nominal_price(self):
         if not self._nominal_price_calc_running:
@@ -404,17 +422,17 @@ class Hvac(Device, SmapQuery):
             # create a new event to execute in 60 minutes(?) if an event hasn't yet been scheduled
         new_event = LpdmEvent(self._time + 60 * 60.0, "set_point_range")
         # check if the event is already there
-        found_items = filter(lambda d: d.ttie <= new_event.ttie and d.value == new_event.value, self._events)
+        found_items = filter(lambda d: d.ttie <= new_event.ttie, self._events.find(new_event.value))
         if len(found_items) == 0:
-            self._events.append(new_event)
+            self._events.add(new_event)
 
     def set_reasses_setpoint_event(self):
         "set the next event to calculate the set point"
         new_event = LpdmEvent(self._time + self._setpoint_reassesment_interval, "reasses_setpoint")
         # check if the event is already there
-        found_items = filter(lambda d: d.ttie <= new_event.ttie and d.value == new_event.value, self._events)
+        found_items = filter(lambda d: d.ttie <= new_event.ttie, self._events.find(new_event.value))
         if len(found_items) == 0:
-            self._events.append(new_event)
+            self._events.add(new_event)
 
     def set_new_fuel_price(self, new_price):
         """Set a new fuel price"""
@@ -633,25 +651,20 @@ class Hvac(Device, SmapQuery):
         """schedule the next temperature update (in one hour)"""
         new_event = LpdmEvent(self._time + self._temperature_update_interval, "update_outdoor_temperature")
         # check if the event is already there
-        found_items = filter(lambda d: d.ttie == new_event.ttie and d.value == new_event.value, self._events)
-        if len(found_items) == 0:
-            self._events.append(new_event)
+        if not self._events.has(new_event.value, new_event.ttie):
+            self._events.add(new_event)
 
     def process_outdoor_temperature_change(self):
         """Update the current outdoor temperature"""
         # get the time of day in seconds
         time_of_day = self.time_of_day_seconds()
-        found_temp = None
-        for temp in self._temperature_hourly_profile:
-            if temp["seconds"] >= time_of_day:
-                found_temp = temp
-                break
+        found_temp = self._outdoor_temperature.find(time_of_day)
 
         if found_temp:
             self._logger.debug(self.build_message(
-                message="new outdoor temperature", tag="outdoor_temp", value=temp["value"]
+                message="new outdoor temperature", tag="outdoor_temp", value=found_temp["value"]
             ))
-            self.update_outdoor_temperature(temp["value"])
+            self.update_outdoor_temperature(found_temp["value"])
 
     def update_outdoor_temperature(self, new_temperature):
         "This method needs to be implemented by a device if it needs to act on a change in temperature"
@@ -70,7 +70,6 @@ class Pv(PowerSource, SmapQuery):
         self.broadcast_new_price(self._price, target_device_id=self._grid_controller_id)
         self.schedule_next_events()
         self.calculate_next_ttie()
-        self.broadcast_new_ttie(self._ttie)
 
     def make_available(self):
         """Make the power source available, ie set its capacity to a non-zero value"""
@@ -81,9 +80,8 @@ class Pv(PowerSource, SmapQuery):
         """Set the next event for updating the pv capacity"""
         new_event = LpdmEvent(self._time + self._capacity_update_interval, "update_capacity")
         # check if the event is already there
-        found_items = filter(lambda d: d.ttie == new_event.ttie and d.value == "update_capacity", self._events)
-        if len(found_items) == 0:
-            self._events.append(new_event)
+        if not self._events.has("update_capacity", new_event.ttie):
+            self._events.add(new_event)
 
     def on_time_change(self, new_time):
         "Receives message when time for an 'initial event' change has occured"
@@ -95,11 +93,10 @@ class Pv(PowerSource, SmapQuery):
     def process_events(self):
         "Process any events that need to be processed"
         remove_items = []
-        for event in self._events:
-            if event.ttie <= self._time:
-                if event.value == "update_capacity":
-                    self.set_capacity()
-                    remove_items.append(event)
+        for event in self._events.due(self._time):
+            if event.value == "update_capacity":
+                self.set_capacity()
+                remove_items.append(event)
 
         # remove the processed events from the list
         if len(remove_items):
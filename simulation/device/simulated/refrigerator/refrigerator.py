@@ -59,10 +59,6 @@ class Refrigerator(Device):
         self._nominal_price_calc_running = False
         self._nominal_price_list = []
 
-        # hourly average price tracking
-        self._hourly_prices = []
-        self._hourly_price_list = []
-
         self._current_temperature = float(config["current_temperature"]) if type(config) is dict and "current_temperature" in config.keys() else 3
         self._current_set_point = float(config["current_set_point"]) if type(config) is dict and "current_set_point" in config.keys() else 3
         self._temperature_max_delta = float(config["temperature_max_delta"]) if type(config) is dict and "temperature_max_delta" in config.keys() else 0.5
@@ -161,8 +157,9 @@ class Refrigerator(Device):
                     self.set_nominal_price_calculation_event()
                 self._nominal_price_list.append(new_price)
 
-            # add the price to the list of prices for the hourly avg calculation
-            self._hourly_price_list.append(new_price)
+            # add the price to the sum of prices for the hourly avg calculation
+            self._hourly_price_sum += new_price
+            self._hourly_price_count += 1
             self.set_new_fuel_price(new_price)
             return
 
@@ -328,20 +325,19 @@ class Refrigerator(Device):
     def process_events(self):
         "Process any events that need to be processed"
         remove_items = []
-        for event in self._events:
-            if event.ttie <= self._time:
-                if event.value == "set_nominal_price":
-                    self.calculate_nominal_price()
-                    remove_items.append(event)
-                elif event.value == "hourly_price_calculation":
-                    self.calculate_hourly_price()
-                    remove_items.append(event)
-                elif event.value == "freezer_setpoint_reached" or event.value=="refrigerator_setpoint_reached" or event.value=="reasses_setpoint":
-                    self.adjust_internal_temperature()
-                    self.control_compressor_operation()
-                    if event.value=="reasses_setpoint":
-                     self.reasses_setpoint()
-                    remove_items.append(event)
+        for event in self._events.due(self._time):
+            if event.value == "set_nominal_price":
+                self.calculate_nominal_price()
+                remove_items.append(event)
+            elif event.value == "hourly_price_calculation":
+                self.calculate_hourly_price()
+                remove_items.append(event)
+            elif event.value == "freezer_setpoint_reached" or event.value=="refrigerator_setpoint_reached" or event.value=="reasses_setpoint":
+                self.adjust_internal_temperature()
+                self.control_compressor_operation()
+                if event.value=="reasses_setpoint":
+                 self.reasses_setpoint()
+                remove_items.append(event)
 
         # remove the processed events from the list
         for event in remove_items:
@@ -356,7 +352,7 @@ class Refrigerator(Device):
         so once the first price shows up start keeping track of the prices, then
         an hour later calculate the avg.
         """
-        self._events.append(LpdmEvent(self._time_price + 60.0 * 10.0, "set_nominal_price"))
+        self._events.add(LpdmEvent(self._time_price + 60.0 * 10.0, "set_nominal_price"))
         self._nominal_price_list = []
         self._nominal_price_calc_running = True
         self._time_price=self._time_price+600.0
@@ -394,30 +390,26 @@ class Refrigerator(Device):
     def set_hourly_price_calculation_event(self):
         #"set the next event to calculate the avg hourly prices"
         new_event = LpdmEvent(self._time + 60.0 * 60.0, "hourly_price_calculation")
-        found_items = filter(lambda d: d.ttie == new_event.ttie and d.value == new_event.value, self._events)
-        if len(found_items) == 0:
-            self._events.append(new_event)
-            self._hourly_price_list = []
+        if not self._events.has(new_event.value, new_event.ttie):
+            self._events.add(new_event)
+            self.reset_hourly_price()
 
     def set_reasses_setpoint_event(self):
         #"set the next event to calculate the set point"
         new_event = LpdmEvent(self._time + self._setpoint_reassesment_interval, "reasses_setpoint")
-        found_items = filter(lambda d: d.ttie == new_event.ttie and d.value == new_event.value, self._events)
-        if len(found_items) == 0:
-            self._events.append(new_event)
+        if not self._events.has(new_event.value, new_event.ttie):
+            self._events.add(new_event)
 
     def set_reasses_freezer_setpoint_reached(self):
         #"set the next event to calculate the set point"
         new_event = LpdmEvent(self._time + self._setpoint_freezer_reached, "freezer_setpoint_reached" )
-        found_items = filter(lambda d: d.ttie == new_event.ttie and d.value == new_event.value, self._events)
-        if len(found_items) == 0:
-            self._events.append(new_event)
+        if not self._events.has(new_event.value, new_event.ttie):
+            self._events.add(new_event)
     def set_reasses_refrigerator_setpoint_reached(self):
         #"set the next event to calculate the set point"
         new_event = LpdmEvent(self._time + self._setpoint_refrigerator_reached, "refrigerator_setpoint_reached" )
-        found_items = filter(lambda d: d.ttie == new_event.ttie and d.value == new_event.value, self._events)
-        if len(found_items) == 0:
-            self._events.append(new_event)
+        if not self._events.has(new_event.value, new_event.ttie):
+            self._events.add(new_event)
 
     def setpoint_reached_time(self):
 
@@ -465,17 +457,16 @@ class Refrigerator(Device):
     def calculate_hourly_price(self):
         """This should be called every hour to calculate the previous hour's average fuel price"""
         hour_avg = None
-        if len(self._hourly_price_list):
-            hour_avg = sum(self._hourly_price_list) / float(len(self._hourly_price_list))
+        if self._hourly_price_count:
+            hour_avg = self._hourly_price_sum / float(self._hourly_price_count)
         elif self._fuel_price is not None:
             hour_avg = self._fuel_price
 
-        self._hourly_prices.append(hour_avg)
-        if len(self._hourly_prices) > 24:
-            # remove the oldest item if more than 24 hours worth of data
-            self._hourly_prices.pop(0)
+        # the window keeps the last 24 hours
+        if not hour_avg is None and not self._shares_price_history:
+            self._hourly_prices.append(hour_avg)
 
-        self._hourly_price_list = []
+        self.reset_hourly_price()
 
     def set_new_fuel_price(self, new_price):
         """Set a new fuel price"""
@@ -15,7 +15,7 @@
     Implementation of the Utility Meter device.
 """
 from device.base.power_source import PowerSource
-from device.scheduler import Scheduler
+from device.scheduler import Scheduler, EventStore
 
 from common.smap_tools.smap_tools import download_most_recent_point
 
@@ -102,7 +102,7 @@ class UtilityMeter(PowerSource):
         "Refresh the utility meter. Currently this means resetting the operation schedule."
         self._ttie = None
         self._next_event = None
-        self._events = []
+        self._events = EventStore()
 
         self.setup_schedule()
         self.schedule_next_events()
@@ -251,20 +251,19 @@ class UtilityMeter(PowerSource):
     def process_events(self):
         PowerSource.process_events(self)
         remove_items = []
-        for event in self._events:
-            if event.ttie <= self._time:
-                if event.value == "off" and self._current_capacity > 0:
-                    self.make_unavailable()
-                elif event.value == "on" and self._current_capacity == 0:
-                    self.make_available()
-                elif event.name == "price":
-                    self.set_price(event.value)
-                    self.broadcast_new_price(self._price, self._grid_controller_id)
-                elif event.value == "emit_initial_price":
-                    self.calculate_electricity_price()
-                elif event.value == "emit_initial_capacity":
-                    self.calculate_capacity()
-                remove_items.append(event)
+        for event in self._events.due(self._time):
+            if event.value == "off" and self._current_capacity > 0:
+                self.make_unavailable()
+            elif event.value == "on" and self._current_capacity == 0:
+                self.make_available()
+            elif event.name == "price":
+                self.set_price(event.value)
+                self.broadcast_new_price(self._price, self._grid_controller_id)
+            elif event.value == "emit_initial_price":
+                self.calculate_electricity_price()
+            elif event.value == "emit_initial_capacity":
+                self.calculate_capacity()
+            remove_items.append(event)
 
         for event in remove_items:
             self._events.remove(event)
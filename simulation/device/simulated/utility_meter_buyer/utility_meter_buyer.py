@@ -13,7 +13,7 @@
 
 from device.simulated.utility_meter import UtilityMeter
 from device.base.power_source_buyer import PowerSourceBuyer
-from lpdm_event import LpdmBuyPowerPriceEvent, LpdmBuyMaxPowerEvent, LpdmBuyPowerEvent
+from lpdm_event import LpdmBuyPowerPriceEvent, LpdmBuyMaxPowerEvent, event_type
 
 class UtilityMeterBuyer(UtilityMeter, PowerSourceBuyer):
     """
@@ -73,18 +73,24 @@ class UtilityMeterBuyer(UtilityMeter, PowerSourceBuyer):
             raise Exception("broadcast callback has not been set for this device!")
         return
 
+    def build_event_handlers(self):
+        """add the buy back events to the base class handlers"""
+        handlers = UtilityMeter.build_event_handlers(self)
+        handlers[event_type.BUY_POWER] = self.on_buy_power
+        return handlers
+
     def process_supervisor_event(self, the_event):
-        """override the base class event to handle the buy back events"""
+        """override the base class event to set the time for the buy back events"""
         self._time = the_event.time
-        if isinstance(the_event, LpdmBuyPowerEvent):
-            # power source is being notified that it can begin purchasing power
-            if the_event.target_device_id == self._device_id:
-                self._logger.debug(
-                    self.build_message(message="buy power event received {}".format(the_event), tag="buy_power_received", value=1)
-                )
-                self.buy_power(the_event)
-        else:
-            UtilityMeter.process_supervisor_event(self, the_event)
+        UtilityMeter.process_supervisor_event(self, the_event)
+
+    def on_buy_power(self, the_event):
+        """power source is being notified that it can begin purchasing power"""
+        if the_event.target_device_id == self._device_id:
+            self._logger.debug(
+                self.build_message(message="buy power event received {}".format(the_event), tag="buy_power_received", value=1)
+            )
+            self.buy_power(the_event)
 
     def buy_power(self, the_event):
         """Power purchase has been granted"""
@@ -11,4 +11,6 @@ from lpdm_kill_event import LpdmKillEvent
 from lpdm_connect_device_event import LpdmConnectDeviceEvent
 from lpdm_assign_grid_controller_event import LpdmAssignGridControllerEvent
 from lpdm_run_time_error_event import LpdmRunTimeErrorEvent
+from lpdm_flush_event import LpdmFlushEvent
 import event_type
+from event_pool import enable_event_pool, disable_event_pool, release_event
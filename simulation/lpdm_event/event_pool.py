@@ -0,0 +1,50 @@
+"""
+Optional free lists for reusing the event objects created for every broadcast.
+
+When the pool is enabled the pooled event classes take their objects from a free list, and the supervisor
+puts the events back with release_event once they've been delivered.  A released event must not be used again.
+The pool is shared by every supervisor in the process.
+"""
+from lpdm_power_event import LpdmPowerEvent
+from lpdm_price_event import LpdmPriceEvent
+from lpdm_capacity_event import LpdmCapacityEvent
+from lpdm_ttie_event import LpdmTtieEvent
+
+POOLED_CLASSES = [LpdmPowerEvent, LpdmPriceEvent, LpdmCapacityEvent, LpdmTtieEvent]
+
+# event class -> released events of the class
+pools = {}
+# the most events kept in the free list of a class
+max_pool_size = 4096
+
+def pooled_new(cls, *args, **kwargs):
+    """Take an event from the free list of its class, or create a new one if the list is empty"""
+    pool = pools.get(cls)
+    if pool:
+        try:
+            return pool.pop()
+        except IndexError:
+            # another thread took the last one
+            pass
+    return object.__new__(cls)
+
+def enable_event_pool(classes=None, max_size=4096):
+    """Start reusing the events of the pooled classes"""
+    global max_pool_size
+    max_pool_size = max_size
+    for cls in (classes if classes else POOLED_CLASSES):
+        if not cls in pools:
+            pools[cls] = []
+            cls.__new__ = staticmethod(pooled_new)
+
+def disable_event_pool():
+    """Stop reusing events, the pooled classes go back to creating a new object every time"""
+    for cls in pools.keys():
+        del cls.__new__
+    pools.clear()
+
+def release_event(the_event):
+    """Put an event that has been delivered back in the free list of its class"""
+    pool = pools.get(type(the_event))
+    if not pool is None and len(pool) < max_pool_size:
+        pool.append(the_event)
@@ -1,3 +1,15 @@
+# integer codes identifying each type of lpdm event,
+# used by the supervisor and the devices to look up the handler for an event
 TTIE = 1
 POWER_CHANGE = 2
 PRICE_CHANGE = 3
+CAPACITY_CHANGE = 4
+BUY_MAX_POWER = 5
+BUY_POWER = 6
+BUY_POWER_PRICE = 7
+INIT = 8
+KILL = 9
+CONNECT_DEVICE = 10
+ASSIGN_GRID_CONTROLLER = 11
+RUN_TIME_ERROR = 12
+FLUSH = 13
@@ -1,8 +1,12 @@
 from lpdm_base_event import LpdmBaseEvent
+import event_type
 
 class LpdmAssignGridControllerEvent(LpdmBaseEvent):
     """Assign a grid controller to an EUD"""
+    __slots__ = ("grid_controller_id",)
+    type_code = event_type.ASSIGN_GRID_CONTROLLER
+    event_type = "assign_grid_controller"
+
     def __init__(self, grid_controller_id):
         LpdmBaseEvent.__init__(self)
-        self.event_type = "assign_grid_controller"
         self.grid_controller_id = grid_controller_id
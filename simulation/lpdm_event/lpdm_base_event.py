@@ -1,12 +1,43 @@
 class LpdmBaseEvent(object):
+    """
+    Base class of the events passed between the supervisor and the devices.
+    The events have slots instead of a __dict__, subclasses with more fields add them to their own __slots__.
+    The events created for every broadcast (power, price, capacity, buy and ttie) set their fields in their own
+    __init__ instead of calling the base class.
+    """
+    __slots__ = ("source_device_id", "target_device_id", "time", "value")
+    # integer code for the type of event, see event_type
+    type_code = None
+    event_type = None
+
     def __init__(self, source_device_id=None, target_device_id=None, time=None, value=None):
         self.source_device_id = source_device_id
         self.target_device_id = target_device_id
         self.time = time
         self.value = value
-        self.event_type = None
+
+    def __getstate__(self):
+        """Slots aren't pickled without a __getstate__ with the older pickle protocols"""
+        return dict([(name, getattr(self, name)) for name in slot_names(type(self)) if hasattr(self, name)])
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
 
     def __repr__(self):
         return "type= {}, source = {}, target = {}, time={}, value = {}".format(
             self.event_type, self.source_device_id, self.target_device_id, self.time,  self.value
         )
+
+# event class -> names of the slots of the class and its base classes
+class_slot_names = {}
+
+def slot_names(cls):
+    """Names of the slots of an event class and its base classes"""
+    names = class_slot_names.get(cls)
+    if names is None:
+        names = []
+        for c in reversed(cls.__mro__):
+            names.extend(c.__dict__.get("__slots__", ()))
+        class_slot_names[cls] = names
+    return names
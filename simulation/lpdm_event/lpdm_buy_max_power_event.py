@@ -1,8 +1,14 @@
 from lpdm_base_event import LpdmBaseEvent
+import event_type
 
 class LpdmBuyMaxPowerEvent(LpdmBaseEvent):
     """A power source notifies a grid controller the maximum amount of power it can buy at a time"""
-    def __init__(self, source_device_id, target_device_id, time, value):
-        LpdmBaseEvent.__init__(self, source_device_id, target_device_id, time, value)
-        self.event_type = "buy_max_power"
+    __slots__ = ()
+    type_code = event_type.BUY_MAX_POWER
+    event_type = "buy_max_power"
 
+    def __init__(self, source_device_id, target_device_id, time, value):
+        self.source_device_id = source_device_id
+        self.target_device_id = target_device_id
+        self.time = time
+        self.value = value
@@ -1,9 +1,14 @@
 from lpdm_base_event import LpdmBaseEvent
+import event_type
 
 class LpdmBuyPowerEvent(LpdmBaseEvent):
     """A grid controller notifies a power source how much power is available for purchase"""
-    def __init__(self, source_device_id, target_device_id, time, value):
-        LpdmBaseEvent.__init__(self, source_device_id, target_device_id, time, value)
-        self.event_type = "buy_max_power"
-
+    __slots__ = ()
+    type_code = event_type.BUY_POWER
+    event_type = "buy_max_power"
 
+    def __init__(self, source_device_id, target_device_id, time, value):
+        self.source_device_id = source_device_id
+        self.target_device_id = target_device_id
+        self.time = time
+        self.value = value
@@ -1,8 +1,14 @@
 from lpdm_base_event import LpdmBaseEvent
+import event_type
 
 class LpdmBuyPowerPriceEvent(LpdmBaseEvent):
     """A power source notifies a grid controller the price threshold for buying back power"""
-    def __init__(self, source_device_id, target_device_id, time, value):
-        LpdmBaseEvent.__init__(self, source_device_id, target_device_id, time, value)
-        self.event_type = "buy_power_price"
+    __slots__ = ()
+    type_code = event_type.BUY_POWER_PRICE
+    event_type = "buy_power_price"
 
+    def __init__(self, source_device_id, target_device_id, time, value):
+        self.source_device_id = source_device_id
+        self.target_device_id = target_device_id
+        self.time = time
+        self.value = value
@@ -1,7 +1,13 @@
 from lpdm_base_event import LpdmBaseEvent
+import event_type
 
 class LpdmCapacityEvent(LpdmBaseEvent):
-    def __init__(self, source_device_id, target_device_id, time, value):
-        LpdmBaseEvent.__init__(self, source_device_id, target_device_id, time, value)
-        self.event_type = "capacity"
+    __slots__ = ()
+    type_code = event_type.CAPACITY_CHANGE
+    event_type = "capacity"
 
+    def __init__(self, source_device_id, target_device_id, time, value):
+        self.source_device_id = source_device_id
+        self.target_device_id = target_device_id
+        self.time = time
+        self.value = value
@@ -1,10 +1,14 @@
 from lpdm_base_event import LpdmBaseEvent
+import event_type
 
 class LpdmConnectDeviceEvent(LpdmBaseEvent):
     """Connect a device to a grid controller"""
+    __slots__ = ("device_id", "device_type", "DeviceClass", "uuid")
+    type_code = event_type.CONNECT_DEVICE
+    event_type = "connect_device"
+
     def __init__(self, device_id, device_type, DeviceClass=None, uuid=None):
         LpdmBaseEvent.__init__(self)
-        self.event_type = "connect_device"
         self.device_id = device_id
         self.device_type = device_type
         self.DeviceClass = DeviceClass
@@ -0,0 +1,17 @@
+from lpdm_base_event import LpdmBaseEvent
+import event_type
+
+class LpdmFlushEvent(LpdmBaseEvent):
+    """
+    Sent by a device to itself, it's delivered once the events that were already in the supervisor's queue
+    have been routed.
+    """
+    __slots__ = ()
+    type_code = event_type.FLUSH
+    event_type = "flush"
+
+    def __init__(self, source_device_id, target_device_id, time):
+        self.source_device_id = source_device_id
+        self.target_device_id = target_device_id
+        self.time = time
+        self.value = None
@@ -1,7 +1,11 @@
 from lpdm_base_event import LpdmBaseEvent
+import event_type
 
 class LpdmInitEvent(LpdmBaseEvent):
+    __slots__ = ()
+    type_code = event_type.INIT
+    event_type = "init"
+
     def __init__(self):
         LpdmBaseEvent.__init__(self)
-        self.event_type = "init"
 
@@ -1,7 +1,12 @@
 from lpdm_base_event import LpdmBaseEvent
+import event_type
 
 class LpdmKillEvent(LpdmBaseEvent):
-    def __init__(self):
-        LpdmBaseEvent.__init__(self)
-        self.event_type = "kill"
+    __slots__ = ()
+    type_code = event_type.KILL
+    event_type = "kill"
+
+    def __init__(self, end_time=None):
+        """The value is the end time of the simulation"""
+        LpdmBaseEvent.__init__(self, value=end_time)
 
@@ -1,6 +1,13 @@
 from lpdm_base_event import LpdmBaseEvent
+import event_type
 
 class LpdmPriceEvent(LpdmBaseEvent):
+    __slots__ = ()
+    type_code = event_type.PRICE_CHANGE
+    event_type = "price"
+
     def __init__(self, source_device_id, target_device_id, time, value):
-        LpdmBaseEvent.__init__(self, source_device_id, target_device_id, time, value)
-        self.event_type = "price"
+        self.source_device_id = source_device_id
+        self.target_device_id = target_device_id
+        self.time = time
+        self.value = value
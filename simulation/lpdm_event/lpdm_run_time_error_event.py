@@ -1,7 +1,11 @@
 from lpdm_base_event import LpdmBaseEvent
+import event_type
 
 class LpdmRunTimeErrorEvent(LpdmBaseEvent):
+    __slots__ = ("description",)
+    type_code = event_type.RUN_TIME_ERROR
+    event_type = "run_time_error"
+
     def __init__(self, description):
         LpdmBaseEvent.__init__(self)
-        self.event_type = "run_time_error"
         self.description = description
@@ -1,6 +1,15 @@
 from lpdm_base_event import LpdmBaseEvent
+import event_type
 
 class LpdmTtieEvent(LpdmBaseEvent):
-    def __init__(self, target_device_id, value):
-        LpdmBaseEvent.__init__(self, source_device_id=None, target_device_id=target_device_id, value=value)
-        self.event_type = "ttie"
+    # the times of the quiescent wake ups the device skips before this one, see Device.quiescent_interval
+    __slots__ = ("skipped",)
+    type_code = event_type.TTIE
+    event_type = "ttie"
+
+    def __init__(self, target_device_id, value, skipped=None):
+        self.source_device_id = None
+        self.target_device_id = target_device_id
+        self.time = None
+        self.value = value
+        self.skipped = tuple(skipped) if skipped else None
@@ -0,0 +1,151 @@
+################################################################################################################################
+# *** Copyright Notice ***
+#
+# "Price Based Local Power Distribution Management System (Local Power Distribution Manager) v1.0"
+# Copyright (c) 2016, The Regents of the University of California, through Lawrence Berkeley National Laboratory
+# (subject to receipt of any required approvals from the U.S. Dept. of Energy).  All rights reserved.
+#
+# If you have questions about your rights to use or distribute this software, please contact
+# Berkeley Lab's Innovation & Partnerships Office at  IPO@lbl.gov.
+################################################################################################################################
+
+"""
+Generate large scenarios for testing how the simulation scales.
+
+A scenario has n_euds euds of mixed types, n_power_sources power sources and optionally a battery for each
+grid controller.  The devices are spread evenly over the grid controllers, and the schedules and sizes of the
+devices are picked at random from the seed, so the same arguments always give the same scenario.
+
+Usage (from the simulation folder):
+    python scenario_generator.py n_euds [--power-sources M] [--grid-controllers G] [--batteries] [--seed S]
+        [--days D] [-o scenario file]
+"""
+import sys
+import json
+import random
+import argparse
+
+# the refrigerator can't be loaded by the simulation and the utility meter fails when it's given a load,
+# so they aren't included
+EUD_TYPES = ["eud", "air_conditioner_simple", "hvac", "fixed_consumption"]
+POWER_SOURCE_TYPES = ["diesel_generator", "pv"]
+
+def random_schedule(rng):
+    """Turn on in the morning and off in the evening"""
+    return [[rng.randint(0, 11), "on"], [rng.randint(13, 23), "off"]]
+
+def generate_eud(rng, device_type, device_id, grid_controller_id):
+    """The configuration of an eud"""
+    config = {
+        "device_id": device_id,
+        "device_type": device_type,
+        "grid_controller_id": grid_controller_id,
+        "schedule": random_schedule(rng)
+    }
+    if device_type == "eud":
+        config["max_power_output"] = float(rng.randint(5, 50) * 10)
+        config["price_dim"] = 0.3
+        config["price_off"] = 0.7
+    elif device_type == "air_conditioner_simple":
+        config["max_power_output"] = float(rng.randint(20, 60) * 10)
+        config["set_point"] = float(rng.randint(20, 25))
+        config["current_temperature"] = float(rng.randint(20, 30))
+    elif device_type == "hvac":
+        config["current_temperature"] = float(rng.randint(15, 30))
+        config["cool_set_point_low"] = 21.0
+        config["cool_set_point_high"] = 25.0
+        config["heat_set_point_low"] = 16.0
+        config["heat_set_point_high"] = 20.0
+    elif device_type == "fixed_consumption":
+        config["max_power_output"] = float(rng.randint(2, 20) * 10)
+    else:
+        raise Exception("Unknown eud type {}, expected one of {}".format(device_type, EUD_TYPES))
+    return config
+
+def generate_power_source(rng, device_type, device_id, grid_controller_id, capacity):
+    """The configuration of a power source"""
+    config = {
+        "device_id": device_id,
+        "device_type": device_type,
+        "grid_controller_id": grid_controller_id
+    }
+    if device_type == "diesel_generator":
+        config["capacity"] = capacity
+        config["fuel_tank_capacity"] = 100.0
+    elif not device_type == "pv":
+        raise Exception("Unknown power source type {}, expected one of {}".format(device_type, POWER_SOURCE_TYPES))
+    return config
+
+def generate_scenario(n_euds, n_power_sources=1, n_grid_controllers=1, batteries=False, seed=0, run_time_days=1,
+        eud_types=EUD_TYPES, power_source_types=POWER_SOURCE_TYPES):
+    """
+    Build a scenario with n_euds euds and n_power_sources power sources spread over n_grid_controllers.
+    The eud and power source types are used in turn, and each grid controller has a battery when batteries is True.
+    The power sources of a grid controller have enough capacity for all of its euds.
+    """
+    if n_grid_controllers < 1:
+        raise Exception("At least 1 grid controller is required.")
+    if n_power_sources < n_grid_controllers:
+        raise Exception("Each grid controller needs a power source ({} power sources for {} grid controllers)".format(
+            n_power_sources, n_grid_controllers
+        ))
+    rng = random.Random(seed)
+    gc_ids = ["gc_{}".format(i + 1) for i in range(n_grid_controllers)]
+
+    grid_controllers = []
+    for i, gc_id in enumerate(gc_ids):
+        gc = {"device_id": gc_id, "device_type": "grid_controller"}
+        if batteries:
+            gc["battery"] = {"device_id": "bt_{}".format(i + 1)}
+        grid_controllers.append(gc)
+
+    euds = [
+        generate_eud(rng, eud_types[i % len(eud_types)], "eud_{}".format(i + 1), gc_ids[i % n_grid_controllers])
+        for i in range(n_euds)
+    ]
+
+    # enough capacity for the euds of each grid controller, at 600 W each
+    sources_per_gc = n_power_sources // n_grid_controllers
+    euds_per_gc = (n_euds + n_grid_controllers - 1) // n_grid_controllers
+    capacity = max(2000.0, 600.0 * euds_per_gc / sources_per_gc)
+    power_sources = [
+        generate_power_source(
+            rng, power_source_types[i % len(power_source_types)], "ps_{}".format(i + 1), gc_ids[i % n_grid_controllers], capacity
+        )
+        for i in range(n_power_sources)
+    ]
+
+    return {
+        "run_time_days": run_time_days,
+        "seed": seed,
+        "devices": {
+            "grid_controllers": grid_controllers,
+            "power_sources": power_sources,
+            "euds": euds
+        }
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a large scenario.")
+    parser.add_argument("n_euds", type=int, help="number of euds")
+    parser.add_argument("--power-sources", type=int, default=None, help="number of power sources, defaults to 1 per grid controller")
+    parser.add_argument("--grid-controllers", type=int, default=1, help="number of grid controllers")
+    parser.add_argument("--batteries", action="store_true", help="add a battery to each grid controller")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the random schedules and sizes")
+    parser.add_argument("--days", type=float, default=1, help="run time (days)")
+    parser.add_argument("-o", "--output", default=None, help="scenario file, defaults to stdout")
+    args = parser.parse_args()
+
+    config = generate_scenario(
+        args.n_euds,
+        n_power_sources=args.power_sources if args.power_sources else args.grid_controllers,
+        n_grid_controllers=args.grid_controllers,
+        batteries=args.batteries,
+        seed=args.seed,
+        run_time_days=args.days
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(config, f, indent=4)
+    else:
+        json.dump(config, sys.stdout, indent=4)
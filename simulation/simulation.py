@@ -18,36 +18,94 @@ import random
 import json
 import logging
 from supervisor.supervisor import Supervisor
+from supervisor.partition import PartitionRunner
+from supervisor.conservative_runner import ConservativeRunner
+from supervisor.branch_runner import BranchRunner
+from supervisor.checkpoint import read_checkpoint_config
 from simulation_logger import SimulationLogger
 
 class Simulation(object):
     def __init__(self):
         self.config = None
         self.log_manager = None
+        self.checkpoint_file = None
 
     def load_config(self, file_name):
         with open(file_name) as config_file:
             self.config = json.load(config_file)
 
+    def load_checkpoint(self, file_name):
+        """Resume the simulation from a checkpoint, the scenario is loaded from the checkpoint"""
+        self.config = read_checkpoint_config(file_name)
+        self.checkpoint_file = file_name
+        if self.config.get("event_journal"):
+            # write the journal of the resumed simulation with its own logs
+            self.config["event_journal"] = True
+        if self.config.get("profile"):
+            self.config["profile"] = True
+
     def init_logger(self):
         self.log_manager = SimulationLogger(
             console_log_level=self.config.get("console_log_level", logging.DEBUG),
             file_log_level=self.config.get("file_log_level", logging.DEBUG),
             pg_log_level=self.config.get("pg_log_level", logging.DEBUG),
             log_to_postgres=self.config.get("log_to_postgres", False),
-            log_format=self.config.get("log_format", None)
+            log_format=self.config.get("log_format", None),
+            base_path=self.config.get("log_path", "logs")
         )
         self.log_manager.init()
 
     def run(self):
+        if (self.config.get("checkpoint_interval") or self.config.get("branch")) and not "checkpoint_path" in self.config and self.log_manager:
+            # save the checkpoints with the simulation's logs
+            self.config["checkpoint_path"] = os.path.join(self.log_manager.simulation_log_path(), "checkpoints")
+
+        if self.config.get("event_journal") is True:
+            # keep the event journal with the simulation's logs
+            log_path = self.log_manager.simulation_log_path() if self.log_manager else "logs"
+            self.config["event_journal"] = os.path.join(log_path, "events.journal")
+
+        if self.config.get("profile") is True:
+            # write the profile with the simulation's logs
+            log_path = self.log_manager.simulation_log_path() if self.log_manager else "logs"
+            self.config["profile"] = os.path.join(log_path, "profile.json")
+
+        if self.config.get("branch", None):
+            # run the shared part once, then each variant from the branch time
+            branch = self.config["branch"]
+            runner = BranchRunner(
+                self.config, branch["time"], branch["variants"], processes=self.config.get("processes", None)
+            )
+            return runner.run()
+
+        if self.config.get("pdes", False):
+            # run the grid controller partitions in parallel, synchronized by the lookahead
+            runner = ConservativeRunner(self.config, workers=self.config.get("processes", None))
+            return runner.run()
+
+        if self.config.get("multiprocess", False):
+            # run each grid controller and its devices in a separate process
+            runner = PartitionRunner(self.config, processes=self.config.get("processes", None))
+            return runner.run()
+
         supervisor = Supervisor()
-        supervisor.load_config(self.config)
+        if self.checkpoint_file:
+            supervisor.resume_from_checkpoint(self.checkpoint_file)
+            supervisor.journal_file = self.config.get("event_journal", None)
+            supervisor.profile_file = self.config.get("profile", None)
+        else:
+            supervisor.load_config(self.config)
 
         supervisor.run_simulation()
+        return [("simulation", supervisor.error is None)]
 
 if __name__ == "__main__":
     sim = Simulation()
-    sim_file = os.environ.get("SCENARIO_FILE", "scenarios/scenario-A1.json")
-    sim.load_config(sim_file)
+    checkpoint_file = os.environ.get("CHECKPOINT_FILE", None)
+    if checkpoint_file:
+        sim.load_checkpoint(checkpoint_file)
+    else:
+        sim_file = os.environ.get("SCENARIO_FILE", "scenarios/scenario-A1.json")
+        sim.load_config(sim_file)
     sim.init_logger()
     sim.run()
@@ -1,7 +1,6 @@
 import os
 import re
 import logging
-import psycopg2
 
 class PgHandler(logging.Handler):
     """
@@ -20,6 +19,7 @@ class PgHandler(logging.Handler):
     def connect(self):
         """create a connection to the database"""
         if type(self.config) is dict:
+            import psycopg2
             self.conn = psycopg2.connect(
                     host=self.config["pg_host"],
                     port=self.config["pg_port"],
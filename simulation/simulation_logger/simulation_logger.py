@@ -12,6 +12,7 @@
 import os
 import sys
 import re
+import errno
 import logging
 import traceback
 import ConfigParser
@@ -21,9 +22,9 @@ class SimulationLogger:
     """
     This class sets up the logging and handlers for the simulation.
     """
-    def __init__(self, console_log_level=logging.DEBUG, file_log_level=logging.DEBUG, pg_log_level=logging.DEBUG, log_to_postgres=False, log_format=None):
+    def __init__(self, console_log_level=logging.DEBUG, file_log_level=logging.DEBUG, pg_log_level=logging.DEBUG, log_to_postgres=False, log_format=None, base_path="logs"):
         self.app_name = "lpdm"
-        self.base_path = "logs"
+        self.base_path = base_path
         self.folder = None
         self.log_id = None
         self.logger = None
@@ -41,6 +42,13 @@ class SimulationLogger:
 
     def generate_simulation_id(self):
         """build a unique id for each simulation"""
+        if not os.path.exists(self.base_path):
+            try:
+                os.makedirs(self.base_path)
+            except OSError as e:
+                # another simulation may have just created it
+                if e.errno != errno.EEXIST:
+                    raise
         max_id = 0
         for dirname in os.listdir(self.base_path):
             if re.match(r'^simulation_(\d+)$', dirname):
@@ -58,7 +66,19 @@ class SimulationLogger:
             return os.path.join(self.base_path, "simulation_{}".format(self.log_id))
 
     def create_simulation_log_folder(self):
-        os.mkdir(self.simulation_log_path())
+        """
+        Create the folder for the simulation's logs.
+        Creating the folder claims the id, if another simulation started at the same time
+        and already created it, try the next id.
+        """
+        while True:
+            try:
+                os.mkdir(self.simulation_log_path())
+                return
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    raise
+                self.log_id += 1
 
     def app_name(self):
         return "{}_{}".format(self.app_name, self.log_id)
@@ -72,7 +92,7 @@ class SimulationLogger:
         """
         self.logger = logging.getLogger(self.app_name)
         # the handlers won't be able to log anything lower than this log value
-        # so set to the lowest (logging.DEBUG)
+        # so set to the lowest (logging.DEBUG) while the handlers are set up
         self.logger.setLevel(logging.DEBUG)
 
         # setup the formatter
@@ -126,3 +146,12 @@ class SimulationLogger:
                 self.logger.error("Unable to setup the postgres logger")
                 self.logger.error("\n".join(tb))
 
+        # raise the logger level to the lowest level of its handlers,
+        # so messages that no handler would output are dropped before a log record is created.
+        # a handler with no level (NOTSET) outputs everything, and a logger set to NOTSET would use the root
+        # logger's level instead, so keep logging.DEBUG then
+        levels = [h.level for h in self.logger.handlers]
+        if len(levels) and not logging.NOTSET in levels:
+            self.logger.setLevel(min(levels))
+        else:
+            self.logger.setLevel(logging.DEBUG)
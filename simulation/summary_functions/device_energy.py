@@ -0,0 +1,38 @@
+from summary_function_base import SummaryFunction
+from lpdm_event import event_type
+
+class DeviceEnergy(SummaryFunction):
+    """Energy (kWh) of the power events sent from each device to each target, from an event journal"""
+    def __init__(self):
+        SummaryFunction.__init__(self)
+        # (source, target) -> kWh
+        self.energy_kwh = {}
+        # (source, target) -> (time, power) of the last power event
+        self.last_power = {}
+        self.last_time = 0
+
+    def __repr__(self):
+        return "\n".join(
+            ["{} -> {}: {} kWh".format(source, target, kwh) for (source, target), kwh in sorted(self.energy_kwh.items())]
+        )
+
+    def add_energy(self, key, time):
+        """add the energy since the last power event of a source and target up to time"""
+        last_time, power = self.last_power[key]
+        self.energy_kwh[key] = self.energy_kwh.get(key, 0.0) + power * (time - last_time) / 3600.0 / 1000.0
+
+    def process_event(self, source_device_id, target_device_id, type_code, time, value):
+        if time is None:
+            return
+        self.last_time = time
+        if type_code == event_type.POWER_CHANGE:
+            key = (source_device_id, target_device_id)
+            if key in self.last_power:
+                self.add_energy(key, time)
+            self.last_power[key] = (time, value)
+
+    def end(self):
+        """add the energy after the last power events, up to the time of the last event"""
+        for key in self.last_power.keys():
+            self.add_energy(key, self.last_time)
+            self.last_power[key] = (self.last_time, self.last_power[key][1])
@@ -0,0 +1,30 @@
+"""
+Replay an event journal into summary functions.
+
+Usage (from the simulation folder):
+    PYTHONPATH=. python summary_functions/replay_journal.py logs/simulation_<id>/events.journal
+"""
+import sys
+import time
+from supervisor.event_journal import read_journal
+from device_energy import DeviceEnergy
+
+def replay(file_name, summary_functions):
+    """Pass each event in the journal to the summary functions, returns the number of events"""
+    n = 0
+    process_event = [s.process_event for s in summary_functions]
+    for record in read_journal(file_name):
+        for f in process_event:
+            f(*record)
+        n += 1
+    for s in summary_functions:
+        s.end()
+    return n
+
+if __name__ == "__main__":
+    summary_functions = [DeviceEnergy()]
+    start = time.time()
+    n = replay(sys.argv[1], summary_functions)
+    for s in summary_functions:
+        print s
+    print "replayed {} events in {:.2f} s".format(n, time.time() - start)
@@ -12,6 +12,9 @@ class SummaryFunction(object):
     def process_line(self):
         pass
 
-    def end(self):
+    def process_event(self, source_device_id, target_device_id, type_code, time, value):
+        """process a single event replayed from an event journal"""
         pass
 
+    def end(self):
+        pass
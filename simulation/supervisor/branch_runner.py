@@ -0,0 +1,73 @@
+import os
+import sys
+import copy
+import logging
+import traceback
+import multiprocessing
+from supervisor import Supervisor
+from partition import use_partition_log_files
+from checkpoint import checkpoint_file_name
+from event_journal import partition_journal_file
+
+def run_variant(args):
+    """Run a variant from the branch checkpoint, returns (variant name, True if it finished without errors)"""
+    file_name, name, overrides = args
+    try:
+        use_partition_log_files(name)
+        supervisor = Supervisor()
+        supervisor.resume_from_checkpoint(file_name, overrides)
+        if supervisor.journal_file:
+            # the events of each variant after the branch time are in a separate journal
+            supervisor.journal_file = partition_journal_file(supervisor.journal_file, name)
+        if isinstance(supervisor.profile_file, basestring):
+            supervisor.profile_file = partition_journal_file(supervisor.profile_file, name)
+        supervisor.run_simulation()
+        return (name, supervisor.error is None)
+    except Exception as e:
+        exc_type, exc_value, exc_traceback = sys.exc_info()
+        tb = traceback.format_exception(exc_type, exc_value, exc_traceback)
+        logging.getLogger("lpdm").error("\n".join(tb))
+        return (name, False)
+
+class BranchRunner(object):
+    """
+    Runs several variants of a scenario that only differ after a branch time.
+    The part of the simulation before the branch time is run once and saved to a checkpoint,
+    then each variant is resumed from the checkpoint in its own process with its changes to the devices
+    (device_id -> configuration changes) applied at the branch time.
+    """
+    def __init__(self, config, branch_time, variants, processes=None):
+        self.config = config
+        self.branch_time = branch_time
+        # variant name -> device_id -> configuration changes
+        self.variants = variants
+        self.processes = processes
+        self.checkpoint_path = config.get("checkpoint_path", "checkpoints")
+
+    def run_prefix(self):
+        """Run the simulation up to the branch time and save a checkpoint, returns the checkpoint file name"""
+        file_name = checkpoint_file_name(self.checkpoint_path, self.branch_time)
+        supervisor = Supervisor()
+        supervisor.load_config(copy.deepcopy(self.config))
+        try:
+            supervisor.start_devices()
+            supervisor.run_until(self.branch_time)
+            supervisor.save_checkpoint(file_name)
+            supervisor.logger.debug(supervisor.build_message("saved checkpoint {}".format(file_name)))
+        finally:
+            supervisor.stop_simulation()
+        return file_name
+
+    def run(self):
+        """Run the variants, returns a list of (variant name, True if it finished without errors)"""
+        file_name = self.run_prefix()
+        pool = multiprocessing.Pool(processes=self.processes)
+        try:
+            return pool.map(
+                run_variant,
+                [(file_name, name, overrides) for name, overrides in sorted(self.variants.items())],
+                chunksize=1
+            )
+        finally:
+            pool.close()
+            pool.join()
@@ -0,0 +1,98 @@
+"""
+Save and load the state of a simulation.
+
+A checkpoint file has two pickles: a header with the format version, the simulation time and the scenario
+configuration, followed by the state of the supervisor and the devices.
+Loggers aren't stored, they're looked up by name when the checkpoint is loaded, and the broadcast callbacks of
+the devices are reconnected to the device threads of the supervisor that loads the checkpoint.
+"""
+import os
+import types
+import logging
+import copy_reg
+import cPickle as pickle
+
+CHECKPOINT_FORMAT = "lpdm-checkpoint"
+CHECKPOINT_VERSION = 1
+
+def reduce_method(m):
+    """Pickle a bound method as its instance and name"""
+    return (getattr, (m.im_self, m.im_func.__name__))
+
+copy_reg.pickle(types.MethodType, reduce_method)
+
+def clean_config(config):
+    """Copy the scenario configuration without the broadcast callbacks added to the device configs"""
+    cleaned = dict(config)
+    cleaned["devices"] = dict(
+        [(section, [dict([(k, v) for k, v in dc.items() if k != "broadcast"]) for dc in devices])
+            for section, devices in config["devices"].items()]
+    )
+    return cleaned
+
+def checkpoint_file_name(path, time):
+    """Name of the checkpoint file for a simulation time"""
+    return os.path.join(path, "checkpoint_{}.pkl".format(int(time)))
+
+def save_checkpoint(file_name, config, time, state):
+    """
+    Write a checkpoint.
+    The file is written under a temporary name then renamed, so a crash doesn't leave a partial checkpoint.
+    """
+    def persistent_id(obj):
+        if isinstance(obj, logging.Logger):
+            return "logger:{}".format(obj.name)
+        if isinstance(obj, types.MethodType) and obj.im_func.__name__ == "supervisor_callback":
+            return "broadcast:{}".format(obj.im_self.device_id)
+        return None
+
+    path = os.path.dirname(file_name)
+    if path and not os.path.exists(path):
+        os.makedirs(path)
+    tmp_file_name = "{}.tmp".format(file_name)
+    with open(tmp_file_name, "wb") as f:
+        pickle.dump(
+            {"format": CHECKPOINT_FORMAT, "version": CHECKPOINT_VERSION, "time": time, "config": clean_config(config)},
+            f,
+            pickle.HIGHEST_PROTOCOL
+        )
+        pickler = pickle.Pickler(f, pickle.HIGHEST_PROTOCOL)
+        pickler.persistent_id = persistent_id
+        pickler.dump(state)
+    os.rename(tmp_file_name, file_name)
+
+def load_checkpoint_header(f):
+    """Read the header of a checkpoint and check its version"""
+    header = pickle.load(f)
+    if not isinstance(header, dict) or header.get("format") != CHECKPOINT_FORMAT:
+        raise Exception("Not a checkpoint file.")
+    if header["version"] != CHECKPOINT_VERSION:
+        raise Exception(
+            "Checkpoint version {} is not supported (expected {}).".format(header["version"], CHECKPOINT_VERSION)
+        )
+    return header
+
+def read_checkpoint_config(file_name):
+    """Get the scenario configuration stored in a checkpoint"""
+    with open(file_name, "rb") as f:
+        return load_checkpoint_header(f)["config"]
+
+def load_checkpoint(file_name, get_broadcast_callback):
+    """
+    Read a checkpoint, returns (header, state).
+    get_broadcast_callback is called with a device_id to get the broadcast callback for the device.
+    """
+    def persistent_load(pid):
+        kind, name = pid.split(":", 1)
+        if kind == "logger":
+            return logging.getLogger(name)
+        elif kind == "broadcast":
+            return get_broadcast_callback(name)
+        raise Exception("Unknown persistent id {} in checkpoint.".format(pid))
+
+    with open(file_name, "rb") as f:
+        header = load_checkpoint_header(f)
+        unpickler = pickle.Unpickler(f)
+        unpickler.persistent_load = persistent_load
+        state = unpickler.load()
+    return header, state
@@ -0,0 +1,192 @@
+import sys
+import logging
+import traceback
+import multiprocessing
+from supervisor import Supervisor
+from partition import partition_config, partition_id, partition_file_handler
+
+class PartitionLogs(object):
+    """Switch the file handlers of the app logger between the partitions run by a worker"""
+    def __init__(self, partition_ids):
+        self.logger = logging.getLogger("lpdm")
+        file_handlers = [h for h in self.logger.handlers if isinstance(h, logging.FileHandler)]
+        for h in file_handlers:
+            self.logger.removeHandler(h)
+            h.close()
+        # partition id -> file handlers for the partition
+        self.handlers = dict([(pid, [partition_file_handler(h, pid) for h in file_handlers]) for pid in partition_ids])
+        self.current = None
+
+    def use(self, pid):
+        """Send the log messages to the partition's log files"""
+        if pid != self.current:
+            for h in self.handlers.get(self.current, []):
+                self.logger.removeHandler(h)
+            for h in self.handlers[pid]:
+                self.logger.addHandler(h)
+            self.current = pid
+
+def run_worker(conn, partitions):
+    """
+    Run a group of partitions in a worker process.
+    The worker waits for the coordinator to tell it how far it can advance, then replies with the time of
+    the next event for each of its partitions and the cross partition events sent by its devices.
+    """
+    logs = PartitionLogs([partition_id(p) for p in partitions])
+    supervisors = []
+    try:
+        for config in partitions:
+            pid = partition_id(config)
+            logs.use(pid)
+            supervisor = Supervisor()
+            supervisor.load_config(config)
+            supervisor.outbox = []
+            supervisors.append((pid, supervisor))
+            supervisor.start_devices()
+        conn.send(("done", next_event_times(supervisors), collect_outbox(supervisors)))
+
+        while True:
+            message = conn.recv()
+            if message[0] == "advance":
+                end_time, inbound = message[1], message[2]
+                by_id = dict(supervisors)
+                for pid, entry in inbound:
+                    by_id[pid].receive_delayed_event(entry)
+                for pid, supervisor in supervisors:
+                    logs.use(pid)
+                    supervisor.run_until(end_time)
+                conn.send(("done", next_event_times(supervisors), collect_outbox(supervisors)))
+            elif message[0] == "finish":
+                # everything left is at or after the end of the simulation
+                for pid, supervisor in supervisors:
+                    logs.use(pid)
+                    while supervisor.dispatch_next():
+                        pass
+                conn.send(("finished", None, []))
+                break
+            else:
+                break
+    except Exception as e:
+        exc_type, exc_value, exc_traceback = sys.exc_info()
+        tb = traceback.format_exception(exc_type, exc_value, exc_traceback)
+        logging.getLogger("lpdm").error("\n".join(tb))
+        conn.send(("error", None, []))
+    finally:
+        for pid, supervisor in supervisors:
+            logs.use(pid)
+            supervisor.stop_simulation()
+        conn.close()
+
+def next_event_times(supervisors):
+    """partition id -> time of the next event"""
+    return dict([(pid, s.next_event_time()) for pid, s in supervisors])
+
+def collect_outbox(supervisors):
+    """Get the cross partition events sent by the devices and empty the outboxes"""
+    entries = []
+    for pid, supervisor in supervisors:
+        entries.extend(supervisor.outbox)
+        supervisor.outbox = []
+    return entries
+
+class ConservativeRunner(object):
+    """
+    Runs the grid controller partitions of a scenario in parallel with conservative synchronization.
+
+    Events passed between partitions are delivered lookahead seconds after they're sent, so no partition
+    can affect another one sooner than lookahead seconds after its next event.  Each round the coordinator
+    finds the earliest pending event in any partition (including cross partition events in transit),
+    and every partition can safely process its events up to that time + lookahead.
+    The results are the same as running all of the partitions in a single supervisor with the same lookahead.
+    """
+    def __init__(self, config, workers=None):
+        self.config = config
+        self.workers = workers if workers else multiprocessing.cpu_count()
+        self.lookahead = config.get("lookahead", 0)
+        if not self.lookahead > 0:
+            raise Exception("The lookahead must be greater than 0 to run the partitions in parallel.")
+        self.max_ttie = config.get('run_time_days', 7) * 24 * 60 * 60
+        self.partitions = partition_config(config)
+        # device_id -> partition id
+        self.partition_by_device = {}
+        for p in self.partitions:
+            for section in ["grid_controllers", "power_sources", "euds"]:
+                for dc in p["devices"][section]:
+                    self.partition_by_device[dc["device_id"]] = partition_id(p)
+
+    def run(self):
+        """Run the partitions, returns a list of (partition id, True if it finished without errors)"""
+        n_workers = min(self.workers, len(self.partitions))
+        groups = [self.partitions[i::n_workers] for i in range(n_workers)]
+        # partition id -> worker index
+        worker_by_partition = {}
+        for i, group in enumerate(groups):
+            for p in group:
+                worker_by_partition[partition_id(p)] = i
+
+        connections = []
+        processes = []
+        for group in groups:
+            parent_conn, child_conn = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=run_worker, args=(child_conn, group))
+            process.start()
+            connections.append(parent_conn)
+            processes.append(process)
+
+        next_times = {}
+        in_transit = []
+        # indexes of the workers that stopped on an error
+        failed = set()
+        try:
+            active = range(n_workers)
+            while True:
+                for i in active:
+                    status, times, outbox = connections[i].recv()
+                    if status == "error":
+                        failed.add(i)
+                    else:
+                        next_times.update(times)
+                        in_transit.extend(outbox)
+                if len(failed):
+                    break
+
+                # the earliest time any partition can be affected by another one
+                times = [t for t in next_times.values() if not t is None] + [e[0] for e in in_transit]
+                lower_bound = min(times) if len(times) else None
+                if lower_bound is None or lower_bound >= self.max_ttie:
+                    break
+                end_time = lower_bound + self.lookahead
+
+                # deliver the events in transit
+                inbound = [[] for i in range(n_workers)]
+                for entry in in_transit:
+                    pid = self.partition_by_device[entry[3].target_device_id]
+                    inbound[worker_by_partition[pid]].append((pid, entry))
+                in_transit = []
+
+                # only advance the workers that have something to do before end_time
+                active = []
+                for i, group in enumerate(groups):
+                    pending = [next_times[partition_id(p)] for p in group if not next_times[partition_id(p)] is None]
+                    if len(inbound[i]) or (len(pending) and min(pending) < end_time):
+                        connections[i].send(("advance", end_time, inbound[i]))
+                        active.append(i)
+
+            if len(failed):
+                # stop the rest of the workers
+                for i in range(n_workers):
+                    if not i in failed:
+                        connections[i].send(("stop",))
+            else:
+                for i in range(n_workers):
+                    connections[i].send(("finish",))
+                for i in range(n_workers):
+                    status, times, outbox = connections[i].recv()
+                    if status == "error":
+                        failed.add(i)
+        finally:
+            for process in processes:
+                process.join()
+
+        failed_partitions = set([partition_id(p) for i in failed for p in groups[i]])
+        return [(partition_id(p), not partition_id(p) in failed_partitions) for p in self.partitions]
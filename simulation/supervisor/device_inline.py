@@ -0,0 +1,91 @@
+import logging
+import sys
+import traceback
+from lpdm_event import LpdmInitEvent, LpdmRunTimeErrorEvent, LpdmBaseEvent
+from simulation_logger import message_formatter
+
+class DeviceInline(object):
+    """
+    Runs a device in the supervisor's thread.
+    Has the same interface as DeviceThread, but events are passed directly to the device
+    instead of going through a queue to a separate thread.
+    """
+    def __init__(self, name=None, device_id=None, DeviceClass=None, device_config=None, supervisor_queue=None):
+        self.name = name
+        self.device_id = device_id
+        self.DeviceClass = DeviceClass
+        self.device_config = device_config
+        self.supervisor_queue = supervisor_queue
+        self.device = None
+        # when set, events broadcast by the device are kept here instead of going to the supervisor's queue
+        self.outbox = None
+        # records the time the device takes to handle each event when the simulation is profiled
+        self.profiler = None
+
+        self.logger = logging.getLogger("lpdm")
+
+    def build_message(self, message="", tag="", value=""):
+        """Build the log message string, same as DeviceThread so logs from both engines can be compared"""
+        return message_formatter.build_message(
+            message=message,
+            tag=tag,
+            value=value,
+            time_seconds=None,
+            device_id="device_thread"
+        )
+
+    def start(self):
+        """Nothing to start, the device runs in the caller's thread"""
+        # a device restored from a checkpoint is already running
+        if self.device is None:
+            self.logger.debug(self.build_message("run the device thread for device id {}".format(self.device_id)))
+
+    def join(self):
+        """Nothing to wait for"""
+        pass
+
+    def dispatch(self, the_event):
+        """Pass an event to the device, errors are reported to the supervisor as with a DeviceThread"""
+        try:
+            if isinstance(the_event, LpdmInitEvent):
+                self.logger.debug(self.build_message("found an init event {}".format(the_event)))
+                self.init_device()
+            elif not the_event is None:
+                if self.profiler is None:
+                    self.device.process_supervisor_event(the_event)
+                else:
+                    start = self.profiler.clock()
+                    self.device.process_supervisor_event(the_event)
+                    self.profiler.record_event(self.device_id, the_event, self.profiler.clock() - start)
+        except Exception as e:
+            exc_type, exc_value, exc_traceback = sys.exc_info()
+            tb = traceback.format_exception(exc_type, exc_value, exc_traceback)
+            self.logger.error("\n".join(tb))
+            self.supervisor_queue.put(LpdmRunTimeErrorEvent("\n".join(tb)))
+
+    def init_device(self):
+        """initialize the device"""
+        # add the supervisor callback to the config dictionary
+        self.add_supervisor_callback(self.device_config)
+        self.device = self.DeviceClass(self.device_config)
+        self.device.init()
+        self.device.set_initialized(True)
+
+    def restore_device(self, device):
+        """Use a device restored from a checkpoint instead of creating a new one"""
+        self.add_supervisor_callback(self.device_config)
+        self.device = device
+
+    def add_supervisor_callback(self, config):
+        config["broadcast"] = self.supervisor_callback
+
+    def supervisor_callback(self, broadcast_message):
+        """Broadcast a message from a device to the supervisor/other devices"""
+        if not isinstance(broadcast_message, LpdmBaseEvent):
+            raise Exception(
+                "Attempt to pass a non BroadcastMessage object to the supervisor ({})".format(broadcast_message)
+            )
+        if self.outbox is None:
+            self.supervisor_queue.put(broadcast_message)
+        else:
+            self.outbox.append(broadcast_message)
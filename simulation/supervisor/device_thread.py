@@ -18,6 +18,10 @@ class DeviceThread(threading.Thread):
         self.queue = queue
         self.supervisor_queue = supervisor_queue
         self.device = None
+        # when set, events broadcast by the device are kept here instead of going to the supervisor's queue
+        self.outbox = None
+        # records the time the device takes to handle each event when the simulation is profiled
+        self.profiler = None
 
         self.logger = logging.getLogger("lpdm")
 
@@ -32,7 +36,9 @@ class DeviceThread(threading.Thread):
         )
 
     def run(self):
-        self.logger.debug(self.build_message("run the device thread for device id {}".format(self.device_id)))
+        # a device restored from a checkpoint is already running
+        if self.device is None:
+            self.logger.debug(self.build_message("run the device thread for device id {}".format(self.device_id)))
 
         the_event = None
         # loop until a kill event is received
@@ -44,7 +50,12 @@ class DeviceThread(threading.Thread):
                     self.logger.debug(self.build_message("found an init event {}".format(the_event)))
                     self.init_device()
                 elif not the_event is None:
-                    self.device.process_supervisor_event(the_event)
+                    if self.profiler is None:
+                        self.device.process_supervisor_event(the_event)
+                    else:
+                        start = self.profiler.clock()
+                        self.device.process_supervisor_event(the_event)
+                        self.profiler.record_event(self.device_id, the_event, self.profiler.clock() - start)
                 self.queue.task_done()
             except Exception as e:
                 exc_type, exc_value, exc_traceback = sys.exc_info()
@@ -53,6 +64,11 @@ class DeviceThread(threading.Thread):
                 self.supervisor_queue.put(LpdmRunTimeErrorEvent("\n".join(tb)))
                 self.queue.task_done()
 
+    def dispatch(self, the_event):
+        """Pass an event to the device and wait for it to be processed"""
+        self.queue.put(the_event)
+        self.queue.join()
+
     def init_device(self):
         """initialize the device"""
         # add the supervisor callback to the config dictionary
@@ -61,6 +77,11 @@ class DeviceThread(threading.Thread):
         self.device.init()
         self.device.set_initialized(True)
 
+    def restore_device(self, device):
+        """Use a device restored from a checkpoint instead of creating a new one"""
+        self.add_supervisor_callback(self.device_config)
+        self.device = device
+
     def add_supervisor_callback(self, config):
         config["broadcast"] = self.supervisor_callback
 
@@ -71,4 +92,7 @@ class DeviceThread(threading.Thread):
             raise Exception(
                 "Attempt to pass a non BroadcastMessage object to the supervisor ({})".format(broadcast_message)
             )
-        self.supervisor_queue.put(broadcast_message)
+        if self.outbox is None:
+            self.supervisor_queue.put(broadcast_message)
+        else:
+            self.outbox.append(broadcast_message)
@@ -2,16 +2,32 @@ import logging
 import Queue
 from lpdm_event import LpdmInitEvent, LpdmKillEvent, LpdmConnectDeviceEvent, LpdmAssignGridControllerEvent
 from device_thread import DeviceThread
+from device_inline import DeviceInline
 from device.simulated.grid_controller import GridController
 from device.base.power_source import PowerSource
 from device.simulated.eud import Eud
 from simulation_logger import message_formatter
 
+ENGINES = ("threaded", "inline")
+
 class DeviceThreadManager(object):
-    def __init__(self, supervisor_queue):
+    """
+    Creates and keeps track of the devices.
+    With the "threaded" engine each device runs in its own DeviceThread,
+    with the "inline" engine the devices are called directly from the supervisor's thread.
+    """
+    def __init__(self, supervisor_queue, engine="threaded"):
         self.logger = logging.getLogger("lpdm")
         self.supervisor_queue = supervisor_queue
         self.threads = []
+        # device_id -> device thread, for routing events
+        self.threads_by_id = {}
+        # device_id -> device_id of the grid controller the device is connected to
+        self.partition_by_id = {}
+        self.engine = None
+        self.set_engine(engine)
+        # passed to the device threads when the simulation is profiled
+        self.profiler = None
 
     def build_message(self, message="", tag="", value=""):
         """Build the log message string"""
@@ -23,37 +39,71 @@ class DeviceThreadManager(object):
             device_id="device_thread_mgr"
         )
 
+    def set_engine(self, engine):
+        """Set how the devices are run, must be called before any devices are added"""
+        if not engine in ENGINES:
+            raise Exception("Unknown engine {}, must be one of {}".format(engine, ENGINES))
+        if len(self.threads):
+            raise Exception("The engine cannot be changed after devices have been added.")
+        self.engine = engine
+
     def add(self, DeviceClass, device_config):
         """store a thread and linking device_id"""
         # check and make sure the device_id is not being used
         device_id = device_config.get("device_id")
-        if self.get(device_id):
-            # quit if get returns anytyhing other than None
+        if device_id in self.threads_by_id:
+            # quit if the device_id has already been added
             raise Exception("The device_id {} is being used by multiple devices".format(device_id))
-        # create the message queue
-        q = Queue.Queue(maxsize=1)
-        # create the actual thread
-        t = DeviceThread(
-            name="Thread-{}".format(device_id),
-            device_id=device_id,
-            DeviceClass=DeviceClass,
-            device_config=device_config,
-            queue=q,
-            supervisor_queue=self.supervisor_queue
-        )
+        if self.engine == "inline":
+            t = DeviceInline(
+                name="Thread-{}".format(device_id),
+                device_id=device_id,
+                DeviceClass=DeviceClass,
+                device_config=device_config,
+                supervisor_queue=self.supervisor_queue
+            )
+        else:
+            # create the message queue
+            q = Queue.Queue(maxsize=1)
+            # create the actual thread
+            t = DeviceThread(
+                name="Thread-{}".format(device_id),
+                device_id=device_id,
+                DeviceClass=DeviceClass,
+                device_config=device_config,
+                queue=q,
+                supervisor_queue=self.supervisor_queue
+            )
+        t.profiler = self.profiler
         # keep track of the thread along with its metadata
         self.threads.append(t)
+        self.threads_by_id[device_id] = t
         self.logger.debug(self.build_message("added device class {}".format(DeviceClass)))
 
     def get(self, device_id):
         """Get a "managed thread" by a device_id"""
-        for t in self.threads:
-            if t.device_id == device_id:
-                return t
-        return None
+        return self.threads_by_id.get(device_id)
 
     def grid_controllers(self):
         """Return a list of grid controllers"""
+        return filter(lambda t: t.DeviceClass is GridController, self.threads)
+
+    def grid_controller_for(self, t, gcs):
+        """
+        Find the grid controller a device is attached to, from the grid_controller_id in its config.
+        If there's only 1 grid controller the grid_controller_id can be left out.
+        """
+        gc_id = t.device_config.get("grid_controller_id", None)
+        if gc_id is None:
+            if len(gcs) == 1:
+                return gcs[0]
+            raise Exception(
+                "The device {} needs a grid_controller_id when there are multiple grid controllers".format(t.device_id)
+            )
+        for gc in gcs:
+            if gc.device_id == gc_id:
+                return gc
+        raise Exception("Grid controller {} for device {} not found".format(gc_id, t.device_id))
 
     def start_all(self):
         """Start all of the threads"""
@@ -62,18 +112,23 @@ class DeviceThreadManager(object):
         # wait for each one to finish initializing
         for t in self.threads:
             self.logger.debug(self.build_message("starting thread {}".format(t.device_id)))
-            t.queue.put(LpdmInitEvent())
             t.start()
-            t.queue.join()
+            t.dispatch(LpdmInitEvent())
         self.logger.debug(self.build_message("finished starting threads"))
 
+    def restore_all(self, devices):
+        """Start the threads with the devices restored from a checkpoint (device_id -> device)"""
+        for t in self.threads:
+            t.restore_device(devices[t.device_id])
+            t.start()
+
     def connect_devices(self):
         """
         Connect devices to the appropriate grid controllers,
         And let the eud's know which gc they're connected to
         """
         # find the grid controllers
-        gcs = filter(lambda t: t.DeviceClass is GridController, self.threads)
+        gcs = self.grid_controllers()
         # find the power sources
         dgs = filter(lambda t: issubclass(t.DeviceClass, PowerSource), self.threads)
         # find the euds
@@ -81,57 +136,37 @@ class DeviceThreadManager(object):
             lambda t: not issubclass(t.DeviceClass, GridController) and not issubclass(t.DeviceClass, PowerSource), self.threads
         )
 
-        # TODO: allow for more than 1 grid controller
-        if len(gcs) > 1:
-            raise Exception("Only 1 grid controller is allowed to run at a time.")
+        if len(gcs) == 0:
+            raise Exception("At least 1 grid controller is required.")
 
-        gc = gcs[0]
-        for dg in dgs:
-            # put the event in the queue
-            gc.queue.put(
-                LpdmConnectDeviceEvent(
-                    device_id=dg.device_config["device_id"],
-                    device_type=dg.device_config["device_type"],
-                    DeviceClass=dg.DeviceClass,
-                    uuid=dg.device_config.get("uuid", None)
-                )
-            )
-            # wait for the event to finish
-            gc.queue.join()
-            # let the device know which gc they're connected to
-            dg.queue.put(
-                LpdmAssignGridControllerEvent(grid_controller_id=gc.device_config["device_id"])
-            )
-            dg.queue.join()
+        for gc in gcs:
+            self.partition_by_id[gc.device_id] = gc.device_id
 
-        # add the eud's
-        for eud in euds:
-            # put the event in the queue
-            gc.queue.put(
+        # add the power sources, then the eud's
+        for t in dgs + euds:
+            gc = self.grid_controller_for(t, gcs)
+            self.partition_by_id[t.device_id] = gc.device_id
+            # connect the device to the gc and wait for the event to finish
+            gc.dispatch(
                 LpdmConnectDeviceEvent(
-                    device_id=eud.device_config["device_id"],
-                    device_type=eud.device_config["device_type"],
-                    DeviceClass=eud.DeviceClass,
-                    uuid=eud.device_config.get("uuid", None)
+                    device_id=t.device_config["device_id"],
+                    device_type=t.device_config["device_type"],
+                    DeviceClass=t.DeviceClass,
+                    uuid=t.device_config.get("uuid", None)
                 )
             )
-            # wait for the event to finish
-            gc.queue.join()
-
             # let the device know which gc they're connected to
-            eud.queue.put(
+            t.dispatch(
                 LpdmAssignGridControllerEvent(grid_controller_id=gc.device_config["device_id"])
             )
-            eud.queue.join()
 
-    def kill_all(self):
-        """Gracefully kill all device threads"""
+    def kill_all(self, end_time=None):
+        """Gracefully kill all devices, end_time is the end time of the simulation"""
         self.logger.debug(self.build_message("kill all threads"))
         # send a kill event to each thread
         for t in self.threads:
             self.logger.debug(self.build_message('kill thread {}'.format(t.name)))
-            t.queue.put(LpdmKillEvent())
-            t.queue.join()
+            t.dispatch(LpdmKillEvent(end_time))
 
     def wait_for_all(self):
         """Wait for all threads (call join method for each thread)"""
@@ -0,0 +1,57 @@
+"""
+Group the simple euds of a scenario into fleets that are run by the vectorized eud_fleet device.
+
+The euds of each type that are attached to the same grid controller become the members of one fleet,
+the fleet's device_id is fleet_<grid_controller_id>_<device_type>.
+"""
+
+# the eud types an eud_fleet can run
+FLEET_TYPES = ["eud", "air_conditioner_simple"]
+
+# keys of the eud configuration that the fleet doesn't implement, euds with them are run by the event engine
+UNSUPPORTED_KEYS = {
+    "eud": ["scenario", "is_real_device"],
+    "air_conditioner_simple": ["scenario", "is_real_device", "set_point_schedule", "precooling"]
+}
+
+DEFAULT_TIMESTEP = 60.0
+
+def can_join_fleet(config):
+    """Can the eud be run by a fleet?"""
+    device_type = config.get("device_type")
+    return (
+        device_type in FLEET_TYPES
+        and config.get("simulated_or_real", "simulated") == "simulated"
+        and not config.get("grid_controller_id") is None
+        and not any(key in config for key in UNSUPPORTED_KEYS[device_type])
+    )
+
+def build_fleets(euds, options=True):
+    """
+    Replace the euds that can be run by a fleet with the fleets' configurations.
+    options is the scenario's vectorized_euds setting, True or a dict with the timestep (seconds).
+    Returns the new list of eud configurations, the fleets take the place of their first member.
+    """
+    timestep = options.get("timestep", DEFAULT_TIMESTEP) if type(options) is dict else DEFAULT_TIMESTEP
+    if not timestep > 0:
+        raise Exception("The vectorized_euds timestep must be greater than 0 ({})".format(timestep))
+    result = []
+    fleets = {}
+    for config in euds:
+        if not can_join_fleet(config):
+            result.append(config)
+            continue
+        key = (config["grid_controller_id"], config["device_type"])
+        if not key in fleets:
+            fleets[key] = {
+                "device_id": "fleet_{}_{}".format(*key),
+                "device_type": "eud_fleet",
+                "grid_controller_id": key[0],
+                "uuid": config.get("uuid", None),
+                "member_type": key[1],
+                "timestep": timestep,
+                "members": []
+            }
+            result.append(fleets[key])
+        fleets[key]["members"].append(config)
+    return result
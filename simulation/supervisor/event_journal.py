@@ -0,0 +1,187 @@
+"""
+Binary journal of the events routed by the supervisor.
+
+A journal is a header followed by an append-only stream of records:
+    string record: "S", id, length, utf-8 bytes
+    event record:  "E", source string id, target string id, type code, value kind, time, value
+Device ids and other string values are interned, each string is written once the first time it's seen and
+referred to by its id after that (id 0 is None).  A time of None is stored as NaN.
+If the simulation stops in the middle of writing a record the incomplete record at the end is ignored.
+"""
+import os
+import struct
+import cPickle as pickle
+
+JOURNAL_MAGIC = "LPDMJRNL"
+JOURNAL_VERSION = 1
+
+HEADER = struct.Struct("<8sH")
+STRING_RECORD = struct.Struct("<cIH")
+EVENT_RECORD = struct.Struct("<cIIBBd")
+INT_VALUE = struct.Struct("<q")
+FLOAT_VALUE = struct.Struct("<d")
+ID_VALUE = struct.Struct("<I")
+BOOL_VALUE = struct.Struct("<?")
+# event records with a number value, written with a single pack
+FLOAT_EVENT_RECORD = struct.Struct("<cIIBBdd")
+INT_EVENT_RECORD = struct.Struct("<cIIBBdq")
+
+# kinds of event values
+VALUE_NONE = 0
+VALUE_INT = 1
+VALUE_FLOAT = 2
+VALUE_STRING = 3
+VALUE_BOOL = 4
+VALUE_PICKLE = 5
+
+# size of the value for each kind of value
+VALUE_STRUCTS = {VALUE_INT: INT_VALUE, VALUE_FLOAT: FLOAT_VALUE, VALUE_STRING: ID_VALUE, VALUE_BOOL: BOOL_VALUE}
+
+INT_MIN = -2 ** 63
+INT_MAX = 2 ** 63 - 1
+
+NAN = float("nan")
+
+def partition_journal_file(file_name, name):
+    """Name of the journal for a partition or variant of a simulation (events.journal -> events_<name>.journal)"""
+    root, ext = os.path.splitext(file_name)
+    return "{}_{}{}".format(root, name, ext)
+
+class EventJournal(object):
+    """Write events to a journal file"""
+    def __init__(self, file_name, buffer_size=1 << 20):
+        path = os.path.dirname(file_name)
+        if path and not os.path.exists(path):
+            os.makedirs(path)
+        self.file_name = file_name
+        self.f = open(file_name, "wb", buffer_size)
+        self.f.write(HEADER.pack(JOURNAL_MAGIC, JOURNAL_VERSION))
+        # string -> id
+        self.string_ids = {None: 0}
+        self.n_events = 0
+
+    def string_id(self, value):
+        """Get the id of a string, writing a string record the first time it's seen"""
+        string_id = self.string_ids.get(value)
+        if string_id is None:
+            string_id = len(self.string_ids)
+            self.string_ids[value] = string_id
+            data = value.encode("utf-8")
+            self.f.write(STRING_RECORD.pack("S", string_id, len(data)))
+            self.f.write(data)
+        return string_id
+
+    def write(self, the_event):
+        """Add an event to the journal"""
+        string_ids = self.string_ids
+        source = string_ids.get(the_event.source_device_id)
+        if source is None:
+            source = self.string_id(the_event.source_device_id)
+        target = string_ids.get(the_event.target_device_id)
+        if target is None:
+            target = self.string_id(the_event.target_device_id)
+        time = the_event.time
+        if time is None:
+            time = NAN
+
+        value = the_event.value
+        value_type = type(value)
+        if value_type is float:
+            self.f.write(FLOAT_EVENT_RECORD.pack("E", source, target, the_event.type_code, VALUE_FLOAT, time, value))
+        elif (value_type is int or value_type is long) and INT_MIN <= value <= INT_MAX:
+            self.f.write(INT_EVENT_RECORD.pack("E", source, target, the_event.type_code, VALUE_INT, time, value))
+        elif value is None:
+            self.f.write(EVENT_RECORD.pack("E", source, target, the_event.type_code, VALUE_NONE, time))
+        elif value_type is str or value_type is unicode:
+            value_id = self.string_id(value)
+            self.f.write(EVENT_RECORD.pack("E", source, target, the_event.type_code, VALUE_STRING, time))
+            self.f.write(ID_VALUE.pack(value_id))
+        elif value_type is bool:
+            self.f.write(EVENT_RECORD.pack("E", source, target, the_event.type_code, VALUE_BOOL, time))
+            self.f.write(BOOL_VALUE.pack(value))
+        else:
+            data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+            self.f.write(EVENT_RECORD.pack("E", source, target, the_event.type_code, VALUE_PICKLE, time))
+            self.f.write(ID_VALUE.pack(len(data)))
+            self.f.write(data)
+        self.n_events += 1
+
+    def flush(self):
+        """Write the buffered records to the file"""
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+def read_more(f, buf, pos, n, chunk_size):
+    """Read the next chunk of a journal after the unread part of buf, None at the end of the file"""
+    more = f.read(max(chunk_size, n))
+    if not more:
+        return None
+    return buf[pos:] + more
+
+def read_journal(file_name, chunk_size=1 << 20):
+    """
+    Read the events from a journal.
+    Yields (source_device_id, target_device_id, type_code, time, value) for each event, in the order they were written.
+    """
+    with open(file_name, "rb") as f:
+        buf = f.read(HEADER.size)
+        if len(buf) < HEADER.size or HEADER.unpack(buf)[0] != JOURNAL_MAGIC:
+            raise Exception("Not an event journal.")
+        version = HEADER.unpack(buf)[1]
+        if version != JOURNAL_VERSION:
+            raise Exception("Event journal version {} is not supported (expected {}).".format(version, JOURNAL_VERSION))
+
+        strings = [None]
+        event_size = EVENT_RECORD.size
+        unpack_event = EVENT_RECORD.unpack_from
+        buf = ""
+        pos = 0
+        end = 0
+        while True:
+            # number of bytes needed for the next record
+            n = event_size
+            if end - pos >= event_size:
+                kind = buf[pos]
+                if kind == "E":
+                    record_kind, source, target, type_code, value_kind, time = unpack_event(buf, pos)
+                    if value_kind == VALUE_PICKLE:
+                        n += ID_VALUE.size
+                        if end - pos >= n:
+                            n += ID_VALUE.unpack_from(buf, pos + event_size)[0]
+                    elif value_kind != VALUE_NONE:
+                        n += VALUE_STRUCTS[value_kind].size
+                    if end - pos >= n:
+                        if value_kind == VALUE_FLOAT:
+                            value = FLOAT_VALUE.unpack_from(buf, pos + event_size)[0]
+                        elif value_kind == VALUE_INT:
+                            value = INT_VALUE.unpack_from(buf, pos + event_size)[0]
+                        elif value_kind == VALUE_NONE:
+                            value = None
+                        elif value_kind == VALUE_STRING:
+                            value = strings[ID_VALUE.unpack_from(buf, pos + event_size)[0]]
+                        elif value_kind == VALUE_BOOL:
+                            value = BOOL_VALUE.unpack_from(buf, pos + event_size)[0]
+                        else:
+                            value = pickle.loads(buf[pos + event_size + ID_VALUE.size:pos + n])
+                        pos += n
+                        yield (strings[source], strings[target], type_code, None if time != time else time, value)
+                        continue
+                elif kind == "S":
+                    record_kind, string_id, length = STRING_RECORD.unpack_from(buf, pos)
+                    n = STRING_RECORD.size + length
+                    if end - pos >= n:
+                        strings.append(buf[pos + STRING_RECORD.size:pos + n].decode("utf-8"))
+                        pos += n
+                        continue
+                else:
+                    raise Exception("Corrupt event journal {}, unknown record {}.".format(file_name, repr(kind)))
+
+            # the record was cut off at the end of the chunk
+            buf = read_more(f, buf, pos, n, chunk_size)
+            if buf is None:
+                # the end of the journal, ignore an incomplete record
+                break
+            pos = 0
+            end = len(buf)
@@ -0,0 +1,21 @@
+from collections import deque
+
+class EventQueue(object):
+    """
+    Unsynchronized FIFO queue with the subset of the Queue.Queue interface used by the supervisor.
+    Used in place of Queue.Queue when all the devices run in the supervisor's thread.
+    """
+    def __init__(self):
+        self.queue = deque()
+
+    def put(self, item):
+        self.queue.append(item)
+
+    def get(self):
+        return self.queue.popleft()
+
+    def empty(self):
+        return not self.queue
+
+    def qsize(self):
+        return len(self.queue)
@@ -0,0 +1,75 @@
+import time
+
+class Pacer(object):
+    """
+    Pace a simulation to the wall clock.
+    Simulation time runs `acceleration` times faster than the wall clock from when the pacer is started.
+    The lateness of an event is how long after its scheduled wall clock time it's dispatched.
+    An event more than jitter_budget seconds late is behind schedule, then with the "catch_up" policy the following
+    events are dispatched without waiting until the simulation is back on schedule, and with the "shed" policy
+    the schedule is moved back by the lateness so the simulation continues at the same pace from there.
+    """
+    def __init__(self, acceleration=1.0, jitter_budget=0.1, late_policy="catch_up", clock=time.time, sleep=time.sleep):
+        if acceleration <= 0:
+            raise Exception("The real time acceleration must be > 0.")
+        if not late_policy in ["catch_up", "shed"]:
+            raise Exception("Unknown late_policy {}, expected catch_up or shed.".format(late_policy))
+        self.acceleration = float(acceleration)
+        self.jitter_budget = jitter_budget
+        self.late_policy = late_policy
+        self.clock = clock
+        self.sleep = sleep
+        # the wall clock time for simulation time start_time
+        self.start_wall_time = None
+        self.start_time = None
+        # lateness (seconds) of each event
+        self.lateness = []
+        # number of events over the jitter budget
+        self.n_behind = 0
+        # wall clock seconds dropped from the schedule with the shed policy
+        self.shed_seconds = 0.0
+
+    def start(self, sim_time):
+        """Start the wall clock for sim_time"""
+        self.start_time = sim_time
+        self.start_wall_time = self.clock()
+
+    def wall_time(self, sim_time):
+        """The wall clock time an event at sim_time is scheduled for"""
+        return self.start_wall_time + (sim_time - self.start_time) / self.acceleration
+
+    def wait(self, sim_time):
+        """Wait for the wall clock time of an event at sim_time, returns the lateness of the event (seconds)"""
+        scheduled = self.wall_time(sim_time)
+        now = self.clock()
+        if now < scheduled:
+            self.sleep(scheduled - now)
+            now = self.clock()
+        lateness = now - scheduled
+        self.lateness.append(lateness)
+        if lateness > self.jitter_budget:
+            self.n_behind += 1
+            if self.late_policy == "shed":
+                self.start_wall_time += lateness
+                self.shed_seconds += lateness
+        return lateness
+
+    def percentile(self, p):
+        """The p-th percentile (0 - 100) of the lateness"""
+        if not len(self.lateness):
+            return None
+        values = sorted(self.lateness)
+        return values[min(len(values) - 1, int(round(p / 100.0 * (len(values) - 1))))]
+
+    def stats(self):
+        """Summary of the lateness of the events"""
+        n = len(self.lateness)
+        return {
+            "events": n,
+            "behind": self.n_behind,
+            "shed_seconds": self.shed_seconds,
+            "mean": sum(self.lateness) / n if n else None,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "max": max(self.lateness) if n else None
+        }
@@ -0,0 +1,106 @@
+import os
+import sys
+import copy
+import logging
+import traceback
+import multiprocessing
+from supervisor import Supervisor
+from event_journal import partition_journal_file
+
+def partition_config(config):
+    """
+    Split a scenario into one scenario per grid controller.
+    Each partition has the grid controller and the devices attached to it by their grid_controller_id,
+    the rest of the simulation options are copied to each partition.
+    """
+    gcs = config["devices"]["grid_controllers"]
+    if len(gcs) == 0:
+        raise Exception("At least 1 grid controller is required.")
+
+    partitions = []
+    by_gc_id = {}
+    for gc in gcs:
+        partition = copy.deepcopy(config)
+        partition["devices"] = {"grid_controllers": [gc], "power_sources": [], "euds": []}
+        if config.get("checkpoint_interval") and len(gcs) > 1:
+            # keep the checkpoints of each partition separate
+            partition["checkpoint_path"] = os.path.join(config.get("checkpoint_path", "checkpoints"), gc["device_id"])
+        if config.get("event_journal") and len(gcs) > 1:
+            # each partition writes its own journal
+            partition["event_journal"] = partition_journal_file(config["event_journal"], gc["device_id"])
+        if isinstance(config.get("profile"), basestring) and len(gcs) > 1:
+            # and its own profile
+            partition["profile"] = partition_journal_file(config["profile"], gc["device_id"])
+        partitions.append(partition)
+        by_gc_id[gc["device_id"]] = partition
+
+    for section in ["power_sources", "euds"]:
+        for dc in config["devices"][section]:
+            gc_id = dc.get("grid_controller_id", None)
+            if gc_id is None and len(gcs) == 1:
+                gc_id = gcs[0]["device_id"]
+            if not gc_id in by_gc_id:
+                raise Exception("Grid controller {} for device {} not found".format(gc_id, dc["device_id"]))
+            by_gc_id[gc_id]["devices"][section].append(dc)
+
+    return partitions
+
+def partition_id(config):
+    """The id of a partition is the device_id of its grid controller"""
+    return config["devices"]["grid_controllers"][0]["device_id"]
+
+def partition_file_handler(file_handler, partition_id):
+    """Create a file handler for the partition's log file (app_<partition_id>.log) in the same folder as file_handler"""
+    fh = logging.FileHandler(
+        os.path.join(os.path.dirname(file_handler.baseFilename), "app_{}.log".format(partition_id)), mode="w"
+    )
+    fh.setLevel(file_handler.level)
+    fh.setFormatter(file_handler.formatter)
+    return fh
+
+def use_partition_log_files(partition_id):
+    """
+    Point the file handlers of the app logger at a separate file for the partition (app_<partition_id>.log),
+    so processes don't write to the same file.
+    """
+    logger = logging.getLogger("lpdm")
+    for h in list(logger.handlers):
+        if isinstance(h, logging.FileHandler):
+            logger.removeHandler(h)
+            h.close()
+            logger.addHandler(partition_file_handler(h, partition_id))
+
+def run_partition(config):
+    """Run the simulation for a single partition, returns (partition id, True if it finished without errors)"""
+    pid = partition_id(config)
+    try:
+        use_partition_log_files(pid)
+        supervisor = Supervisor()
+        supervisor.load_config(config)
+        supervisor.run_simulation()
+        return (pid, supervisor.error is None)
+    except Exception as e:
+        exc_type, exc_value, exc_traceback = sys.exc_info()
+        tb = traceback.format_exception(exc_type, exc_value, exc_traceback)
+        logging.getLogger("lpdm").error("\n".join(tb))
+        return (pid, False)
+
+class PartitionRunner(object):
+    """
+    Runs each grid controller partition of a scenario in its own process.
+    Devices only exchange events with the grid controller they're attached to,
+    so the partitions don't need to pass events to each other.
+    """
+    def __init__(self, config, processes=None):
+        self.config = config
+        self.processes = processes
+        self.partitions = partition_config(config)
+
+    def run(self):
+        """Run the partitions, returns a list of (partition id, True if it finished without errors)"""
+        pool = multiprocessing.Pool(processes=self.processes)
+        try:
+            return pool.map(run_partition, self.partitions, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
@@ -0,0 +1,168 @@
+"""
+Profile where the time of a simulation goes.
+
+The profiler records
+    the time each device takes to handle each event, by device and by event type
+    the supervisor's routing overhead: the time to handle an event from the supervisor's queue,
+        not counting the time the target device takes to handle it
+    the queue wait: how long the events broadcast by the devices wait in the supervisor's queue
+    the time spent in selected methods, e.g. GridController.on_power_change (including the methods it calls)
+
+The durations are kept so the report has the p50 and p99 times.  When profiling is disabled there isn't a
+profiler and the only cost is checking for it, the profiled methods are only wrapped while the profiler is running.
+"""
+import os
+import json
+import time
+from array import array
+
+def duration_stats(durations):
+    """Count, total, mean, p50, p99 and max of a list of durations (seconds)"""
+    n = len(durations)
+    if not n:
+        return {"count": 0, "seconds": 0.0, "mean": None, "p50": None, "p99": None, "max": None}
+    values = sorted(durations)
+    total = sum(values)
+    return {
+        "count": n,
+        "seconds": total,
+        "mean": total / n,
+        "p50": values[min(n - 1, int(round(0.50 * (n - 1))))],
+        "p99": values[min(n - 1, int(round(0.99 * (n - 1))))],
+        "max": values[-1]
+    }
+
+class ProfiledQueue(object):
+    """Wraps the supervisor's queue to measure how long each event waits in it"""
+    def __init__(self, queue, profiler):
+        self.queue = queue
+        self.profiler = profiler
+
+    def put(self, item):
+        self.queue.put((self.profiler.clock(), item))
+
+    def get(self):
+        put_time, item = self.queue.get()
+        self.profiler.queue_wait.append(self.profiler.clock() - put_time)
+        return item
+
+    def empty(self):
+        return self.queue.empty()
+
+    def qsize(self):
+        return self.queue.qsize()
+
+class Profiler(object):
+    """Collects the timings of a simulation and builds the report"""
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        # (device_id, event type) -> durations of the device's handler
+        self.event_times = {}
+        # total time of the device handlers, to take out of the routing time
+        self.handler_seconds = 0.0
+        self.routing = array("d")
+        self.queue_wait = array("d")
+        # method name -> durations
+        self.method_times = {}
+        # (class, method name, original class attribute) of the wrapped methods
+        self.wrapped = []
+        self.instrumented = []
+        self.start_time = None
+        self.stop_time = None
+        # other statistics of the run to include in the report, name -> value
+        self.stats = {}
+
+    def instrument(self, cls, method_name):
+        """Time the calls to a method of a class while the profiler is running"""
+        self.instrumented.append((cls, method_name))
+
+    def start(self):
+        """Start the wall clock and wrap the instrumented methods"""
+        self.start_time = self.clock()
+        for cls, method_name in self.instrumented:
+            self.wrap(cls, method_name)
+
+    def stop(self):
+        """Stop the wall clock and restore the instrumented methods"""
+        if self.start_time is None or not self.stop_time is None:
+            return
+        self.stop_time = self.clock()
+        for cls, method_name, original in reversed(self.wrapped):
+            if original is None:
+                # the method was inherited
+                delattr(cls, method_name)
+            else:
+                setattr(cls, method_name, original)
+        self.wrapped = []
+
+    def wrap(self, cls, method_name):
+        """Replace a method of a class with one that records the time of each call"""
+        original = cls.__dict__.get(method_name)
+        method = getattr(cls, method_name).__func__
+        name = "{}.{}".format(cls.__name__, method_name)
+        times = self.method_times.setdefault(name, array("d"))
+        clock = self.clock
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                times.append(clock() - start)
+        timed.__name__ = method.__name__
+        timed.__doc__ = method.__doc__
+        self.wrapped.append((cls, method_name, original))
+        setattr(cls, method_name, timed)
+
+    def record_event(self, device_id, the_event, seconds):
+        """Record the time a device took to handle an event"""
+        key = (device_id, the_event.__class__.__name__)
+        times = self.event_times.get(key)
+        if times is None:
+            times = self.event_times[key] = array("d")
+        times.append(seconds)
+        self.handler_seconds += seconds
+
+    def report(self):
+        """The profile of the simulation as a dict"""
+        by_device = {}
+        by_type = {}
+        for (device_id, type_name), times in self.event_times.items():
+            by_device.setdefault(device_id, {})[type_name] = times
+            by_type.setdefault(type_name, array("d")).extend(times)
+
+        devices = {}
+        for device_id, times_by_type in by_device.items():
+            all_times = array("d")
+            for times in times_by_type.values():
+                all_times.extend(times)
+            device = duration_stats(all_times)
+            device["event_types"] = dict(
+                (type_name, duration_stats(times)) for type_name, times in times_by_type.items()
+            )
+            devices[device_id] = device
+
+        wall_time = None
+        if not self.start_time is None:
+            wall_time = (self.stop_time if not self.stop_time is None else self.clock()) - self.start_time
+        return {
+            "wall_time": wall_time,
+            "events": sum(len(times) for times in self.event_times.values()),
+            "handler_seconds": self.handler_seconds,
+            "devices": devices,
+            "event_types": dict((type_name, duration_stats(times)) for type_name, times in by_type.items()),
+            "supervisor": {
+                "routing": duration_stats(self.routing),
+                "queue_wait": duration_stats(self.queue_wait)
+            },
+            "methods": dict((name, duration_stats(times)) for name, times in self.method_times.items()),
+            "stats": self.stats
+        }
+
+    def write(self, file_name):
+        """Write the report to a json file"""
+        path = os.path.dirname(file_name)
+        if path and not os.path.exists(path):
+            os.makedirs(path)
+        with open(file_name, "w") as f:
+            json.dump(self.report(), f, indent=2, sort_keys=True)
@@ -1,18 +1,59 @@
 import sys
+import heapq
 import traceback
 import Queue
+import thread
 import threading
 import logging
 import pprint
+from multiprocessing.pool import ThreadPool
 from ttie_event_manager import TtieEventManager
+from event_queue import EventQueue
 from event_manager import EventManager
-from lpdm_event import LpdmPowerEvent, LpdmPriceEvent, LpdmTtieEvent, LpdmCapacityEvent, LpdmRunTimeErrorEvent, \
-        LpdmBuyMaxPowerEvent, LpdmBuyPowerPriceEvent, LpdmBuyPowerEvent
+from checkpoint import save_checkpoint, load_checkpoint, read_checkpoint_config, checkpoint_file_name
+from event_journal import EventJournal
+from pacer import Pacer
+from profiler import Profiler, ProfiledQueue
+from eud_fleets import build_fleets
+from lpdm_event import event_type, enable_event_pool, release_event, LpdmTtieEvent
 from device_thread_manager import DeviceThreadManager
 from device_thread import DeviceThread
+from device.simulated.grid_controller import GridController
+from device.simulated.grid_controller.power_source_manager import PowerSourceManager
 from common.device_class_loader import DeviceClassLoader
 from simulation_logger import message_formatter
 
+def dispatch_all(group):
+    """
+    Pass a list of events to a device thread, used for delivering a batch of ttie events from a thread pool.
+    The device's log records are kept in the group's list of records until the whole batch has been delivered.
+    """
+    t, events, records = group
+    # the device runs in its own thread with the threaded engine, and in the pool's thread inline
+    thread_id = t.ident if isinstance(t, threading.Thread) else thread.get_ident()
+    BatchLogBuffer.buffers[thread_id] = records
+    try:
+        for the_event in events:
+            t.dispatch(the_event)
+    finally:
+        del BatchLogBuffer.buffers[thread_id]
+
+class BatchLogBuffer(logging.Filter):
+    """
+    Filter for the lpdm logger while a batch is delivered from a thread pool: the records logged from the threads
+    running the batch's devices are kept in the device's list instead of being written, so the supervisor can write
+    them in the order of the batch and the log is the same as when the devices are run one at a time.
+    """
+    # thread id -> list of records
+    buffers = {}
+
+    def filter(self, record):
+        records = self.buffers.get(record.thread)
+        if records is None:
+            return True
+        records.append(record)
+        return False
+
 class Supervisor:
     """
     Responsible for managing threads and messages.
@@ -29,6 +70,40 @@ class Supervisor:
         self.max_ttie = None,
         self._device_id = "supervisor"
         self._time = 0
+        # delay (seconds) for events passed between devices attached to different grid controllers
+        self.lookahead = 0
+        # cross partition events waiting to be delivered: (delivery time, source device_id, sequence number, event)
+        self.delayed_events = []
+        # source device_id -> number of cross partition events sent by the device
+        self.sent_counts = {}
+        # when set, cross partition events for devices that aren't run by this supervisor are added to this list
+        self.outbox = None
+        # dispatch all of the ttie events with the same time together
+        self.batch_ttie = False
+        # thread pool for delivering a batch of ttie events in parallel
+        self.batch_pool = None
+        # save a checkpoint every checkpoint_interval seconds of simulation time
+        self.checkpoint_interval = None
+        self.checkpoint_path = "checkpoints"
+        self.next_checkpoint_time = None
+        # device_id -> device, when resuming from a checkpoint
+        self.restored_devices = None
+        # device_id -> configuration changes applied to the devices restored from a checkpoint
+        self.overrides = None
+        # traceback of the exception that stopped the simulation
+        self.error = None
+        # record the events received from the devices to a journal file
+        self.journal_file = None
+        self.journal = None
+        # pace the simulation to the wall clock
+        self.pacer = None
+        # reuse the event objects once they've been delivered
+        self.event_pool = False
+        # profile the simulation and write the report to profile_file
+        self.profile_file = None
+        self.profiler = None
+        # event type code -> method that handles events of that type
+        self.event_handlers = self.build_event_handlers()
 
     def build_message(self, message="", tag="", value=""):
         """Build the log message string"""
@@ -45,40 +120,161 @@ class Supervisor:
         self.config = config
         # calculate the max ttie (seconds)
         self.max_ttie = config.get('run_time_days', 7) * 24 * 60 * 60
+        self.lookahead = config.get("lookahead", 0)
+        self.batch_ttie = config.get("batch_ttie", False)
+        self.checkpoint_interval = config.get("checkpoint_interval", None)
+        self.checkpoint_path = config.get("checkpoint_path", "checkpoints")
+        self.journal_file = config.get("event_journal", None)
+        self.event_pool = config.get("event_pool", False)
+        if self.event_pool:
+            enable_event_pool()
+        if config.get("real_time", None):
+            real_time = config["real_time"]
+            self.pacer = Pacer(
+                acceleration=real_time.get("acceleration", 1.0),
+                jitter_budget=real_time.get("jitter_budget", 0.1),
+                late_policy=real_time.get("late_policy", "catch_up")
+            )
+        if self.checkpoint_interval:
+            self.next_checkpoint_time = self.checkpoint_interval
+        if self.batch_ttie and config.get("batch_workers", 1) > 1:
+            self.batch_pool = ThreadPool(config["batch_workers"])
+        self.set_engine(config.get("engine", "threaded"))
+        self.profile_file = config.get("profile", None)
+        if self.profile_file:
+            self.init_profiler()
         device_class_loader = DeviceClassLoader()
         device_sections = ["grid_controllers", "power_sources", "euds"]
 
         # build the devices: first grid_controllers, then generators, then euds
         for section in device_sections:
-            for dc in config["devices"][section]:
+            device_configs = config["devices"][section]
+            if section == "euds" and config.get("vectorized_euds", False):
+                # run the simple euds of each grid controller as a fleet
+                device_configs = build_fleets(device_configs, config["vectorized_euds"])
+            for dc in device_configs:
                 # is the simulated or real
                 simulated_or_real = dc.get("simulated_or_real", "simulated")
                 # get the device class from it's device_type
                 DeviceClass = device_class_loader.get_device_class_from_name("device.{}.{}".format(simulated_or_real, dc["device_type"]))
+                if config.get("fast_forward", False) and not "fast_forward" in dc:
+                    # the device's own setting takes precedence
+                    dc = dict(dc, fast_forward=True)
+                if dc.get("fast_forward", False) and self.batch_ttie:
+                    # the skipped wake ups are ordered as if the tties were dispatched one at a time
+                    raise Exception("fast_forward can't be used with batch_ttie.")
+                if section == "grid_controllers" and config.get("skip_repeated_prices", False) and not "skip_repeated_prices" in dc:
+                    dc = dict(dc, skip_repeated_prices=True)
                 self.add_device(DeviceClass=DeviceClass, config=dc)
 
+    def set_engine(self, engine):
+        """
+        Run each device in its own thread ("threaded") or in the supervisor's thread ("inline").
+        The inline engine doesn't need a thread safe queue for receiving events from the devices.
+        """
+        self.device_thread_manager.set_engine(engine)
+        if engine == "inline":
+            self.queue = EventQueue()
+            self.device_thread_manager.supervisor_queue = self.queue
+
+    def init_profiler(self):
+        """Profile the devices' event handlers, the supervisor's queue and the grid controller's power calculations"""
+        self.profiler = Profiler()
+        self.profiler.instrument(GridController, "on_power_change")
+        self.profiler.instrument(GridController, "update_power_purchases")
+        self.profiler.instrument(PowerSourceManager, "optimize_load")
+        self.queue = ProfiledQueue(self.queue, self.profiler)
+        self.device_thread_manager.supervisor_queue = self.queue
+        self.device_thread_manager.profiler = self.profiler
+
+    def build_event_handlers(self):
+        """Build the table for looking up the handler of an event from its type code"""
+        return {
+            # new ttie event: add it to the ttie event list
+            event_type.TTIE: self.ttie_event_manager.add,
+            # power, price, capacity and power buy events are passed to the target device
+            event_type.POWER_CHANGE: self.route_event,
+            event_type.PRICE_CHANGE: self.route_event,
+            event_type.CAPACITY_CHANGE: self.route_event,
+            event_type.BUY_MAX_POWER: self.route_event,
+            event_type.BUY_POWER: self.route_event,
+            event_type.BUY_POWER_PRICE: self.route_event,
+            event_type.FLUSH: self.route_event,
+            event_type.RUN_TIME_ERROR: self.on_run_time_error
+        }
+
     def process_supervisor_events(self):
         """Process events in the supervisor's queue"""
+        if not self.profiler is None:
+            return self.process_supervisor_events_profiled()
+        while not self.queue.empty():
+            the_event = self.queue.get()
+            if not self.journal is None:
+                self.journal.write(the_event)
+            handler = self.event_handlers.get(the_event.type_code)
+            if handler:
+                handler(the_event)
+
+    def process_supervisor_events_profiled(self):
+        """Process events in the supervisor's queue, recording the routing time without the target device's handler time"""
+        profiler = self.profiler
+        clock = profiler.clock
         while not self.queue.empty():
+            start = clock()
+            handler_seconds = profiler.handler_seconds
             the_event = self.queue.get()
-            if isinstance(the_event, LpdmTtieEvent):
-                # new ttie event: add it to the ttie event list
-                self.ttie_event_manager.add(the_event)
-            elif isinstance(the_event, LpdmPowerEvent) \
-                or isinstance(the_event, LpdmPriceEvent) \
-                or isinstance(the_event, LpdmCapacityEvent) \
-                or isinstance(the_event, LpdmBuyMaxPowerEvent) \
-                or isinstance(the_event, LpdmBuyPowerEvent) \
-                or isinstance(the_event, LpdmBuyPowerPriceEvent):
-                # power or price event: call the thread and pass along the event
-                # get the target thread and put the event in the queue
-                # self.logger.debug(self.build_message("supervisor event {}".format(the_event)))
-                t = self.device_thread_manager.get(the_event.target_device_id)
-                t.queue.put(the_event)
-                t.queue.join()
-            elif isinstance(the_event, LpdmRunTimeErrorEvent):
-                # an exception has occured, kill the simulation
-                raise Exception("LpdmRunTimeErrorEvent encountered.")
+            if not self.journal is None:
+                self.journal.write(the_event)
+            handler = self.event_handlers.get(the_event.type_code)
+            if handler:
+                handler(the_event)
+            profiler.routing.append(clock() - start - (profiler.handler_seconds - handler_seconds))
+
+    def route_event(self, the_event):
+        """Pass an event to its target device"""
+        # self.logger.debug(self.build_message("supervisor event {}".format(the_event)))
+        t = self.device_thread_manager.get(the_event.target_device_id)
+        if self.lookahead and self.crosses_partition(the_event):
+            self.delay_event(the_event, local=not t is None)
+        elif t is None:
+            raise Exception("Target device {} for event {} not found".format(the_event.target_device_id, the_event))
+        else:
+            if self.ttie_event_manager.skipped_wake_up_passed(t.device_id):
+                # the device would have been woken up before this event
+                t.dispatch(LpdmTtieEvent(t.device_id, self._time))
+            t.dispatch(the_event)
+            if self.event_pool:
+                release_event(the_event)
+
+    def crosses_partition(self, the_event):
+        """Check if the source and target of an event are attached to different grid controllers"""
+        partition_by_id = self.device_thread_manager.partition_by_id
+        return partition_by_id.get(the_event.source_device_id) != partition_by_id.get(the_event.target_device_id)
+
+    def delay_event(self, the_event, local=True):
+        """
+        Deliver a cross partition event lookahead seconds after it was sent.
+        Events are delivered in order of (delivery time, source device, order sent by the source),
+        which doesn't depend on how the partitions are run.
+        """
+        n = self.sent_counts.get(the_event.source_device_id, 0)
+        self.sent_counts[the_event.source_device_id] = n + 1
+        the_event.time = self._time + self.lookahead
+        entry = (the_event.time, the_event.source_device_id, n, the_event)
+        if local:
+            heapq.heappush(self.delayed_events, entry)
+        elif not self.outbox is None:
+            self.outbox.append(entry)
+        else:
+            raise Exception("Target device {} for event {} not found".format(the_event.target_device_id, the_event))
+
+    def receive_delayed_event(self, entry):
+        """Add a cross partition event sent from another partition"""
+        heapq.heappush(self.delayed_events, entry)
+
+    def on_run_time_error(self, the_event):
+        """an exception has occured, kill the simulation"""
+        raise Exception("LpdmRunTimeErrorEvent encountered.")
 
     def add_device(self, DeviceClass, config):
         """
@@ -103,13 +299,21 @@ class Supervisor:
                     raise Exception("TTIE events out of order.")
                 self._time = next_ttie.value
                 # self.logger.debug(self.build_message("ttie {}".format(next_ttie)))
-                # get the device thread and put the event in the queue
-                t = self.device_thread_manager.get(next_ttie.target_device_id)
-                t.queue.put(next_ttie)
-                t.queue.join()
+                if self.batch_ttie:
+                    # pass the event to all of the devices with the same ttie
+                    batch = [next_ttie] + self.ttie_event_manager.get_all_at(next_ttie.value)
+                    self.dispatch_batch(batch)
+                else:
+                    # get the device and pass it the event
+                    t = self.device_thread_manager.get(next_ttie.target_device_id)
+                    t.dispatch(next_ttie)
+                    batch = [next_ttie]
 
                 # process any other resulting events
                 self.process_supervisor_events()
+                if self.event_pool:
+                    for the_event in batch:
+                        release_event(the_event)
             else:
                 self.logger.debug(
                     self.build_message("max ttie reached ({}), quit simulation".format(next_ttie.value))
@@ -120,33 +324,217 @@ class Supervisor:
             )
         return next_ttie
 
+    def dispatch_batch(self, batch):
+        """
+        Pass a batch of ttie events with the same time to their devices.
+        The events are delivered in the order they were added to the ttie queue.
+        With a thread pool the devices process their events in parallel, and the events they broadcast
+        and the records they log are kept per device then added to the supervisor's queue and written in the same
+        order as the batch, so the events are routed and logged in the same order as when the batch is delivered
+        one device at a time.
+        """
+        if self.batch_pool is None:
+            for the_event in batch:
+                self.device_thread_manager.get(the_event.target_device_id).dispatch(the_event)
+            return
+
+        # group the events by device, keeping the order of the batch
+        groups = []
+        by_id = {}
+        for the_event in batch:
+            if not the_event.target_device_id in by_id:
+                by_id[the_event.target_device_id] = []
+                groups.append((self.device_thread_manager.get(the_event.target_device_id), by_id[the_event.target_device_id], []))
+            by_id[the_event.target_device_id].append(the_event)
+
+        for t, events, records in groups:
+            t.outbox = []
+        log_buffer = BatchLogBuffer()
+        self.logger.addFilter(log_buffer)
+        try:
+            self.batch_pool.map(dispatch_all, groups)
+        finally:
+            self.logger.removeFilter(log_buffer)
+            for t, events, records in groups:
+                for record in records:
+                    self.logger.handle(record)
+                for broadcast_message in t.outbox:
+                    self.queue.put(broadcast_message)
+                t.outbox = None
+
+    def deliver_next_delayed_event(self):
+        """Pass the next cross partition event to its target device"""
+        deliver_time, source_device_id, n, the_event = heapq.heappop(self.delayed_events)
+        if deliver_time < self.max_ttie:
+            self._time = deliver_time
+            self.ttie_event_manager.end_dispatch()
+            self.device_thread_manager.get(the_event.target_device_id).dispatch(the_event)
+            self.process_supervisor_events()
+        return the_event
+
+    def next_event_time(self):
+        """The time of the next ttie or cross partition event, None if there aren't any"""
+        next_ttie = self.ttie_event_manager.peek()
+        times = [e.value for e in [next_ttie] if not e is None] + [e[0] for e in self.delayed_events[:1]]
+        return min(times) if len(times) else None
+
+    def dispatch_next(self):
+        """
+        Dispatch the next cross partition event or ttie, whichever comes first.
+        Cross partition events are delivered before ttie events with the same time.
+        """
+        if len(self.delayed_events):
+            next_ttie = self.ttie_event_manager.peek()
+            if next_ttie is None or self.delayed_events[0][0] <= next_ttie.value:
+                return self.deliver_next_delayed_event()
+        return self.dispatch_next_ttie()
+
+    def run_until(self, end_time):
+        """Dispatch the events before end_time"""
+        next_time = self.next_event_time()
+        while not next_time is None and next_time < end_time and next_time < self.max_ttie:
+            self.dispatch_next()
+            next_time = self.next_event_time()
+
+    def save_checkpoint(self, file_name):
+        """Save the state of the supervisor and the devices"""
+        if not self.journal is None:
+            # the journal has all of the events up to the checkpoint
+            self.journal.flush()
+        save_checkpoint(file_name, self.config, self._time, {
+            "time": self._time,
+            "next_checkpoint_time": self.next_checkpoint_time,
+            "ttie_event_manager": self.ttie_event_manager,
+            "delayed_events": self.delayed_events,
+            "sent_counts": self.sent_counts,
+            "partition_by_id": self.device_thread_manager.partition_by_id,
+            "devices": [(t.device_id, t.device) for t in self.device_thread_manager.threads]
+        })
+
+    def checkpoint_if_due(self):
+        """
+        Save a checkpoint when the next event is at or after the next checkpoint time,
+        so all of the events before the checkpoint time have been processed and none after.
+        """
+        next_time = self.next_event_time()
+        if not next_time is None and next_time >= self.next_checkpoint_time and self.next_checkpoint_time < self.max_ttie:
+            checkpoint_time = self.next_checkpoint_time
+            # skip the intervals without any events
+            self.next_checkpoint_time = (int(next_time // self.checkpoint_interval) + 1) * self.checkpoint_interval
+            file_name = checkpoint_file_name(self.checkpoint_path, checkpoint_time)
+            self.save_checkpoint(file_name)
+            self.logger.debug(self.build_message("saved checkpoint {}".format(file_name)))
+
+    def resume_from_checkpoint(self, file_name, overrides=None):
+        """
+        Load the scenario and the state of the supervisor and devices from a checkpoint.
+        overrides (device_id -> configuration changes) are applied to the devices when they're started.
+        """
+        self.overrides = overrides
+        self.load_config(read_checkpoint_config(file_name))
+        header, state = load_checkpoint(file_name, lambda device_id: self.device_thread_manager.get(device_id).supervisor_callback)
+        self._time = state["time"]
+        self.next_checkpoint_time = state["next_checkpoint_time"]
+        self.ttie_event_manager = state["ttie_event_manager"]
+        self.event_handlers = self.build_event_handlers()
+        self.delayed_events = state["delayed_events"]
+        self.sent_counts = state["sent_counts"]
+        self.device_thread_manager.partition_by_id = state["partition_by_id"]
+        self.restored_devices = dict(state["devices"])
+
+    def apply_overrides(self, overrides):
+        """Change the configuration of devices (device_id -> configuration changes) and process the resulting events"""
+        for device_id, changes in sorted(overrides.items()):
+            t = self.device_thread_manager.get(device_id)
+            if t is None:
+                raise Exception("Device {} not found".format(device_id))
+            t.device.update_config(changes)
+            # keep the scenario up to date for the next checkpoints
+            for key, value in changes.items():
+                if isinstance(value, dict) and isinstance(t.device_config.get(key), dict):
+                    t.device_config[key].update(value)
+                else:
+                    t.device_config[key] = value
+        self.process_supervisor_events()
+
+    def start_devices(self):
+        """Start the devices and connect them to their grid controllers"""
+        if self.journal_file and self.journal is None:
+            self.journal = EventJournal(self.journal_file)
+        if not self.profiler is None and self.profiler.start_time is None:
+            self.profiler.start()
+        if not self.restored_devices is None:
+            # the devices were restored from a checkpoint and are already connected
+            self.device_thread_manager.restore_all(self.restored_devices)
+            if self.overrides:
+                self.apply_overrides(self.overrides)
+            return
+        # star tthe device threads
+        self.device_thread_manager.start_all()
+        # connect the devices
+        self.device_thread_manager.connect_devices()
+        # process any resulting events from the device.init()
+        self.process_supervisor_events()
+
+    def pace(self):
+        """Wait until the wall clock time of the next event, and log how late the event is"""
+        next_time = self.next_event_time()
+        if not next_time is None and next_time < self.max_ttie:
+            lateness = self.pacer.wait(next_time)
+            self.logger.debug(
+                self.build_message("event at {} is {:.3f} s late".format(next_time, lateness), tag="lateness", value=lateness)
+            )
+
     def wait_for_threads(self):
         """Wait for threads to finsih what their tasks"""
         self.device_thread_manager.wait_for_all()
 
     def run_simulation(self):
         """Start running the simulation"""
-        self.logger.info(
-            self.build_message("start the simulation")
-        )
+        if self.restored_devices is None:
+            self.logger.info(
+                self.build_message("start the simulation")
+            )
         try:
-            # star tthe device threads
-            self.device_thread_manager.start_all()
-            # connect the devices
-            self.device_thread_manager.connect_devices()
-            # process any resulting events from the device.init()
-            self.process_supervisor_events()
-            # keep dispatching the next ttie events until finished
-            while self.dispatch_next_ttie():
-                pass
+            self.start_devices()
+            if self.pacer:
+                self.pacer.start(self._time)
+            # keep dispatching the next events until finished
+            while True:
+                if self.checkpoint_interval:
+                    self.checkpoint_if_due()
+                if self.pacer:
+                    self.pace()
+                if not self.dispatch_next():
+                    break
+            if self.pacer:
+                self.logger.info(self.build_message("real time lateness {}".format(self.pacer.stats())))
         except Exception as e:
             exc_type, exc_value, exc_traceback = sys.exc_info()
             tb = traceback.format_exception(exc_type, exc_value, exc_traceback)
-            self.logger.error(self.build_message("\n".join(tb)))
+            self.error = "\n".join(tb)
+            self.logger.error(self.build_message(self.error))
         finally:
             # kill all threads
-            self.device_thread_manager.kill_all()
+            self.stop_simulation()
+
+    def stop_profiler(self):
+        """Stop profiling and write the report when there's a profile_file"""
+        self.profiler.stop()
+        self.profiler.stats["ttie"] = self.ttie_event_manager.stats()
+        if isinstance(self.profile_file, basestring):
+            self.profiler.write(self.profile_file)
+            self.logger.info(self.build_message("wrote the profile to {}".format(self.profile_file)))
 
     def stop_simulation(self):
         """Clean up and destroy the simulation when finished"""
-        self.device_thread_manager.kill_all()
+        self.device_thread_manager.kill_all(self.max_ttie)
+        if not self.profiler is None:
+            self.stop_profiler()
+        if not self.journal is None:
+            self.journal.close()
+            self.journal = None
+        if not self.batch_pool is None:
+            self.batch_pool.close()
+            self.batch_pool.join()
+            self.batch_pool = None
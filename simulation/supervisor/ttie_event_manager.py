@@ -1,28 +1,237 @@
+import bisect
+import heapq
 from event_manager import EventManager
 from lpdm_event import LpdmTtieEvent
 
 class TtieEventManager(EventManager):
     """
     Keeps track of ttie events.
-    Stores events in a regular list.
-    New ttie events are added through the 'add' method.  The events are added to the list, then
-    sorted by time.
+    Stores events in a binary heap ordered by (time, sequence number), so events with the same
+    time come out in the order they were added.
+    Only one future ttie is kept per device: a new ttie from a device replaces its pending one,
+    unless the pending one is already due (its time has been reached), since the device
+    has not been notified of it yet.
+    Replaced and cancelled entries are flagged and skipped when they reach the top of the heap.
+    A ttie that repeats the device's pending ttie, with no other ttie added in between, is dropped
+    since adding it wouldn't change the order of the events.
+    The replaced and dropped tties are counted as suppressed wake ups.
+    A ttie with skipped wake ups stands for the device's quiescent wake ups before it, see Device.quiescent_interval.
+    It's deferred until its time is reached, then given the sequence number it would have if the device had
+    been woken up at the skipped times, from the tties returned at those times, so the order of the events
+    is the same.
     """
-    def add(self, lpdm_ttie_event):
-        """Add a ttie event to the list"""
+    def __init__(self):
+        EventManager.__init__(self)
+        # device_id -> live heap entry [time, sequence number, order at the skipped times, event],
+        # the order of a deferred ttie is [number of skipped times done, order at the next one] until its time is reached
+        self.entries = {}
+        # the next sequence number
+        self.seq = 0
+        # time of the last ttie returned by get
+        self.time = None
+        # the last entry added to the heap
+        self.last_entry = None
+        # heap of the tties with skipped wake ups whose time hasn't been reached
+        self.deferred = []
+        # skipped time -> {"count": number of deferred tties skipping it,
+        #                  "start": sequence number when it was reached,
+        #                  "returned": [[(sequence number, order), sequence number after it]] of the tties returned at it}
+        self.skipped_times = {}
+        # heap of the skipped times that haven't been reached
+        self.open_skipped_times = []
+        # the returned record of the last ttie returned at a skipped time, until the next one is returned
+        self.last_returned = None
+        # number of tties added, returned by get, skipped by their device, replaced before they were due
+        # and dropped as duplicates
+        self.n_added = 0
+        self.n_returned = 0
+        self.n_skipped = 0
+        self.n_superseded = 0
+        self.n_duplicates = 0
 
+    def add(self, lpdm_ttie_event):
+        """Add a ttie event, replacing the device's pending ttie"""
         # make sure parameter is correct type
         if isinstance(lpdm_ttie_event, LpdmTtieEvent):
-            # store the ttie events in order by time
-            if len(self.events):
-                for i, e in enumerate(self.events):
-                    # if the new event has a time that comes before the enumarted event then insert it into the list
-                    if lpdm_ttie_event.value < e.value:
-                        self.events.insert(i, lpdm_ttie_event)
+            device_id = lpdm_ttie_event.target_device_id
+            self.n_added += 1
+            entry = self.entries.get(device_id)
+            if not entry is None:
+                if self.time is None or entry[0] > self.time:
+                    if entry is self.last_entry and entry[0] == lpdm_ttie_event.value:
+                        # the same as the pending ttie
+                        self.n_duplicates += 1
                         return
-            # if this section is reached then
-            # 1) there are no events so just append to the end
-            # or 2) there are events, but the new event is the farthest out in time so add it to the end of the list
-            self.events.append(lpdm_ttie_event)
+                    self.n_superseded += 1
+                    self.cancel(device_id)
+                else:
+                    # the pending ttie is due now, leave it in the heap
+                    del self.entries[device_id]
+            entry = [lpdm_ttie_event.value, self.seq, (), lpdm_ttie_event]
+            self.seq += 1
+            self.entries[device_id] = entry
+            self.last_entry = entry
+            if lpdm_ttie_event.skipped:
+                # ordered when its time is reached
+                entry[2] = [0, (entry[1], ())]
+                self.watch_skipped_times(lpdm_ttie_event.skipped)
+                heapq.heappush(self.deferred, entry)
+            else:
+                heapq.heappush(self.events, entry)
         else:
             raise Exception("TtieEventManager.add expects the parameter to be of type LpdmTtieEvent")
+
+    def reschedule(self, device_id, value):
+        """Move the pending ttie for a device to a new time"""
+        self.add(LpdmTtieEvent(target_device_id=device_id, value=value))
+
+    def cancel(self, device_id):
+        """Remove the pending ttie for a device, returns the cancelled event or None"""
+        entry = self.entries.pop(device_id, None)
+        if entry is None:
+            return None
+        the_event = entry[3]
+        entry[3] = None
+        if isinstance(entry[2], list):
+            self.unwatch_skipped_times(the_event.skipped)
+        return the_event
+
+    def peek(self):
+        """Get the next ttie without removing it"""
+        self.discard_cancelled()
+        return self.events[0][3] if len(self.events) else None
+
+    def get(self):
+        """Get the next ttie, None if there aren't any left"""
+        self.discard_cancelled()
+        if len(self.events):
+            entry = heapq.heappop(self.events)
+            the_event = entry[3]
+            if self.entries.get(the_event.target_device_id) is entry:
+                del self.entries[the_event.target_device_id]
+            self.end_dispatch()
+            self.time = entry[0]
+            self.record_returned(entry)
+            self.n_returned += 1
+            if the_event.skipped:
+                self.n_skipped += len(the_event.skipped)
+            return the_event
+        else:
+            return None
+
+    def get_all_at(self, value):
+        """Get all of the remaining ttie events at time value, in the order they were added"""
+        batch = []
+        next_ttie = self.peek()
+        while not next_ttie is None and next_ttie.value == value:
+            batch.append(self.get())
+            next_ttie = self.peek()
+        return batch
+
+    def stats(self):
+        """Number of tties added, returned, skipped and suppressed"""
+        return {
+            "added": self.n_added,
+            "returned": self.n_returned,
+            "skipped": self.n_skipped,
+            "superseded": self.n_superseded,
+            "duplicates": self.n_duplicates,
+            "suppressed": self.n_superseded + self.n_duplicates
+        }
+
+    def discard_cancelled(self):
+        """
+        Pop the cancelled/replaced entries off the top of the heap, and move the deferred tties whose time has
+        been reached to the heap
+        """
+        while True:
+            while len(self.events) and self.events[0][3] is None:
+                heapq.heappop(self.events)
+            if not len(self.deferred) or (len(self.events) and self.events[0][0] < self.deferred[0][0]):
+                return
+            entry = heapq.heappop(self.deferred)
+            if not entry[3] is None:
+                skipped = entry[3].skipped
+                entry[1], entry[2] = self.skipped_order(entry, len(skipped))
+                self.unwatch_skipped_times(skipped)
+                heapq.heappush(self.events, entry)
+
+    def end_dispatch(self):
+        """
+        The events from the last ttie have been processed, called before the next ttie is returned
+        and before the supervisor delivers a cross partition event.
+        """
+        if not self.last_returned is None:
+            self.last_returned[1] = self.seq
+            self.last_returned = None
+
+    def watch_skipped_times(self, skipped):
+        """Start recording the tties returned at the skipped times of a deferred ttie"""
+        for time in skipped:
+            watch = self.skipped_times.get(time)
+            if watch is None:
+                watch = {"count": 0, "start": None, "returned": []}
+                self.skipped_times[time] = watch
+                heapq.heappush(self.open_skipped_times, time)
+            watch["count"] += 1
+
+    def unwatch_skipped_times(self, skipped):
+        for time in skipped:
+            watch = self.skipped_times[time]
+            watch["count"] -= 1
+            if watch["count"] == 0:
+                del self.skipped_times[time]
+
+    def record_returned(self, entry):
+        """Record the order of a ttie returned at a skipped time"""
+        while len(self.open_skipped_times) and self.open_skipped_times[0] <= entry[0]:
+            watch = self.skipped_times.get(heapq.heappop(self.open_skipped_times))
+            if not watch is None and watch["start"] is None:
+                watch["start"] = self.seq
+        watch = self.skipped_times.get(entry[0])
+        if not watch is None:
+            self.last_returned = [(entry[1], entry[2]), None]
+            watch["returned"].append(self.last_returned)
+
+    def skipped_order(self, entry, n):
+        """
+        The order of a deferred ttie after its first n skipped times, (sequence number, order at the previous ones).
+        At each skipped time the device would have been woken up after the tties returned before its own, and sent
+        its next ttie once their events were processed, so it would have had the sequence number after theirs.
+        A half is taken off to put it between those events and the following ones, and the ties between deferred
+        tties are broken by their order at the previous skipped times.
+        """
+        done, order = entry[2]
+        for time in entry[3].skipped[done:n]:
+            watch = self.skipped_times[time]
+            # the sequence number when the device would have been woken up
+            woken = watch["start"]
+            for returned in watch["returned"]:
+                if returned[0] > order:
+                    break
+                woken = returned[1]
+            if woken is None:
+                # nothing has been added since
+                woken = self.seq
+            order = (woken - 0.5, (order[0],) + order[1])
+        entry[2] = [max(done, n), order]
+        return order
+
+    def skipped_wake_up_passed(self, device_id):
+        """
+        Check if the device's skipped wake up at the current time would have come before the ttie being processed.
+        The device has to be woken up for it before it's sent an event, the same as without skipping it.
+        Only true once for each skipped wake up.
+        """
+        entry = self.entries.get(device_id)
+        if entry is None or not isinstance(entry[2], list) or self.last_returned is None:
+            return False
+        skipped = entry[3].skipped
+        n = bisect.bisect_left(skipped, self.time)
+        if n == len(skipped) or skipped[n] != self.time or entry[2][0] > n:
+            return False
+        if self.skipped_order(entry, n) < self.last_returned[0]:
+            # done with the skipped wake up
+            self.skipped_order(entry, n + 1)
+            return True
+        return False
@@ -0,0 +1,116 @@
+import os
+import json
+import shutil
+import logging
+import tempfile
+import unittest
+import simulation
+from batch_runner import BatchRunner
+
+def address_space_mb():
+    """Size of this process's address space (MB), the workers are forked from it"""
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[0])
+    return pages * os.sysconf("SC_PAGE_SIZE") / (1024.0 * 1024.0)
+
+def allocating_run(sim):
+    """Replacement for Simulation.run that allocates more memory than the limit allows"""
+    data = bytearray(512 * 1024 * 1024)
+    return []
+
+class TestBatchRunner(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.path, "logs")
+        # the workers are forked, start them from a clean lpdm logger whatever the other tests left on it
+        logger = logging.getLogger("lpdm")
+        self.saved_logger = (logger.handlers[:], logger.level)
+        logger.handlers = []
+        logger.setLevel(logging.NOTSET)
+
+    def tearDown(self):
+        logger = logging.getLogger("lpdm")
+        logger.handlers = self.saved_logger[0]
+        logger.setLevel(self.saved_logger[1])
+        shutil.rmtree(self.path)
+
+    def write_scenario(self, name, eud_type="eud"):
+        """Write a 1 day scenario with a pv and an eud"""
+        file_name = os.path.join(self.path, name)
+        with open(file_name, "w") as f:
+            json.dump({
+                "run_time_days": 1,
+                "engine": "inline",
+                "console_log_level": 50,
+                "file_log_level": 10,
+                "devices": {
+                    "grid_controllers": [{"device_id": "gc_1", "device_type": "grid_controller"}],
+                    "power_sources": [{"device_id": "pv_1", "grid_controller_id": "gc_1", "device_type": "pv"}],
+                    "euds": [
+                        {
+                            "device_id": "eud_1",
+                            "device_type": eud_type,
+                            "grid_controller_id": "gc_1",
+                            "max_power_output": 100.0,
+                            "schedule": [[3, "on"], [23, "off"]]
+                        }
+                    ]
+                }
+            }, f)
+        return file_name
+
+    def run_batch(self, scenario_files, **kwargs):
+        runner = BatchRunner(scenario_files, processes=2, log_path=self.log_path, **kwargs)
+        runner.report = lambda message: None
+        return runner.run()
+
+    def read_index(self):
+        with open(os.path.join(self.log_path, "index.jsonl")) as f:
+            return [json.loads(line) for line in f]
+
+    def test_batch(self):
+        """Test a failed scenario doesn't stop the rest of the batch"""
+        scenarios = [
+            self.write_scenario("a.json"),
+            self.write_scenario("b.json", eud_type="no_such_device"),
+            self.write_scenario("c.json")
+        ]
+        entries = self.run_batch(scenarios)
+        by_scenario = dict([(e["scenario"], e) for e in self.read_index()])
+        self.assertEqual(sorted(by_scenario.keys()), sorted(scenarios))
+        self.assertEqual(sorted(by_scenario.values()), sorted(entries))
+        self.assertEqual([by_scenario[s]["status"] for s in scenarios], ["ok", "failed", "ok"])
+        self.assertTrue("no_such_device" in by_scenario[scenarios[1]]["error"])
+        # each run has its own log folder with the log file and a copy of the scenario
+        run_ids = [by_scenario[s]["run_id"] for s in scenarios]
+        self.assertEqual(sorted(run_ids), [1, 2, 3])
+        for s in [scenarios[0], scenarios[2]]:
+            log_path = by_scenario[s]["log_path"]
+            self.assertTrue(os.path.getsize(os.path.join(log_path, "app.log")) > 0)
+            self.assertTrue(os.path.exists(os.path.join(log_path, os.path.basename(s))))
+
+    @unittest.skipUnless(os.path.exists("/proc/self/statm"), "needs /proc to measure the address space")
+    def test_memory_limit(self):
+        """Test a run that allocates more than the memory limit is recorded as failed"""
+        scenario = self.write_scenario("a.json")
+        memory_limit_mb = address_space_mb() + 128
+        # the forked worker inherits the replaced run, so the limit is hit by an allocation inside the run
+        run = simulation.Simulation.run
+        simulation.Simulation.run = allocating_run
+        try:
+            entries = self.run_batch([scenario], memory_limit_mb=memory_limit_mb)
+        finally:
+            simulation.Simulation.run = run
+        self.assertEqual(entries[0]["status"], "failed")
+        self.assertNotEqual(entries[0]["run_id"], None)
+        self.assertTrue("MemoryError" in entries[0]["error"])
+        self.assertEqual(len(self.read_index()), 1)
+
+    @unittest.skipUnless(os.path.exists("/proc/self/statm"), "needs /proc to measure the address space")
+    def test_within_memory_limit(self):
+        """Test a run that stays under the memory limit finishes"""
+        entries = self.run_batch([self.write_scenario("a.json")], memory_limit_mb=address_space_mb() + 128)
+        self.assertEqual(entries[0]["status"], "ok")
+
+if __name__ == "__main__":
+    unittest.main()
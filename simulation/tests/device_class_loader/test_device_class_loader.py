@@ -1,5 +1,10 @@
+import os
+import sys
+import shutil
+import tempfile
 import unittest
-from common.device_class_loader import DeviceClassLoader
+import subprocess
+from common.device_class_loader import DeviceClassLoader, build_device_registry, get_device_registry
 from device.simulated.eud import Eud
 from device.simulated.grid_controller import GridController
 from device.simulated.grid_controller.price_logic import AveragePriceLogic
@@ -25,5 +30,74 @@ class TestDeviceManager(unittest.TestCase):
         TheClass = self.device_class_loader.class_for_name(module_name, class_name)
         self.assertIs(TheClass, AveragePriceLogic)
 
+    def test_classes_are_cached(self):
+        """Test a class is only looked up the first time it's loaded"""
+        TheClass = self.device_class_loader.get_device_class_from_name("device.simulated.eud")
+        self.assertIs(DeviceClassLoader().get_device_class_from_name("device.simulated.eud"), TheClass)
+
+    def test_device_registry(self):
+        """Test the registry has the module and class of each device package"""
+        registry = get_device_registry()
+        self.assertEqual(registry["device.simulated.eud"], ("device.simulated.eud.eud", "Eud"))
+        self.assertEqual(
+            registry["device.simulated.grid_controller"], ("device.simulated.grid_controller.grid_controller", "GridController")
+        )
+        self.assertEqual(
+            registry["device.simulated.utility_meter_buyer"],
+            ("device.simulated.utility_meter_buyer.utility_meter_buyer", "UtilityMeterBuyer")
+        )
+        # the __init__.py doesn't import the class, it's found in the package's module
+        self.assertEqual(registry["device.real.philips_light"], ("device.real.philips_light.philips_light", "Philips_Light"))
+        # no __init__.py
+        self.assertNotIn("device.simulated.refrigerator", registry)
+        self.assertNotIn("device.real.laptop", registry)
+
+    def test_load_from_registry(self):
+        """Test a device class is loaded from the module in the registry"""
+        module_name, class_name = get_device_registry()["device.simulated.utility_meter_buyer"]
+        TheClass = self.device_class_loader.get_device_class_from_name("device.simulated.utility_meter_buyer")
+        self.assertEqual((TheClass.__module__, TheClass.__name__), (module_name, class_name))
+
+    def test_registry_does_not_import_devices(self):
+        """Test the registry is built without importing the device modules"""
+        device_path = tempfile.mkdtemp()
+
+        def write(file_name, code):
+            path = os.path.join(device_path, file_name)
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            with open(path, "w") as f:
+                f.write(code)
+
+        try:
+            write("simulated/broken_device/__init__.py", "raise Exception('imported')\nfrom broken_device import BrokenDevice\n")
+            write("simulated/broken_device/broken_device.py", "raise Exception('imported')\nclass BrokenDevice(object):\n    pass\n")
+            write("real/other/__init__.py", "from other import SomethingElse\n")
+            write("real/other/other.py", "class SomethingElse(object):\n    pass\n")
+            write("real/no_import/__init__.py", "")
+            write("real/no_import/no_import.py", "raise Exception('imported')\nclass Helper(object):\n    pass\nclass No_Import(Helper):\n    pass\n")
+            self.assertEqual(build_device_registry(device_path), {
+                "device.simulated.broken_device": ("device.simulated.broken_device.broken_device", "BrokenDevice"),
+                "device.real.no_import": ("device.real.no_import.no_import", "No_Import")
+            })
+        finally:
+            shutil.rmtree(device_path)
+
+    def test_heavy_modules_are_not_imported(self):
+        """Test loading the simulated device classes doesn't import the modules that are only needed for smap, flex lab or postgres"""
+        code = (
+            "import sys\n"
+            "from common.device_class_loader import DeviceClassLoader, get_device_registry\n"
+            "loader = DeviceClassLoader()\n"
+            "for module_name in get_device_registry():\n"
+            "    if module_name.startswith('device.simulated.'):\n"
+            "        loader.get_device_class_from_name(module_name)\n"
+            "import simulation_logger.pg_handler\n"
+            "print ','.join([m for m in ['requests', 'pytz', 'paramiko', 'psycopg2'] if m in sys.modules])\n"
+        )
+        with open(os.devnull, "w") as devnull:
+            output = subprocess.check_output([sys.executable, "-c", code], stderr=devnull)
+        self.assertEqual(output.strip(), "")
+
 if __name__ == "__main__":
     unittest.main()
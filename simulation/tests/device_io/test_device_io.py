@@ -0,0 +1,171 @@
+import time
+import json
+import pickle
+import socket
+import threading
+import unittest
+import BaseHTTPServer
+import SocketServer
+from common.device_io import IoLoop, AsyncDriver, HttpDriver
+
+class FakeDeviceServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """Local HTTP server with a state for each light, each light can be slow to answer"""
+    daemon_threads = True
+
+    def __init__(self):
+        BaseHTTPServer.HTTPServer.__init__(self, ("127.0.0.1", 0), FakeDeviceHandler)
+        self.lights = {}
+        # light id -> seconds to wait before answering
+        self.delays = {}
+        # light id -> number of requests to change its state
+        self.puts = {}
+        # light ids that don't answer until release is set
+        self.hang = set()
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+
+    def url(self):
+        return "http://127.0.0.1:{}/api".format(self.server_address[1])
+
+class FakeDeviceHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def light_id(self):
+        # /api/lights/<id>[/state]
+        return self.path.split("/")[3]
+
+    def reply(self, status, body=None):
+        data = json.dumps(body) if not body is None else ""
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        light_id = self.light_id()
+        time.sleep(self.server.delays.get(light_id, 0))
+        if light_id in self.server.lights:
+            self.reply(200, self.server.lights[light_id])
+        else:
+            self.reply(404)
+
+    def do_PUT(self):
+        light_id = self.light_id()
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(self.server.delays.get(light_id, 0))
+        if light_id in self.server.hang:
+            self.server.release.wait()
+        with self.server.lock:
+            self.server.lights[light_id] = body
+            self.server.puts[light_id] = self.server.puts.get(light_id, 0) + 1
+        self.reply(200, [{"success": body}])
+
+class TestDeviceIo(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeDeviceServer()
+        self.server_thread = threading.Thread(target=self.server.serve_forever)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+        self.io_loop = IoLoop(workers=8)
+
+    def tearDown(self):
+        self.io_loop.wait(10)
+        self.io_loop.close()
+        self.server.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def light(self, light_id, timeout=5.0):
+        return AsyncDriver(HttpDriver(self.server.url(), timeout=timeout), name=light_id, timeout=timeout, io_loop=self.io_loop)
+
+    def test_send_does_not_wait(self):
+        """Test sending a command to a slow device returns right away"""
+        self.server.delays["1"] = 1.0
+        start = time.time()
+        self.light("1").send("put", "/lights/1/state", {"on": True})
+        self.assertTrue(time.time() - start < 0.2)
+        self.assertTrue(self.io_loop.wait(10))
+        self.assertEqual(self.server.lights["1"], {"on": True})
+
+    def test_fan_out(self):
+        """Test the commands to different devices are sent concurrently"""
+        for i in range(5):
+            self.server.delays[str(i)] = 0.5
+        start = time.time()
+        for i in range(5):
+            self.light(str(i)).send("put", "/lights/{}/state".format(i), {"on": True, "bri": i})
+        self.assertTrue(self.io_loop.wait(10))
+        self.assertTrue(time.time() - start < 2.0)
+        self.assertEqual(sorted([v["bri"] for v in self.server.lights.values()]), range(5))
+
+    def test_timeout(self):
+        """Test a call that takes longer than its timeout gives an error"""
+        self.server.delays["1"] = 1.0
+        light = self.light("1", timeout=0.2)
+        light.send("put", "/lights/1/state", {"on": True})
+        self.assertTrue(self.io_loop.wait(10))
+        self.assertTrue(isinstance(light.last_error, socket.timeout))
+        self.assertEqual(self.io_loop.counts["timed_out"], 1)
+
+    def test_hanging_device(self):
+        """Test a command to a device that never answers times out and doesn't hold up the next command"""
+        self.server.hang.add("1")
+        # the http timeout is longer than the test, only the io loop's timeout can end the call
+        light = AsyncDriver(HttpDriver(self.server.url(), timeout=60.0), name="1", timeout=0.2, io_loop=self.io_loop)
+        start = time.time()
+        light.send("put", "/lights/1/state", {"on": True, "bri": 0})
+        self.assertTrue(self.io_loop.wait(5))
+        self.assertTrue(time.time() - start < 2.0)
+        self.assertTrue(isinstance(light.last_error, socket.timeout))
+        self.assertEqual(self.io_loop.counts["timed_out"], 1)
+
+        self.server.hang.discard("1")
+        light.send("put", "/lights/1/state", {"on": True, "bri": 1})
+        self.assertTrue(self.io_loop.wait(5))
+        self.assertEqual(self.server.lights["1"]["bri"], 1)
+        self.assertEqual(self.io_loop.counts["completed"], 1)
+
+        # the hung call's late answer is ignored
+        self.server.release.set()
+        time.sleep(0.3)
+        self.assertEqual(self.io_loop.counts["completed"], 1)
+        self.assertEqual(self.io_loop.counts["timed_out"], 1)
+
+    def test_latest_command(self):
+        """Test only the latest command waiting for a busy device is sent"""
+        self.server.delays["1"] = 0.3
+        light = self.light("1")
+        for i in range(6):
+            light.send("put", "/lights/1/state", {"on": True, "bri": i})
+        self.assertTrue(self.io_loop.wait(10))
+        self.assertEqual(self.server.puts["1"], 2)
+        self.assertEqual(self.server.lights["1"]["bri"], 5)
+        self.assertEqual(self.io_loop.counts["replaced"], 4)
+
+    def test_last_known_state(self):
+        """Test reads return the last known state and keep it when the device stops answering"""
+        self.server.lights["1"] = {"on": False}
+        light = self.light("1")
+        self.assertIsNone(light.read("get", "/lights/1"))
+        self.assertTrue(self.io_loop.wait(10))
+        self.assertEqual(light.read("get", "/lights/1"), {"on": False})
+        self.assertTrue(self.io_loop.wait(10))
+
+        del self.server.lights["1"]
+        self.assertEqual(light.read("get", "/lights/1"), {"on": False})
+        self.assertTrue(self.io_loop.wait(10))
+        self.assertEqual(light.last_known("get"), {"on": False})
+        self.assertFalse(light.last_error is None)
+
+    def test_pickle(self):
+        """Test a driver can be saved with a checkpoint"""
+        light = self.light("1")
+        light.read("get", "/lights/1")
+        self.assertTrue(self.io_loop.wait(10))
+        restored = pickle.loads(pickle.dumps(light))
+        self.assertIsNone(restored.io_loop)
+        self.assertEqual(restored.name, "1")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -37,5 +37,17 @@ class TestDeviceManager(unittest.TestCase):
         device = self.device_manager.get("eud_2")
         self.assertEqual(device.load, 0.15)
 
+    def test_total_load(self):
+        """Test the total load is kept up to date as the loads of the devices change"""
+        self.device_manager.add("eud_1", Eud)
+        self.device_manager.add("eud_2", Eud)
+        self.device_manager.set_load("eud_1", 100.0)
+        self.device_manager.set_load("eud_2", 50.0)
+        self.assertEqual(self.device_manager.total_load(), 150.0)
+        self.device_manager.get("eud_1").set_load(20.0)
+        self.assertEqual(self.device_manager.total_load(), 70.0)
+        self.device_manager.shutdown()
+        self.assertEqual(self.device_manager.total_load(), 0.0)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,135 @@
+import logging
+import unittest
+from device.simulated.eud import Eud
+from device.simulated.eud_fleet import eud_fleet
+from device.simulated.eud_fleet import EudFleet
+from supervisor.eud_fleets import build_fleets
+from supervisor.supervisor import Supervisor
+
+def eud_config(device_id, schedule, max_power_output, **kwargs):
+    config = {
+        "device_id": device_id,
+        "device_type": "eud",
+        "grid_controller_id": "gc_1",
+        "schedule": schedule,
+        "max_power_output": max_power_output
+    }
+    config.update(kwargs)
+    return config
+
+def scenario(euds, run_time_days=2):
+    return {
+        "run_time_days": run_time_days,
+        "engine": "inline",
+        "devices": {
+            "grid_controllers": [{"device_id": "gc_1", "device_type": "grid_controller"}],
+            "power_sources": [{
+                "device_id": "dg_1",
+                "device_type": "diesel_generator",
+                "grid_controller_id": "gc_1",
+                "capacity": 10000.0,
+                "fuel_tank_capacity": 100.0
+            }],
+            "euds": euds
+        }
+    }
+
+class TestBuildFleets(unittest.TestCase):
+    def test_build_fleets(self):
+        """Test the simple euds are grouped by grid controller and type, the others are left as they are"""
+        euds = [
+            eud_config("eud_1", [[8, "on"], [17, "off"]], 100.0),
+            {"device_id": "hvac_1", "device_type": "hvac", "grid_controller_id": "gc_1"},
+            eud_config("eud_2", [[8, "on"], [17, "off"]], 100.0, grid_controller_id="gc_2"),
+            {"device_id": "ac_1", "device_type": "air_conditioner_simple", "grid_controller_id": "gc_1"},
+            eud_config("eud_3", [[8, "on"], [17, "off"]], 100.0),
+            {"device_id": "ac_2", "device_type": "air_conditioner_simple", "grid_controller_id": "gc_1", "precooling": {}}
+        ]
+        fleets = build_fleets(euds, {"timestep": 300})
+        self.assertEqual(
+            [d["device_id"] for d in fleets],
+            ["fleet_gc_1_eud", "hvac_1", "fleet_gc_2_eud", "fleet_gc_1_air_conditioner_simple", "ac_2"]
+        )
+        self.assertEqual([m["device_id"] for m in fleets[0]["members"]], ["eud_1", "eud_3"])
+        self.assertEqual((fleets[0]["device_type"], fleets[0]["member_type"], fleets[0]["timestep"]), ("eud_fleet", "eud", 300))
+        with self.assertRaises(Exception):
+            build_fleets(euds, {"timestep": 0})
+
+@unittest.skipIf(eud_fleet.np is None, "numpy is not installed")
+class TestEudFleet(unittest.TestCase):
+    def setUp(self):
+        logger = logging.getLogger("lpdm")
+        logger.addHandler(logging.NullHandler())
+        logger.setLevel(logging.CRITICAL)
+
+    def test_power_levels(self):
+        """Test the fleet's power levels are the same as each eud's"""
+        members = [
+            eud_config("eud_1", None, 100.0),
+            eud_config("eud_2", None, 250.0, price_dim_start=0.1, price_dim_end=0.2, price_off=0.5, power_level_low=40.0),
+            eud_config("eud_3", None, 80.0, constant_power_output=True)
+        ]
+        fleet = EudFleet({"device_id": "fleet_1", "member_type": "eud", "members": members})
+        euds = [Eud(m) for m in members]
+        for price in [0.05, 0.1, 0.15, 0.3, 0.45, 0.6, 0.8, 1.0]:
+            fleet._member_price[:] = price
+            for d in euds:
+                d._price = price
+            self.assertEqual(list(fleet.calculate_power_levels()), [d.calculate_power_level() for d in euds])
+
+    def run_scenario(self, config):
+        """Run a scenario, returns the devices by device_id"""
+        supervisor = Supervisor()
+        supervisor.load_config(config)
+        supervisor.run_simulation()
+        self.assertIsNone(supervisor.error)
+        return dict((t.device_id, t.device) for t in supervisor.device_thread_manager.threads)
+
+    def test_same_as_event_engine(self):
+        """Test a fleet of euds uses the same energy as the euds run by the event engine"""
+        euds = [
+            eud_config("eud_1", [[7, "on"], [18, "off"]], 200.0),
+            # dims at the diesel generator's price
+            eud_config("eud_2", [[9, "on"], [13, "off"], [14, "on"], [22, "off"]], 300.0, price_dim_start=0.1, price_dim_end=0.2),
+            eud_config("eud_3", [[1, "on"], [23, "off"]], 150.0, price_dim_start=0.05, price_dim_end=0.1, price_off=0.2)
+        ]
+        config = scenario(euds)
+        devices = self.run_scenario(config)
+        fleet_devices = self.run_scenario(dict(config, vectorized_euds={"timestep": 60}))
+        self.assertEqual(sorted(fleet_devices.keys()), ["dg_1", "fleet_gc_1_eud", "gc_1"])
+        event_kwh = sum(devices[d["device_id"]]._sum_kwh for d in euds)
+        self.assertTrue(event_kwh > 0)
+        self.assertAlmostEqual(fleet_devices["fleet_gc_1_eud"]._sum_kwh, event_kwh)
+        self.assertAlmostEqual(fleet_devices["dg_1"]._sum_kwh, devices["dg_1"]._sum_kwh)
+
+    def test_air_conditioners_close_to_event_engine(self):
+        """Test a fleet of air conditioners uses about the same energy as the event engine"""
+        euds = [
+            {
+                "device_id": "ac_{}".format(i),
+                "device_type": "air_conditioner_simple",
+                "grid_controller_id": "gc_1",
+                "schedule": [[6 + i, "on"], [20, "off"]],
+                "max_power_output": 400.0 + 50 * i,
+                "set_point": 21.0 + i,
+                "current_temperature": 27.0
+            }
+            for i in range(4)
+        ]
+        config = scenario(euds)
+        devices = self.run_scenario(config)
+        fleet_devices = self.run_scenario(dict(config, vectorized_euds={"timestep": 300}))
+        event_kwh = sum(devices[d["device_id"]]._sum_kwh for d in euds)
+        fleet_kwh = fleet_devices["fleet_gc_1_air_conditioner_simple"]._sum_kwh
+        self.assertTrue(event_kwh > 0)
+        self.assertTrue(abs(fleet_kwh - event_kwh) / event_kwh < 0.02, "{} != {}".format(fleet_kwh, event_kwh))
+
+    def test_no_power(self):
+        """Test the grid controller turns off the whole fleet when it can't supply it"""
+        config = scenario([eud_config("eud_1", [[7, "on"], [18, "off"]], 200.0), eud_config("eud_2", [[7, "on"]], 100.0)], 1)
+        config["devices"]["power_sources"][0]["capacity"] = 250.0
+        devices = self.run_scenario(dict(config, vectorized_euds=True))
+        self.assertEqual(devices["fleet_gc_1_eud"]._sum_kwh, 0.0)
+
+if __name__ == "__main__":
+    unittest.main()
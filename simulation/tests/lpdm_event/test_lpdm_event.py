@@ -0,0 +1,77 @@
+import pickle
+import unittest
+from lpdm_event import LpdmPowerEvent, LpdmTtieEvent, LpdmConnectDeviceEvent, LpdmRunTimeErrorEvent, event_type
+from lpdm_event import enable_event_pool, disable_event_pool, release_event
+from lpdm_event import event_pool
+from tests.supervisor.helpers import capture_run, build_config
+
+class TestLpdmEvent(unittest.TestCase):
+    def tearDown(self):
+        disable_event_pool()
+
+    def test_fields(self):
+        """Test the events keep their fields, type and repr without a __dict__"""
+        e = LpdmPowerEvent("eud_1", "gc_1", 10, 100.0)
+        self.assertFalse(hasattr(e, "__dict__"))
+        self.assertEqual((e.source_device_id, e.target_device_id, e.time, e.value), ("eud_1", "gc_1", 10, 100.0))
+        self.assertEqual((e.type_code, e.event_type), (event_type.POWER_CHANGE, "power"))
+        self.assertEqual(repr(e), "type= power, source = eud_1, target = gc_1, time=10, value = 100.0")
+        t = LpdmTtieEvent("eud_1", 20)
+        self.assertEqual((t.source_device_id, t.target_device_id, t.time, t.value), (None, "eud_1", None, 20))
+        with self.assertRaises(AttributeError):
+            e.other = 1
+
+    def test_pickle(self):
+        """Test the events can be pickled with every protocol"""
+        events = [
+            LpdmPowerEvent("eud_1", "gc_1", 10, 100.0),
+            LpdmTtieEvent("eud_1", 20),
+            LpdmConnectDeviceEvent("eud_1", "eud", uuid=5),
+            LpdmRunTimeErrorEvent("error")
+        ]
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            for e in events:
+                copy = pickle.loads(pickle.dumps(e, protocol))
+                self.assertEqual(type(copy), type(e))
+                self.assertEqual(copy.__getstate__(), e.__getstate__())
+        self.assertEqual(pickle.loads(pickle.dumps(events[2])).uuid, 5)
+
+    def test_pool(self):
+        """Test released events are reused"""
+        enable_event_pool()
+        e = LpdmPowerEvent("eud_1", "gc_1", 10, 100.0)
+        release_event(e)
+        reused = LpdmPowerEvent("eud_2", "gc_1", 20, 50.0)
+        self.assertTrue(reused is e)
+        self.assertEqual((reused.source_device_id, reused.time, reused.value), ("eud_2", 20, 50.0))
+        # each class has its own free list
+        release_event(reused)
+        self.assertFalse(LpdmTtieEvent("eud_1", 30) is reused)
+        disable_event_pool()
+        self.assertFalse(LpdmPowerEvent("eud_1", "gc_1", 10, 100.0) is reused)
+
+    def run_simulation(self, engine, pool):
+        config = build_config(engine=engine, event_pool=pool)
+        config["devices"]["euds"] = [
+            {
+                "device_id": "eud_{}".format(i),
+                "device_type": "eud",
+                "grid_controller_id": "gc_1",
+                "max_power_output": 100.0,
+                "schedule": [[2 + i, "on"], [20 + i, "off"]]
+            } for i in range(3)
+        ]
+        supervisor, messages = capture_run(config)
+        self.assertIsNone(supervisor.error)
+        return messages
+
+    def test_pooled_simulation(self):
+        """Test a simulation with the event pool gives the same results"""
+        for engine in ["inline", "threaded"]:
+            expected = self.run_simulation(engine, False)
+            self.assertEqual(self.run_simulation(engine, True), expected)
+            self.assertTrue(len(event_pool.pools[LpdmPowerEvent]) > 0)
+            disable_event_pool()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+import random
+import unittest
+from device.simulated.grid_controller.power_source_manager import PowerSourceManager
+from device.simulated.diesel_generator import DieselGenerator
+
+class RecordingPowerSourceManager(PowerSourceManager):
+    """Records the changes to the loads of the power sources, in the order they're made"""
+    def __init__(self):
+        super(RecordingPowerSourceManager, self).__init__()
+        self.loads_set = []
+        self.loads = {}
+
+    def load_changed(self, power_source):
+        if power_source.load != self.loads.get(power_source.device_id, 0.0):
+            self.loads_set.append((power_source.device_id, power_source.load))
+            self.loads[power_source.device_id] = power_source.load
+        super(RecordingPowerSourceManager, self).load_changed(power_source)
+
+class FullSortPowerSourceManager(RecordingPowerSourceManager):
+    """The original optimize_load, which sorts all of the configured power sources by price each time"""
+    def optimize_load(self):
+        remaining_load = self._load
+        starting_load = remaining_load
+
+        power_sources = [p for p in self.power_sources if p.is_configured()]
+        power_sources = sorted(power_sources, lambda a, b: cmp(a.price, b.price))
+        for ps in power_sources:
+            if remaining_load == 0:
+                ps.set_load(0.0)
+            else:
+                if not ps.is_available():
+                    if ps.load > 0:
+                        ps.set_load(0.0)
+                else:
+                    if remaining_load > ps.capacity:
+                        if ps.load != ps.capacity:
+                            ps.set_load(ps.capacity)
+                        remaining_load -= ps.capacity
+                    else:
+                        if ps.load != remaining_load:
+                            ps.set_load(remaining_load)
+                        remaining_load = 0
+
+        diff = abs(starting_load - self._load)
+        if remaining_load > 1e-7:
+            return False
+        elif diff > 1e-7:
+            raise Exception("starting/ending loads do not match {} != {}".format(starting_load, self._load))
+        return True
+
+    def get_available_power_sources(self):
+        return filter(lambda d: d.is_available(), self.power_sources)
+
+    def get_changed_power_sources(self):
+        return [p for p in self.power_sources if p.load_changed]
+
+    def reset_changed(self):
+        [p.reset_changed() for p in self.power_sources]
+
+class TestMeritOrder(unittest.TestCase):
+    def state(self, psm):
+        return (
+            [(p.device_id, p.load, p.load_changed, p.capacity_changed) for p in psm.power_sources],
+            [p.device_id for p in psm.get_available_power_sources()],
+            [p.device_id for p in psm.get_changed_power_sources()],
+            psm.has_available_power_sources(),
+            psm.loads_set
+        )
+
+    def optimize(self, psm):
+        try:
+            return psm.optimize_load()
+        except Exception as e:
+            return str(e)
+
+    def compare_with_full_sort(self, rng, n_sources, n_actions):
+        """Make the same random changes to a manager and the reference, checking they dispatch the same loads"""
+        psm = RecordingPowerSourceManager()
+        reference = FullSortPowerSourceManager()
+        managers = [psm, reference]
+        # few distinct prices so there are ties, which go in the order the power sources were added
+        prices = [round(rng.uniform(0.1, 0.5), 2) for i in range(20)]
+        for i in range(n_sources):
+            for manager in managers:
+                manager.add("dg_{}".format(i), DieselGenerator)
+            if rng.random() < 0.9:
+                price = rng.choice(prices)
+                capacity = rng.choice([0.0, rng.uniform(0.0, 50.0), rng.randint(1, 5) * 10.0])
+                for manager in managers:
+                    manager.set_price("dg_{}".format(i), price)
+                    manager.set_capacity("dg_{}".format(i), capacity)
+
+        for n in range(n_actions):
+            action = rng.random()
+            device_id = rng.choice(psm.power_sources).device_id
+            if action < 0.25:
+                price = rng.choice(prices)
+                for manager in managers:
+                    manager.set_price(device_id, price)
+            elif action < 0.5:
+                capacity = rng.choice([0.0, rng.uniform(0.0, 50.0), rng.randint(1, 5) * 10.0])
+                for manager in managers:
+                    manager.set_capacity(device_id, capacity)
+            elif action < 0.7:
+                # change the total load to none, a new total up to a little more than the total capacity, a bit, or
+                # to a negative total
+                new_load = rng.choice([
+                    0.0, rng.uniform(0.0, 1.05) * psm.total_capacity(), psm._load + rng.uniform(-50, 50),
+                    rng.uniform(-50, 0)
+                ])
+                load = new_load - psm._load
+                for manager in managers:
+                    manager.add_load(load)
+            elif action < 0.75:
+                for manager in managers:
+                    manager.reset_changed()
+            elif action < 0.77:
+                device_id = "dg_{}".format(len(psm.power_sources))
+                for manager in managers:
+                    manager.add(device_id, DieselGenerator)
+            else:
+                self.assertEqual(self.optimize(psm), self.optimize(reference))
+                self.assertEqual(self.state(psm), self.state(reference))
+        self.assertEqual(self.optimize(psm), self.optimize(reference))
+        self.assertEqual(self.state(psm), self.state(reference))
+
+    def test_same_as_full_sort(self):
+        """Test the merit order dispatch sets the same loads as sorting all of the power sources"""
+        self.compare_with_full_sort(random.Random(1), 2000, 1000)
+
+    def test_same_as_full_sort_few_sources(self):
+        """Test the same with a few power sources, where the cheapest ones are often loaded, unloaded and moved"""
+        rng = random.Random(2)
+        for i in range(200):
+            self.compare_with_full_sort(rng, 5, 100)
+
+    def test_zero_load(self):
+        """Test the load is removed from the power sources when the total load goes to 0"""
+        psm = PowerSourceManager()
+        for (device_id, price) in [("dg_1", 0.3), ("dg_2", 0.1), ("dg_3", 0.2)]:
+            psm.add(device_id, DieselGenerator)
+            psm.set_price(device_id, price)
+            psm.set_capacity(device_id, 10.0)
+        psm.add_load(25.0)
+        self.assertTrue(psm.optimize_load())
+        self.assertEqual([p.load for p in psm.power_sources], [5.0, 10.0, 10.0])
+        # the cheapest power source gets more expensive
+        psm.set_price("dg_2", 0.4)
+        self.assertTrue(psm.optimize_load())
+        self.assertEqual([p.load for p in psm.power_sources], [10.0, 5.0, 10.0])
+        psm.remove_load(25.0)
+        self.assertTrue(psm.optimize_load())
+        self.assertEqual([p.load for p in psm.power_sources], [0.0, 0.0, 0.0])
+        self.assertEqual(psm._loaded, {})
+
+if __name__ == "__main__":
+    unittest.main()
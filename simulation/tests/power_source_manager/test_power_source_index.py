@@ -0,0 +1,43 @@
+import unittest
+from device.simulated.grid_controller.power_source_manager import PowerSourceManager
+from device.simulated.grid_controller.power_buyer_manager import PowerBuyerManager
+from device.simulated.diesel_generator import DieselGenerator
+from device.simulated.utility_meter_buyer import UtilityMeterBuyer
+
+class TestPowerSourceIndex(unittest.TestCase):
+    def setUp(self):
+        self.psm = PowerSourceManager()
+        for device_id in ["dg_1", "dg_2", "dg_3"]:
+            self.psm.add(device_id, DieselGenerator)
+
+    def test_get_by_id(self):
+        """Test getting the power sources by id, and all of them in the order they were added"""
+        self.assertEqual(self.psm.get("dg_2").device_id, "dg_2")
+        self.assertIsNone(self.psm.get("dg_4"))
+        self.assertEqual([p.device_id for p in self.psm.get()], ["dg_1", "dg_2", "dg_3"])
+        with self.assertRaises(Exception):
+            self.psm.add("dg_2", DieselGenerator)
+
+    def test_available_count(self):
+        """Test the availability is kept up to date as the capacities and prices change"""
+        self.assertFalse(self.psm.has_available_power_sources())
+        self.psm.set_capacity("dg_1", 100.0)
+        self.assertFalse(self.psm.has_available_power_sources())
+        self.psm.set_price("dg_1", 0.2)
+        self.psm.set_price("dg_2", 0.3)
+        self.psm.set_capacity("dg_2", 100.0)
+        self.assertTrue(self.psm.has_available_power_sources())
+        self.psm.set_capacity("dg_1", 0.0)
+        self.assertTrue(self.psm.has_available_power_sources())
+        self.psm.get("dg_2").capacity = 0.0
+        self.assertFalse(self.psm.has_available_power_sources())
+        self.assertEqual(self.psm.get_available_power_sources(), [])
+
+    def test_power_buyer_get_by_id(self):
+        pbm = PowerBuyerManager()
+        pbm.add("umb_1", UtilityMeterBuyer)
+        self.assertEqual(pbm.get("umb_1").device_id, "umb_1")
+        self.assertIsNone(pbm.get("umb_2"))
+
+if __name__ == "__main__":
+    unittest.main()
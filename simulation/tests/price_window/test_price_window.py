@@ -0,0 +1,59 @@
+import random
+import unittest
+from device.base.device import PriceWindow
+from device.simulated.grid_controller import GridController
+
+class TestPriceWindow(unittest.TestCase):
+    def setUp(self):
+        self.window = PriceWindow(4)
+
+    def test_keep_last_prices(self):
+        """Test the window keeps the newest prices, oldest first"""
+        for price in [0.1, 0.2, 0.3, 0.4, 0.5, 0.6]:
+            self.window.append(price)
+        self.assertEqual(list(self.window), [0.3, 0.4, 0.5, 0.6])
+        self.assertEqual((self.window[0], self.window[-1]), (0.3, 0.6))
+        self.assertTrue(self.window.is_full())
+        self.assertEqual((self.window.min(), self.window.max()), (0.3, 0.6))
+        self.assertAlmostEqual(self.window.average(), 0.45)
+
+    def test_empty(self):
+        self.assertEqual(len(self.window), 0)
+        self.assertIsNone(self.window.average())
+        self.assertIsNone(self.window.min())
+        self.assertIsNone(self.window.percentile(50))
+
+    def test_percentiles(self):
+        """Test the nearest rank percentiles and the rank of a price"""
+        for price in [0.4, 0.1, 0.3, 0.2]:
+            self.window.append(price)
+        self.assertEqual([self.window.percentile(p) for p in [0, 25, 50, 75, 100]], [0.1, 0.1, 0.2, 0.3, 0.4])
+        self.assertEqual(self.window.percent_rank(0.25), 0.5)
+        self.assertEqual(self.window.percent_rank(0.05), 0.0)
+
+    def test_same_as_list(self):
+        """Test the running statistics match the ones computed from a list of the last prices"""
+        rng = random.Random(1)
+        window = PriceWindow(24)
+        prices = []
+        for i in range(1000):
+            price = round(rng.uniform(0.05, 0.5), rng.randint(1, 6))
+            window.append(price)
+            prices = (prices + [price])[-24:]
+            self.assertEqual(list(window), prices)
+            self.assertAlmostEqual(window.average(), sum(prices) / len(prices), places=12)
+            self.assertEqual((window.min(), window.max()), (min(prices), max(prices)))
+            self.assertEqual(window.percentile(50), sorted(prices)[(len(prices) + 1) // 2 - 1])
+
+    def test_shared_with_battery(self):
+        """Test the grid controller's battery uses the grid controller's window"""
+        events = []
+        gc = GridController({"device_id": "gc_1", "battery": {"device_id": "battery_1"}, "broadcast": events.append})
+        gc._price = 0.3
+        gc.init()
+        self.assertIs(gc._battery._hourly_prices, gc._hourly_prices)
+        gc._battery.calculate_hourly_price()
+        self.assertEqual(list(gc._hourly_prices), [0.3])
+
+if __name__ == "__main__":
+    unittest.main()
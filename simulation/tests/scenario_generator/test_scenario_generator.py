@@ -0,0 +1,51 @@
+import logging
+import unittest
+from scenario_generator import generate_scenario, EUD_TYPES, POWER_SOURCE_TYPES
+from supervisor.supervisor import Supervisor
+
+class TestScenarioGenerator(unittest.TestCase):
+    def test_same_seed_same_scenario(self):
+        self.assertEqual(generate_scenario(50, seed=3), generate_scenario(50, seed=3))
+        self.assertNotEqual(generate_scenario(50, seed=3), generate_scenario(50, seed=4))
+
+    def test_devices(self):
+        """Test the euds and power sources have all of the types and are spread over the grid controllers"""
+        config = generate_scenario(20, n_power_sources=4, n_grid_controllers=2, batteries=True)
+        devices = config["devices"]
+        self.assertEqual([gc["device_id"] for gc in devices["grid_controllers"]], ["gc_1", "gc_2"])
+        self.assertEqual([gc["battery"]["device_id"] for gc in devices["grid_controllers"]], ["bt_1", "bt_2"])
+        self.assertEqual(len(devices["euds"]), 20)
+        self.assertEqual(sorted(set(d["device_type"] for d in devices["euds"])), sorted(EUD_TYPES))
+        self.assertEqual(sorted(set(d["device_type"] for d in devices["power_sources"])), sorted(POWER_SOURCE_TYPES))
+        for section in ["euds", "power_sources"]:
+            self.assertEqual(
+                sorted(set(d["grid_controller_id"] for d in devices[section])), ["gc_1", "gc_2"]
+            )
+        ids = [d["device_id"] for section in devices.values() for d in section]
+        self.assertEqual(len(ids), len(set(ids)))
+        for d in devices["euds"]:
+            on, off = d["schedule"]
+            self.assertTrue(on[0] < off[0])
+
+    def test_invalid(self):
+        with self.assertRaises(Exception):
+            generate_scenario(10, n_grid_controllers=0)
+        with self.assertRaises(Exception):
+            generate_scenario(10, n_power_sources=1, n_grid_controllers=2)
+        with self.assertRaises(Exception):
+            generate_scenario(10, eud_types=["toaster"])
+
+    def test_run(self):
+        """Test a generated scenario runs without errors"""
+        logger = logging.getLogger("lpdm")
+        logger.addHandler(logging.NullHandler())
+        logger.setLevel(logging.CRITICAL)
+        config = generate_scenario(12, n_power_sources=4, n_grid_controllers=2, batteries=True, run_time_days=0.5)
+        config["engine"] = "inline"
+        supervisor = Supervisor()
+        supervisor.load_config(config)
+        supervisor.run_simulation()
+        self.assertIsNone(supervisor.error)
+
+if __name__ == "__main__":
+    unittest.main()
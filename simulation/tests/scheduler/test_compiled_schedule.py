@@ -0,0 +1,137 @@
+import random
+import unittest
+from device.scheduler import Scheduler, compile_schedule
+from device.scheduler.lpdm_exception import LpdmScheduleInvalid
+
+SECS_IN_DAY = 24 * 60 * 60
+HOUR = 3600
+
+def next_task_linear(scheduled_items, time_seconds):
+    """The original linear search of Scheduler.get_next_scheduled_task"""
+    day = int(time_seconds / SECS_IN_DAY)
+    secs = time_seconds % SECS_IN_DAY
+    found_item = None
+    for item in scheduled_items:
+        if item.day == day and item.time > secs:
+            found_item = item
+            break
+        elif item.day > day:
+            found_item = item
+            break
+    if found_item is None:
+        last_day = None
+        last_day_items = []
+        for item in scheduled_items[::-1]:
+            if last_day is None:
+                last_day = item.day
+            if item.day != last_day:
+                break
+            last_day_items.insert(0, item)
+        if secs < last_day_items[0].time or secs >= last_day_items[-1].time:
+            found_item = last_day_items[0]
+        else:
+            for item in last_day_items:
+                found_item = item
+                if item.time > secs:
+                    break
+    ttie = (day * SECS_IN_DAY) + found_item.time
+    if ttie <= time_seconds:
+        ttie += SECS_IN_DAY
+    return (ttie, found_item.value)
+
+def scheduler(schedule):
+    the_scheduler = Scheduler(schedule)
+    the_scheduler.parse_schedule()
+    return the_scheduler
+
+class TestCompiledSchedule(unittest.TestCase):
+    def test_same_as_linear_search(self):
+        """Test the bisect lookups give the same tasks as the original linear search"""
+        rng = random.Random(1)
+        for n in range(50):
+            unit = rng.choice(["hour", "minute", "second"])
+            scale = {"hour": 1, "minute": 60, "second": HOUR}[unit]
+            schedule = [
+                [rng.randint(0, 23) * scale, rng.choice(["on", "off"]), unit] for i in range(rng.randint(1, 40))
+            ]
+            the_scheduler = scheduler(schedule)
+            end = (the_scheduler.scheduled_items[-1].day + 3) * SECS_IN_DAY
+            for time_seconds in [-1, 0, end] + [rng.randint(-1, end) for i in range(200)] + [rng.uniform(0, end)]:
+                task = the_scheduler.get_next_scheduled_task(time_seconds)
+                self.assertEqual(
+                    (task.ttie, task.value), next_task_linear(the_scheduler.scheduled_items, time_seconds)
+                )
+
+    def test_items_out_of_order(self):
+        """Test a schedule whose items aren't in order of time is searched in order"""
+        schedule = [[3, "on", "day"], [8, "off"], [1, "on", "day"], [2, "off"]]
+        the_scheduler = scheduler(schedule)
+        self.assertFalse(the_scheduler.compiled.is_sorted)
+        for time_seconds in range(0, 6 * SECS_IN_DAY, HOUR):
+            task = the_scheduler.get_next_scheduled_task(time_seconds)
+            self.assertEqual((task.ttie, task.value), next_task_linear(the_scheduler.scheduled_items, time_seconds))
+
+    def test_share_compiled_schedule(self):
+        """Test identical schedules share one compiled schedule"""
+        first = scheduler([[8, "on"], [17, "off"]])
+        second = scheduler([[8, "on"], [17, "off"]])
+        second.set_task_name("price")
+        self.assertIs(first.compiled, second.compiled)
+        self.assertIsNot(first.compiled, scheduler([[9, "on"], [17, "off"]]).compiled)
+        self.assertEqual(second.get_next_scheduled_task(0).name, "price")
+
+class TestCalendarSchedule(unittest.TestCase):
+    def setUp(self):
+        self.schedule = {
+            "weekday": [[17, "off"], [8, "on"]],
+            "weekend": [[10, "on"], [14, "off"]],
+            "saturday": [[9, "on"], [12, "off"]],
+            "holidays": [2],
+            "holiday": [],
+            "start_day_of_week": "thursday"
+        }
+
+    def next_tasks(self, the_scheduler, count, time_seconds=-1):
+        tasks = []
+        for i in range(count):
+            task = the_scheduler.get_next_scheduled_task(time_seconds)
+            tasks.append((task.ttie / float(HOUR), task.value))
+            time_seconds = task.ttie
+        return tasks
+
+    def test_weekly_cycle(self):
+        """Test the weekdays, the saturday override, the weekend and a holiday, starting on a thursday"""
+        tasks = self.next_tasks(scheduler(self.schedule), 10)
+        self.assertEqual(tasks, [
+            # thursday and friday
+            (8, "on"), (17, "off"), (24 + 8, "on"), (24 + 17, "off"),
+            # day 2 is a saturday holiday, then sunday and monday
+            (72 + 10, "on"), (72 + 14, "off"), (96 + 8, "on"), (96 + 17, "off"),
+            # tuesday
+            (120 + 8, "on"), (120 + 17, "off")
+        ])
+        # the saturday of the next week isn't a holiday
+        tasks = self.next_tasks(scheduler(self.schedule), 2, 9 * SECS_IN_DAY)
+        self.assertEqual(tasks, [(216 + 9, "on"), (216 + 12, "off")])
+
+    def test_task_at_start(self):
+        """Test a task at time 0 is found when looking from just before it, as a device does before it's initialized"""
+        the_scheduler = scheduler({"weekday": [[0, "on"], [12, "off"]]})
+        self.assertEqual(the_scheduler.get_next_scheduled_task(-1).ttie, 0)
+        self.assertEqual(the_scheduler.get_next_scheduled_task(0).ttie, 12 * HOUR)
+
+    def test_no_tasks(self):
+        """Test there's no next task when only past holidays have tasks"""
+        the_scheduler = scheduler({"holiday": [[8, "on"]], "holidays": [1]})
+        self.assertEqual(the_scheduler.get_next_scheduled_task(0).ttie, SECS_IN_DAY + 8 * HOUR)
+        self.assertIsNone(the_scheduler.get_next_scheduled_task(2 * SECS_IN_DAY))
+        self.assertIsNone(scheduler({}).get_next_scheduled_task(0))
+
+    def test_invalid(self):
+        with self.assertRaises(LpdmScheduleInvalid):
+            compile_schedule({"weekdays": [[8, "on"]]})
+        with self.assertRaises(LpdmScheduleInvalid):
+            compile_schedule({"start_day_of_week": 7})
+
+if __name__ == "__main__":
+    unittest.main()
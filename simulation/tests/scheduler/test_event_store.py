@@ -0,0 +1,73 @@
+import random
+import unittest
+from device.scheduler import EventStore, LpdmEvent
+
+class TestEventStore(unittest.TestCase):
+    def setUp(self):
+        self.store = EventStore()
+        self.events = [
+            LpdmEvent(300, "reasses_setpoint"),
+            LpdmEvent(100, "on"),
+            LpdmEvent(300, "update_outdoor_temperature"),
+            LpdmEvent(200, 0.25, "price"),
+            LpdmEvent(100, "hourly_price_calculation")
+        ]
+        for event in self.events:
+            self.store.add(event)
+
+    def test_iterate_in_order_added(self):
+        self.assertEqual(list(self.store), self.events)
+        self.assertEqual(len(self.store), 5)
+
+    def test_find(self):
+        """Test finding events by (name, value) and by name"""
+        self.assertEqual(self.store.find("on"), [self.events[1]])
+        self.assertEqual(self.store.find("off"), [])
+        self.assertEqual(self.store.find(0.25), [])
+        self.assertEqual(self.store.find(0.25, "price"), [self.events[3]])
+        self.assertEqual(self.store.find_named("price"), [self.events[3]])
+        self.assertTrue(self.store.has("reasses_setpoint", 300))
+        self.assertFalse(self.store.has("reasses_setpoint", 400))
+
+    def test_due_and_next(self):
+        """Test the due events are in the order added and the next event breaks ties by the order added"""
+        self.assertEqual(self.store.due(100), [self.events[1], self.events[4]])
+        self.assertEqual(self.store.due(50), [])
+        self.assertIs(self.store.first(), self.events[1])
+        self.assertIs(self.store.next_after(100), self.events[3])
+        self.assertIs(self.store.next_after(200), self.events[0])
+        self.assertIsNone(self.store.next_after(300))
+
+    def test_remove(self):
+        self.store.remove(self.events[1])
+        self.assertIs(self.store.first(), self.events[4])
+        self.assertNotIn(self.events[1], self.store)
+        self.assertEqual(self.store.find("on"), [])
+        self.assertEqual(len(self.store), 4)
+        with self.assertRaises(ValueError):
+            self.store.remove(self.events[1])
+
+    def test_same_as_list(self):
+        """Test the store gives the same results as looking through a list of the events"""
+        rng = random.Random(1)
+        store = EventStore()
+        events = []
+        for i in range(2000):
+            if len(events) and rng.random() < 0.45:
+                event = rng.choice(events)
+                events.remove(event)
+                store.remove(event)
+            else:
+                event = LpdmEvent(rng.randint(0, 50), rng.choice(["on", "off", "price", "refuel"]))
+                events.append(event)
+                store.add(event)
+            time = rng.randint(0, 50)
+            self.assertEqual(store.due(time), [e for e in events if e.ttie <= time])
+            later = [e for e in events if e.ttie > time]
+            self.assertIs(store.next_after(time), min(later, key=lambda e: e.ttie) if len(later) else None)
+            self.assertIs(store.first(), min(events, key=lambda e: e.ttie) if len(events) else None)
+            self.assertEqual(store.find("refuel"), [e for e in events if e.value == "refuel"])
+        self.assertEqual(list(store), events)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import shutil
+import logging
+import tempfile
+import unittest
+import multiprocessing
+from simulation_logger import SimulationLogger
+
+def claim_id(base_path):
+    """Allocate a simulation id and create its folder"""
+    logger = SimulationLogger(base_path=base_path)
+    logger.generate_simulation_id()
+    logger.create_simulation_log_folder()
+    return logger.log_id
+
+class TestSimulationLogger(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_create_base_path(self):
+        """Test the logs folder is created if it doesn't exist"""
+        logger = SimulationLogger(base_path=os.path.join(self.path, "logs"))
+        logger.generate_simulation_id()
+        logger.create_simulation_log_folder()
+        self.assertEqual(logger.log_id, 1)
+        self.assertTrue(os.path.isdir(os.path.join(self.path, "logs", "simulation_1")))
+
+    def test_same_candidate_id(self):
+        """Test two simulations that picked the same id before either created its folder get different ids"""
+        os.mkdir(os.path.join(self.path, "simulation_3"))
+        loggers = [SimulationLogger(base_path=self.path) for i in range(2)]
+        for logger in loggers:
+            logger.generate_simulation_id()
+        self.assertEqual([logger.log_id for logger in loggers], [4, 4])
+        for logger in loggers:
+            logger.create_simulation_log_folder()
+        self.assertEqual([logger.log_id for logger in loggers], [4, 5])
+
+    def test_concurrent_ids(self):
+        """Test simulations started at the same time get different ids"""
+        os.mkdir(os.path.join(self.path, "simulation_3"))
+        n = 8
+        pool = multiprocessing.Pool(n)
+        try:
+            ids = pool.map(claim_id, [self.path] * n)
+        finally:
+            pool.close()
+            pool.join()
+        self.assertEqual(sorted(ids), range(4, 4 + n))
+        self.assertEqual(len(os.listdir(self.path)), n + 1)
+
+    def log_with_file_level(self, file_log_level, extra_handler=None):
+        """Set up a simulation logger with the file level, log a debug message, return the app.log contents"""
+        logger = logging.getLogger("lpdm")
+        saved = (logger.handlers[:], logger.level)
+        if not extra_handler is None:
+            logger.addHandler(extra_handler)
+        try:
+            sim_logger = SimulationLogger(
+                console_log_level=logging.CRITICAL, file_log_level=file_log_level, base_path=self.path
+            )
+            sim_logger.init()
+            logger.debug("a debug message")
+            for handler in logger.handlers:
+                handler.flush()
+            with open(os.path.join(sim_logger.simulation_log_path(), "app.log")) as f:
+                return f.read()
+        finally:
+            for handler in logger.handlers:
+                if not handler in saved[0]:
+                    handler.close()
+            logger.handlers = saved[0]
+            logger.setLevel(saved[1])
+
+    def test_file_level_notset(self):
+        """Test a file handler without a level (0) logs the debug messages"""
+        self.assertIn("a debug message", self.log_with_file_level(logging.NOTSET))
+
+    def test_null_handler(self):
+        """Test a NullHandler left on the logger doesn't stop the debug messages"""
+        self.assertIn("a debug message", self.log_with_file_level(logging.DEBUG, logging.NullHandler()))
+        self.assertNotIn("a debug message", self.log_with_file_level(logging.INFO))
+
+if __name__ == "__main__":
+    unittest.main()
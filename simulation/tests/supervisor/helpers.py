@@ -0,0 +1,84 @@
+"""
+Helpers for the tests that run a scenario and compare the log messages of the runs.
+"""
+import logging
+from supervisor.supervisor import Supervisor
+
+class ListHandler(logging.Handler):
+    """Keep the log messages in a list"""
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+def capture(fn, *args):
+    """Call fn(*args) with the lpdm logger at DEBUG and return the log messages"""
+    logger = logging.getLogger("lpdm")
+    handler = ListHandler()
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+    try:
+        fn(*args)
+    finally:
+        logger.removeHandler(handler)
+    return handler.messages
+
+def device_messages(messages, device_ids):
+    """Keep the messages logged by the devices"""
+    return [m for m in messages if m.count("; ") >= 5 and m.split("; ")[2] in device_ids]
+
+def empty_config(run_time_days=2, engine="inline", **options):
+    """A scenario without any devices, the options are added to the scenario"""
+    config = {
+        "run_time_days": run_time_days,
+        "engine": engine,
+        "devices": {"grid_controllers": [], "power_sources": [], "euds": []}
+    }
+    config.update(options)
+    return config
+
+def add_grid_controller(config, i=1, on_hour=3, storage=False):
+    """
+    Add grid controller gc_<i> with a pv (pv_<i>) and an eud (eud_<i>) that's on from on_hour to 23:00.
+    With storage the grid controller also has a battery (bt_<i>) and a diesel generator (dg_<i>).
+    """
+    gc_id = "gc_{}".format(i)
+    devices = config["devices"]
+    gc = {"device_id": gc_id, "device_type": "grid_controller"}
+    if storage:
+        gc["battery"] = {"device_id": "bt_{}".format(i)}
+        devices["power_sources"].append({
+            "device_id": "dg_{}".format(i),
+            "grid_controller_id": gc_id,
+            "device_type": "diesel_generator",
+            "fuel_tank_capacity": 100.0
+        })
+    devices["grid_controllers"].append(gc)
+    devices["power_sources"].append({"device_id": "pv_{}".format(i), "grid_controller_id": gc_id, "device_type": "pv"})
+    devices["euds"].append({
+        "device_id": "eud_{}".format(i),
+        "device_type": "eud",
+        "grid_controller_id": gc_id,
+        "max_power_output": 100.0,
+        "schedule": [[on_hour, "on"], [23, "off"]]
+    })
+    return config
+
+def build_config(run_time_days=2, engine="inline", storage=False, **options):
+    """A scenario with a single grid controller, gc_1, see add_grid_controller"""
+    return add_grid_controller(empty_config(run_time_days, engine, **options), storage=storage)
+
+def run_supervisor(config):
+    """Run a scenario in a supervisor, returns the supervisor"""
+    supervisor = Supervisor()
+    supervisor.load_config(config)
+    supervisor.run_simulation()
+    return supervisor
+
+def capture_run(config):
+    """Run a scenario, returns the supervisor and the log messages"""
+    supervisors = []
+    messages = capture(lambda: supervisors.append(run_supervisor(config)))
+    return supervisors[0], messages
@@ -0,0 +1,100 @@
+import time
+import random
+import logging
+import unittest
+from multiprocessing.pool import ThreadPool
+from lpdm_event import LpdmPowerEvent, LpdmTtieEvent, LpdmInitEvent
+from supervisor.supervisor import Supervisor
+from scenario_generator import generate_scenario
+from tests.supervisor.helpers import capture, capture_run
+
+class EchoDevice(object):
+    """Minimal device that sends a power event to the recorder when it gets a ttie"""
+    def __init__(self, config):
+        self.device_id = config["device_id"]
+        self.broadcast = config["broadcast"]
+        self.rand = random.Random(self.device_id)
+        self.logger = logging.getLogger("lpdm")
+
+    def init(self):
+        pass
+
+    def set_initialized(self, initialized=True):
+        pass
+
+    def process_supervisor_event(self, the_event):
+        # take a random amount of time so the threads in the pool finish in a random order
+        self.logger.debug("{} woke up".format(self.device_id))
+        time.sleep(self.rand.random() / 100.0)
+        self.broadcast(LpdmPowerEvent(self.device_id, "recorder", the_event.value, 1.0))
+        self.logger.debug("{} sent its power".format(self.device_id))
+
+class RecorderDevice(object):
+    """Minimal device that keeps the source of the events it receives"""
+    def __init__(self, config):
+        self.sources = []
+
+    def init(self):
+        pass
+
+    def set_initialized(self, initialized=True):
+        pass
+
+    def process_supervisor_event(self, the_event):
+        self.sources.append(the_event.source_device_id)
+
+class TestBatchTtie(unittest.TestCase):
+    def build_supervisor(self, engine, batch_workers):
+        supervisor = Supervisor()
+        supervisor.set_engine(engine)
+        supervisor.max_ttie = 1000
+        supervisor.batch_ttie = True
+        if batch_workers > 1:
+            supervisor.batch_pool = ThreadPool(batch_workers)
+        for i in range(9):
+            supervisor.add_device(EchoDevice, {"device_id": "echo_{}".format(i)})
+        supervisor.add_device(RecorderDevice, {"device_id": "recorder"})
+        supervisor.device_thread_manager.start_all()
+        return supervisor
+
+    def run_batch(self, engine, batch_workers):
+        """Dispatch one batch of ttie events, check the order the recorder got the resulting events and the log"""
+        supervisor = self.build_supervisor(engine, batch_workers)
+        try:
+            order = ["echo_{}".format(i) for i in [3, 0, 7, 1, 6, 2, 5, 4]]
+            for device_id in order:
+                supervisor.ttie_event_manager.add(LpdmTtieEvent(device_id, 100))
+            supervisor.ttie_event_manager.add(LpdmTtieEvent("echo_8", 200))
+            messages = capture(supervisor.dispatch_next_ttie)
+            # the whole batch has been dispatched
+            self.assertEqual(supervisor.ttie_event_manager.peek().value, 200)
+            self.assertEqual(supervisor.device_thread_manager.get("recorder").device.sources, order)
+            expected = []
+            for device_id in order:
+                expected.extend(["{} woke up".format(device_id), "{} sent its power".format(device_id)])
+            self.assertEqual([m for m in messages if m.startswith("echo_")], expected)
+        finally:
+            supervisor.stop_simulation()
+
+    def test_batch(self):
+        """Test a batch delivered one device at a time"""
+        self.run_batch("inline", 1)
+
+    def test_parallel_batch(self):
+        """Test the events and log records from a batch delivered in parallel are in the order of the batch"""
+        self.run_batch("inline", 4)
+        self.run_batch("threaded", 4)
+
+    def test_parallel_scenario_log(self):
+        """Test a scenario gives the same log with a single batch worker and with a pool of batch workers"""
+        config = generate_scenario(20, n_power_sources=2, batteries=True, seed=1, run_time_days=1)
+        for engine in ["inline", "threaded"]:
+            supervisor, expected = capture_run(dict(config, engine=engine, batch_ttie=True, batch_workers=1))
+            self.assertIsNone(supervisor.error)
+            supervisor, messages = capture_run(dict(config, engine=engine, batch_ttie=True, batch_workers=4))
+            self.assertIsNone(supervisor.error)
+            self.assertTrue(len(expected) > 1000)
+            self.assertEqual(messages, expected)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import shutil
+import logging
+import tempfile
+import unittest
+from supervisor.branch_runner import BranchRunner
+from tests.supervisor.helpers import capture, build_config, run_supervisor
+
+class TestBranchRunner(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.logger = logging.getLogger("lpdm")
+        self.logger.setLevel(logging.DEBUG)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def build_config(self):
+        """Grid controller with a battery, diesel generator, pv and an eud"""
+        return build_config(run_time_days=3, storage=True, checkpoint_path=os.path.join(self.path, "checkpoints"))
+
+    def run_uninterrupted(self):
+        """Run the whole simulation with a checkpoint at the branch time, return the log messages"""
+        config = self.build_config()
+        config["checkpoint_interval"] = 86400
+        return capture(run_supervisor, config)
+
+    def run_variants(self, variants):
+        """Run the variants from day 2, return the log messages of each variant"""
+        fh = logging.FileHandler(os.path.join(self.path, "app.log"), mode="w")
+        self.logger.addHandler(fh)
+        try:
+            results = BranchRunner(self.build_config(), 86400, variants, processes=2).run()
+        finally:
+            self.logger.removeHandler(fh)
+            fh.close()
+        self.assertEqual(results, [(name, True) for name in sorted(variants.keys())])
+        messages = {}
+        for name in variants.keys():
+            with open(os.path.join(self.path, "app_{}.log".format(name))) as f:
+                messages[name] = f.read().splitlines()
+        return messages
+
+    def test_variants(self):
+        """Test the variants continue from the branch time with their changes"""
+        uninterrupted = self.run_uninterrupted()
+        saved = [i for i, m in enumerate(uninterrupted) if "saved checkpoint" in m][0]
+        setup = [m for m in uninterrupted[:4] if "added device class" in m]
+
+        messages = self.run_variants({
+            "base": {},
+            "late_eud": {"eud_1": {"schedule": [[6, "on"], [20, "off"]]}},
+            "battery": {"gc_1": {"battery": {"discharge_price_threshold": 0.5}}}
+        })
+
+        for name in messages.keys():
+            self.assertFalse(len([m for m in messages[name] if "Traceback" in m]))
+
+        # without any changes the variant is the same as the uninterrupted simulation
+        expected = setup + [m for m in uninterrupted[saved + 1:] if not "saved checkpoint" in m]
+        self.assertEqual(messages["base"], expected)
+
+        eud_on = [m.split("; ")[0] for m in messages["late_eud"] if "eud_1; on/off; 1; turn on device" in m]
+        self.assertEqual(eud_on, ["Day #2 06:00:00", "Day #3 06:00:00"])
+
+        updated = [m for m in messages["battery"] if "bt_1; ; ; updated the device configuration" in m]
+        self.assertEqual(len(updated), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import shutil
+import tempfile
+import unittest
+from supervisor.supervisor import Supervisor
+from supervisor import checkpoint
+from tests.supervisor.helpers import capture, build_config, run_supervisor
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def build_config(self, engine):
+        """Grid controller with a battery, diesel generator, pv and an eud"""
+        return build_config(
+            run_time_days=3, engine=engine, storage=True, checkpoint_interval=86400, checkpoint_path=self.path
+        )
+
+    def resume(self, file_name):
+        supervisor = Supervisor()
+        supervisor.resume_from_checkpoint(file_name)
+        supervisor.run_simulation()
+
+    def check_resume(self, engine):
+        """Test resuming from each checkpoint gives the same log messages as the uninterrupted run"""
+        messages = capture(run_supervisor, self.build_config(engine))
+        self.assertEqual(sorted(os.listdir(self.path)), ["checkpoint_172800.pkl", "checkpoint_86400.pkl"])
+        # messages logged while the devices are added to the supervisor
+        setup = [m for m in messages[:4] if "added device class" in m]
+        self.assertEqual(len(setup), 4)
+        for file_name in ["checkpoint_86400.pkl", "checkpoint_172800.pkl"]:
+            file_name = os.path.join(self.path, file_name)
+            saved = messages.index(
+                [m for m in messages if m.endswith("saved checkpoint {}".format(file_name))][0]
+            )
+            resumed = capture(self.resume, file_name)
+            self.assertTrue(len(resumed) > 100)
+            self.assertEqual(resumed, setup + messages[saved + 1:])
+
+    def test_resume_inline(self):
+        self.check_resume("inline")
+
+    def test_resume_threaded(self):
+        self.check_resume("threaded")
+
+    def test_version(self):
+        """Test a checkpoint with a different version can't be loaded"""
+        file_name = os.path.join(self.path, "checkpoint_0.pkl")
+        version = checkpoint.CHECKPOINT_VERSION
+        try:
+            checkpoint.CHECKPOINT_VERSION = version + 1
+            checkpoint.save_checkpoint(file_name, self.build_config("inline"), 0, {})
+        finally:
+            checkpoint.CHECKPOINT_VERSION = version
+        with self.assertRaises(Exception):
+            Supervisor().resume_from_checkpoint(file_name)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import sys
+import shutil
+import logging
+import tempfile
+import unittest
+from device.base.device import Device
+from supervisor.conservative_runner import ConservativeRunner
+from tests.supervisor.helpers import capture, device_messages, empty_config, add_grid_controller, run_supervisor
+
+class Ping(Device):
+    """Send a power event to a device attached to another grid controller every interval seconds"""
+    def __init__(self, config):
+        Device.__init__(self, config)
+        self._peer_id = config["peer_id"]
+        self._interval = config["interval"]
+
+    def init(self):
+        self.broadcast_new_ttie(self._interval)
+
+    def on_time_change(self, new_time):
+        self._time = new_time
+        self.broadcast_new_power(new_time, target_device_id=self._peer_id)
+        self.broadcast_new_ttie(new_time + self._interval)
+
+    def on_power_change(self, source_device_id, target_device_id, time, new_power):
+        self._time = time
+        self._logger.info(self.build_message("received power {} from {}".format(new_power, source_device_id)))
+
+    def on_price_change(self, source_device_id, target_device_id, time, new_price):
+        pass
+
+# make the ping device loadable from a scenario as device_type "ping"
+sys.modules["device.simulated.ping"] = sys.modules[__name__]
+
+class TestConservativeRunner(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.logger = logging.getLogger("lpdm")
+        self.logger.setLevel(logging.DEBUG)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def build_config(self):
+        """Three grid controllers, each with a pv, an eud and a ping device sending to the next partition"""
+        config = empty_config(lookahead=60)
+        for i in range(1, 4):
+            add_grid_controller(config, i, 2 + i)
+            config["devices"]["euds"].append(
+                {
+                    "device_id": "ping_{}".format(i),
+                    "device_type": "ping",
+                    "grid_controller_id": "gc_{}".format(i),
+                    "peer_id": "ping_{}".format(i % 3 + 1),
+                    "interval": 1800 * i
+                }
+            )
+        return config
+
+    def run_sequential(self):
+        """Run all of the partitions in a single supervisor, return the log messages"""
+        return capture(run_supervisor, self.build_config())
+
+    def run_parallel(self, workers):
+        """Run the partitions with the conservative runner, return the log messages of each partition"""
+        fh = logging.FileHandler(os.path.join(self.path, "app.log"), mode="w")
+        self.logger.addHandler(fh)
+        try:
+            results = ConservativeRunner(self.build_config(), workers=workers).run()
+        finally:
+            self.logger.removeHandler(fh)
+            fh.close()
+        self.assertEqual(results, [("gc_1", True), ("gc_2", True), ("gc_3", True)])
+        messages = {}
+        for gc_id, ok in results:
+            with open(os.path.join(self.path, "app_{}.log".format(gc_id))) as f:
+                messages[gc_id] = f.read().splitlines()
+        return messages
+
+    def test_cross_partition_delay(self):
+        """Test events between partitions are delivered lookahead seconds after they're sent"""
+        messages = self.run_sequential()
+        received = [m for m in messages if "received power" in m and m.split("; ")[2] == "ping_2"]
+        self.assertEqual(received[0].split("; ")[1], "1860")
+        self.assertTrue("received power 1800 from ping_1" in received[0])
+
+    def test_matches_sequential(self):
+        """Test the parallel runs give the same device results as a sequential run"""
+        sequential = self.run_sequential()
+        for workers in [1, 2, 3]:
+            parallel = self.run_parallel(workers)
+            for i in range(1, 4):
+                device_ids = ["gc_{}".format(i), "pv_{}".format(i), "eud_{}".format(i), "ping_{}".format(i)]
+                expected = device_messages(sequential, device_ids)
+                self.assertTrue(len(expected) > 100)
+                self.assertEqual(device_messages(parallel["gc_{}".format(i)], device_ids), expected)
+
+    def test_lookahead_required(self):
+        """Test the runner needs a lookahead"""
+        config = self.build_config()
+        del config["lookahead"]
+        with self.assertRaises(Exception):
+            ConservativeRunner(config)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,23 @@
+import unittest
+from supervisor.supervisor import Supervisor
+from tests.supervisor.helpers import capture, build_config, run_supervisor
+
+class TestEngine(unittest.TestCase):
+    def run_simulation(self, engine):
+        """Run the simulation and return the log messages"""
+        return capture(run_supervisor, build_config(engine=engine))
+
+    def test_inline_matches_threaded(self):
+        """Test the inline engine produces the same log output as the threaded engine"""
+        threaded = self.run_simulation("threaded")
+        inline = self.run_simulation("inline")
+        self.assertTrue(len(threaded) > 100)
+        self.assertEqual(threaded, inline)
+
+    def test_unknown_engine(self):
+        """Test an unknown engine raises an exception"""
+        with self.assertRaises(Exception):
+            Supervisor().load_config(build_config(engine="multiprocess"))
+
+if __name__ == "__main__":
+    unittest.main()
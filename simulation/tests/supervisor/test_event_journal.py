@@ -0,0 +1,92 @@
+import os
+import shutil
+import tempfile
+import unittest
+from supervisor.event_journal import EventJournal, read_journal
+from lpdm_event import LpdmPowerEvent, LpdmPriceEvent, LpdmTtieEvent, LpdmCapacityEvent, event_type
+from summary_functions.replay_journal import replay
+from summary_functions.device_energy import DeviceEnergy
+from tests.supervisor.helpers import capture_run, build_config
+
+class TestEventJournal(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.file_name = os.path.join(self.path, "events.journal")
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def write_events(self, events):
+        journal = EventJournal(self.file_name)
+        for e in events:
+            journal.write(e)
+        journal.close()
+
+    def test_values(self):
+        """Test the events read from a journal are the same as the events written"""
+        events = [
+            LpdmTtieEvent("eud_1", 3600),
+            LpdmPowerEvent("eud_1", "gc_1", 3600, 100.5),
+            LpdmPriceEvent(u"gc_1", u"eud_1", 3600.5, -2),
+            LpdmCapacityEvent("gc_1", "eud_1", 7200, "on"),
+            LpdmCapacityEvent("gc_1", "eud_1", 7200, True),
+            LpdmCapacityEvent("gc_1", "eud_1", 7200, None),
+            LpdmCapacityEvent("gc_1", "eud_1", 7200, [1, 2.0, {"a": "b"}]),
+            LpdmCapacityEvent("gc_1", "eud_1", 7200, 2 ** 70)
+        ]
+        self.write_events(events)
+        self.assertEqual(
+            list(read_journal(self.file_name)),
+            [(e.source_device_id, e.target_device_id, e.type_code, e.time, e.value) for e in events]
+        )
+
+    def test_interned_strings(self):
+        """Test device ids are only written once and a journal can be read in small chunks"""
+        events = [LpdmPowerEvent("eud_{}".format(i % 3), "gc_1", i, float(i)) for i in range(1000)]
+        self.write_events(events)
+        with open(self.file_name, "rb") as f:
+            data = f.read()
+        self.assertEqual(data.count("gc_1"), 1)
+        self.assertEqual(data.count("eud_2"), 1)
+        records = list(read_journal(self.file_name, chunk_size=7))
+        self.assertEqual(records, [(e.source_device_id, "gc_1", event_type.POWER_CHANGE, e.time, e.value) for e in events])
+
+    def test_incomplete_record(self):
+        """Test a record cut off at the end of the journal is ignored"""
+        self.write_events([LpdmPowerEvent("eud_1", "gc_1", i, float(i)) for i in range(10)])
+        with open(self.file_name, "rb+") as f:
+            f.seek(-3, os.SEEK_END)
+            f.truncate()
+        self.assertEqual(len(list(read_journal(self.file_name))), 9)
+
+    def test_not_a_journal(self):
+        with open(self.file_name, "wb") as f:
+            f.write("not a journal")
+        with self.assertRaises(Exception):
+            list(read_journal(self.file_name))
+
+    def test_simulation_journal(self):
+        """Test the journal of a simulation has the power events broadcast by the devices"""
+        supervisor, messages = capture_run(build_config(event_journal=self.file_name))
+        self.assertIsNone(supervisor.error)
+
+        # (time, device_id, power) of the power broadcasts logged by the eud
+        logged = [m.split("; ") for m in messages if m.count("; ") >= 5 and m.split("; ")[3] == "broadcast_power"]
+        logged = [(float(m[1]), m[2], float(m[4])) for m in logged if m[2] == "eud_1"]
+        journal = [
+            (time, source, value) for source, target, type_code, time, value in read_journal(self.file_name)
+            if type_code == event_type.POWER_CHANGE and source == "eud_1"
+        ]
+        self.assertTrue(len(logged) > 0)
+        self.assertEqual(journal, logged)
+
+        # energy used by the eud from its logged power changes
+        energy = DeviceEnergy()
+        self.assertTrue(replay(self.file_name, [energy]) > len(journal))
+        times = [t for t, device_id, power in logged[1:]] + [energy.last_time]
+        expected = sum([power * (t - start) for (start, device_id, power), t in zip(logged, times)]) / 3600.0 / 1000.0
+        self.assertTrue(expected > 0)
+        self.assertAlmostEqual(energy.energy_kwh[("eud_1", "gc_1")], expected)
+
+if __name__ == "__main__":
+    unittest.main()
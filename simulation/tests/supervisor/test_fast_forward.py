@@ -0,0 +1,90 @@
+import logging
+import unittest
+from lpdm_event import LpdmTtieEvent
+from scenario_generator import generate_scenario
+from supervisor.supervisor import Supervisor
+
+class RecorderDevice(object):
+    """Minimal device that keeps the ttie events it receives"""
+    wake_ups = []
+
+    def __init__(self, config):
+        self.device_id = config["device_id"]
+        self.tties = []
+
+    def init(self):
+        pass
+
+    def set_initialized(self, initialized=True):
+        pass
+
+    def process_supervisor_event(self, the_event):
+        self.tties.append(the_event.value)
+        RecorderDevice.wake_ups.append(self.device_id)
+
+class TestFastForward(unittest.TestCase):
+    def setUp(self):
+        logger = logging.getLogger("lpdm")
+        logger.addHandler(logging.NullHandler())
+        logger.setLevel(logging.CRITICAL)
+
+    def test_skipped_wake_ups(self):
+        """
+        Test the device is only woken up for the last of its tties, in the place it would be if it was woken up
+        for the skipped ones
+        """
+        RecorderDevice.wake_ups = []
+        supervisor = Supervisor()
+        supervisor.set_engine("inline")
+        supervisor.max_ttie = 1000
+        for device_id in ["quiet", "busy"]:
+            supervisor.add_device(RecorderDevice, {"device_id": device_id})
+        supervisor.device_thread_manager.start_all()
+        supervisor.ttie_event_manager.add(LpdmTtieEvent("quiet", 300, skipped=[100, 200]))
+        supervisor.ttie_event_manager.add(LpdmTtieEvent("busy", 300))
+        while supervisor.dispatch_next():
+            pass
+        self.assertEqual(supervisor.device_thread_manager.get("quiet").device.tties, [300])
+        self.assertEqual(supervisor.device_thread_manager.get("busy").device.tties, [300])
+        # the quiet device would have sent its ttie for 300 at 200, after the busy device's
+        self.assertEqual(RecorderDevice.wake_ups, ["busy", "quiet"])
+        stats = supervisor.ttie_event_manager.stats()
+        self.assertEqual((stats["added"], stats["returned"], stats["skipped"]), (2, 2, 2))
+
+    def run_scenario(self, config, fast_forward):
+        """Run a scenario, returns the state of the devices and the ttie stats"""
+        supervisor = Supervisor()
+        supervisor.load_config(dict(config, engine="inline", fast_forward=fast_forward))
+        supervisor.run_simulation()
+        self.assertIsNone(supervisor.error)
+        states = {}
+        for t in supervisor.device_thread_manager.threads:
+            states[t.device_id] = dict(
+                (key, value) for key, value in t.device.__dict__.items()
+                if isinstance(value, (int, float, str)) and not key in ["_ttie", "_time", "_fast_forward", "_next_skipped"]
+            )
+        return states, supervisor.ttie_event_manager.stats()
+
+    def test_same_results(self):
+        """Test the hvacs and acs end up in the same state when their quiescent wake ups are skipped"""
+        config = generate_scenario(
+            9, n_power_sources=2, batteries=True, seed=1, run_time_days=2,
+            eud_types=["hvac", "fixed_consumption", "air_conditioner_simple"]
+        )
+        states, stats = self.run_scenario(config, False)
+        ff_states, ff_stats = self.run_scenario(config, True)
+        self.assertEqual(states, ff_states)
+        self.assertEqual(stats["skipped"], 0)
+        self.assertTrue(ff_stats["skipped"] > 0)
+        # the skipped wake ups aren't returned
+        self.assertTrue(ff_stats["returned"] < stats["returned"] * 0.7)
+
+    def test_not_with_batch_ttie(self):
+        """Test fast forward can't be used with batches of tties"""
+        config = generate_scenario(2, seed=1, eud_types=["hvac"])
+        supervisor = Supervisor()
+        with self.assertRaises(Exception):
+            supervisor.load_config(dict(config, engine="inline", fast_forward=True, batch_ttie=True))
+
+if __name__ == "__main__":
+    unittest.main()
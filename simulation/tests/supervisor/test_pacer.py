@@ -0,0 +1,84 @@
+import unittest
+from supervisor.pacer import Pacer
+from tests.supervisor.helpers import capture_run, build_config
+
+class FakeClock(object):
+    """A wall clock that only moves when sleeping or when advanced by the test"""
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+class TestPacer(unittest.TestCase):
+    def build_pacer(self, late_policy="catch_up"):
+        self.clock = FakeClock()
+        pacer = Pacer(acceleration=10, jitter_budget=0.5, late_policy=late_policy, clock=self.clock.time, sleep=self.clock.sleep)
+        pacer.start(0)
+        return pacer
+
+    def test_on_schedule(self):
+        """Test the pacer waits for the scheduled wall clock time of each event"""
+        pacer = self.build_pacer()
+        for t in [10, 20, 20, 50]:
+            self.assertEqual(pacer.wait(t), 0)
+        self.assertEqual(self.clock.slept, [1.0, 1.0, 3.0])
+        self.assertEqual(pacer.stats()["behind"], 0)
+
+    def test_catch_up(self):
+        """Test the events after a late event are dispatched without waiting until back on schedule"""
+        pacer = self.build_pacer()
+        pacer.wait(10)
+        # the event at 10 takes 3 seconds
+        self.clock.now += 3.0
+        self.assertEqual(pacer.wait(20), 2.0)
+        self.assertEqual(pacer.wait(30), 1.0)
+        self.assertEqual(pacer.wait(50), 0)
+        self.assertEqual(self.clock.slept, [1.0, 1.0])
+        stats = pacer.stats()
+        self.assertEqual((stats["events"], stats["behind"], stats["max"], stats["shed_seconds"]), (4, 2, 2.0, 0.0))
+
+    def test_shed(self):
+        """Test a late event moves the schedule back so the following events keep the same pace"""
+        pacer = self.build_pacer(late_policy="shed")
+        pacer.wait(10)
+        self.clock.now += 3.0
+        self.assertEqual(pacer.wait(20), 2.0)
+        self.assertEqual(pacer.wait(30), 0)
+        self.assertEqual(self.clock.slept, [1.0, 1.0])
+        # a late event within the jitter budget doesn't move the schedule
+        self.clock.now += 1.4
+        self.assertAlmostEqual(pacer.wait(40), 0.4)
+        self.assertEqual(pacer.stats()["shed_seconds"], 2.0)
+
+    def test_invalid_config(self):
+        with self.assertRaises(Exception):
+            Pacer(acceleration=0)
+        with self.assertRaises(Exception):
+            Pacer(late_policy="skip")
+
+    def test_paced_simulation(self):
+        """Test a paced simulation gives the same device results and logs the lateness of each event"""
+        def run(real_time):
+            config = build_config(run_time_days=1)
+            if real_time:
+                config["real_time"] = real_time
+            return capture_run(config)
+
+        def device_messages(messages):
+            return [m for m in messages if m.count("; ") >= 5 and m.split("; ")[2] != "supervisor"]
+
+        supervisor, messages = run({"acceleration": 86400 * 20, "jitter_budget": 1.0})
+        expected_supervisor, expected = run(None)
+        self.assertEqual(device_messages(messages), device_messages(expected))
+        lateness = [m for m in messages if m.count("; ") >= 5 and m.split("; ")[3] == "lateness"]
+        self.assertTrue(len(lateness) > 0)
+        self.assertEqual(supervisor.pacer.stats()["events"], len(lateness))
+
+if __name__ == "__main__":
+    unittest.main()
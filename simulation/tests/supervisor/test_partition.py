@@ -0,0 +1,69 @@
+import os
+import shutil
+import logging
+import tempfile
+import unittest
+from supervisor.partition import partition_config, run_partition, PartitionRunner
+from tests.supervisor.helpers import capture, device_messages, empty_config, add_grid_controller, run_supervisor
+
+class TestPartition(unittest.TestCase):
+    def build_config(self):
+        """Two grid controllers, each with a pv and an eud"""
+        config = empty_config()
+        for i, on_hour in [(1, 3), (2, 6)]:
+            add_grid_controller(config, i, on_hour)
+        return config
+
+    def test_partition_config(self):
+        """Test the scenario is split by grid_controller_id"""
+        partitions = partition_config(self.build_config())
+        self.assertEqual(len(partitions), 2)
+        for i, p in enumerate(partitions, 1):
+            self.assertEqual(p["run_time_days"], 2)
+            self.assertEqual([d["device_id"] for d in p["devices"]["grid_controllers"]], ["gc_{}".format(i)])
+            self.assertEqual([d["device_id"] for d in p["devices"]["power_sources"]], ["pv_{}".format(i)])
+            self.assertEqual([d["device_id"] for d in p["devices"]["euds"]], ["eud_{}".format(i)])
+
+    def test_unknown_grid_controller(self):
+        """Test a device attached to a grid controller that doesn't exist raises an exception"""
+        config = self.build_config()
+        config["devices"]["euds"][0]["grid_controller_id"] = "gc_3"
+        with self.assertRaises(Exception):
+            partition_config(config)
+
+    def test_missing_grid_controller_id(self):
+        """Test the grid_controller_id is required when there are multiple grid controllers"""
+        config = self.build_config()
+        del config["devices"]["euds"][0]["grid_controller_id"]
+        with self.assertRaises(Exception):
+            partition_config(config)
+
+    def test_multiple_grid_controllers(self):
+        """Test a single supervisor running both grid controllers gives the same results as the separate partitions"""
+        combined = capture(run_supervisor, self.build_config())
+        for i, partition in enumerate(partition_config(self.build_config()), 1):
+            device_ids = ["gc_{}".format(i), "pv_{}".format(i), "eud_{}".format(i)]
+            separate = capture(run_partition, partition)
+            self.assertTrue(len(device_messages(separate, device_ids)) > 100)
+            self.assertEqual(device_messages(combined, device_ids), device_messages(separate, device_ids))
+
+    def test_partition_runner(self):
+        """Test each partition runs in its own process and writes its own log file"""
+        path = tempfile.mkdtemp()
+        logger = logging.getLogger("lpdm")
+        fh = logging.FileHandler(os.path.join(path, "app.log"), mode="w")
+        logger.addHandler(fh)
+        logger.setLevel(logging.DEBUG)
+        try:
+            results = PartitionRunner(self.build_config(), processes=2).run()
+            self.assertEqual(results, [("gc_1", True), ("gc_2", True)])
+            for gc_id in ["gc_1", "gc_2"]:
+                with open(os.path.join(path, "app_{}.log".format(gc_id))) as f:
+                    self.assertTrue(len(f.readlines()) > 100)
+        finally:
+            logger.removeHandler(fh)
+            fh.close()
+            shutil.rmtree(path)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import os
+import json
+import shutil
+import logging
+import tempfile
+import unittest
+from supervisor.profiler import Profiler, ProfiledQueue, duration_stats
+from supervisor.event_queue import EventQueue
+from supervisor.supervisor import Supervisor
+from device.simulated.grid_controller import GridController
+from device.simulated.grid_controller.power_source_manager import PowerSourceManager
+from lpdm_event import LpdmPowerEvent
+
+class FakeClock(object):
+    """A clock that only moves when advanced by the test"""
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+class Base(object):
+    def inherited(self, x):
+        return x + 1
+
+class Child(Base):
+    def own(self, x):
+        """Double x"""
+        return x * 2
+
+class TestProfiler(unittest.TestCase):
+    def test_duration_stats(self):
+        stats = duration_stats([float(i) for i in range(100, 0, -1)])
+        self.assertEqual((stats["count"], stats["seconds"], stats["p50"], stats["p99"], stats["max"]), (100, 5050.0, 51.0, 99.0, 100.0))
+        self.assertEqual(duration_stats([])["count"], 0)
+
+    def test_wrap_methods(self):
+        """Test the instrumented methods are timed while the profiler runs and restored when it stops"""
+        clock = FakeClock()
+        own = Child.__dict__["own"]
+        profiler = Profiler(clock=clock.time)
+        profiler.instrument(Child, "own")
+        profiler.instrument(Child, "inherited")
+        profiler.start()
+        c = Child()
+        self.assertEqual(c.own(2), 4)
+        self.assertEqual(c.inherited(2), 3)
+        self.assertEqual(Child.own.__doc__, "Double x")
+        profiler.stop()
+        self.assertIs(Child.__dict__["own"], own)
+        self.assertFalse("inherited" in Child.__dict__)
+        self.assertEqual(c.own(2), 4)
+        methods = profiler.report()["methods"]
+        self.assertEqual(methods["Child.own"]["count"], 1)
+        self.assertEqual(methods["Child.inherited"]["count"], 1)
+
+    def test_queue_wait(self):
+        clock = FakeClock()
+        profiler = Profiler(clock=clock.time)
+        queue = ProfiledQueue(EventQueue(), profiler)
+        queue.put("a")
+        clock.now += 2.0
+        queue.put("b")
+        clock.now += 1.0
+        self.assertEqual((queue.qsize(), queue.get(), queue.get(), queue.empty()), (2, "a", "b", True))
+        self.assertEqual(list(profiler.queue_wait), [3.0, 1.0])
+
+    def test_report(self):
+        """Test the handler times are reported by device, by event type and by device and event type"""
+        profiler = Profiler()
+        profiler.record_event("eud_1", LpdmPowerEvent("gc_1", "eud_1", 0, 1.0), 1.0)
+        profiler.record_event("eud_1", LpdmPowerEvent("gc_1", "eud_1", 0, 1.0), 3.0)
+        profiler.record_event("eud_2", LpdmPowerEvent("gc_1", "eud_2", 0, 1.0), 2.0)
+        report = profiler.report()
+        self.assertEqual(report["events"], 3)
+        self.assertEqual(report["handler_seconds"], 6.0)
+        self.assertEqual(report["devices"]["eud_1"]["seconds"], 4.0)
+        self.assertEqual(report["devices"]["eud_1"]["event_types"]["LpdmPowerEvent"]["count"], 2)
+        self.assertEqual(report["event_types"]["LpdmPowerEvent"]["count"], 3)
+
+    def test_profiled_simulation(self):
+        """Test a profiled simulation writes the report and gives the same device results"""
+        path = tempfile.mkdtemp()
+        logger = logging.getLogger("lpdm")
+        logger.addHandler(logging.NullHandler())
+        logger.setLevel(logging.CRITICAL)
+        try:
+            def run(engine, profile):
+                config = {
+                    "run_time_days": 1,
+                    "engine": engine,
+                    "profile": profile,
+                    "devices": {
+                        "grid_controllers": [{"device_id": "gc_1", "device_type": "grid_controller"}],
+                        "power_sources": [{"device_id": "pv_1", "grid_controller_id": "gc_1", "device_type": "pv"}],
+                        "euds": [
+                            {
+                                "device_id": "eud_1",
+                                "device_type": "eud",
+                                "grid_controller_id": "gc_1",
+                                "max_power_output": 100.0,
+                                "schedule": [[3, "on"], [23, "off"]]
+                            }
+                        ]
+                    }
+                }
+                supervisor = Supervisor()
+                supervisor.load_config(config)
+                supervisor.run_simulation()
+                self.assertIsNone(supervisor.error)
+                return supervisor
+
+            on_power_change = GridController.__dict__["on_power_change"]
+            optimize_load = PowerSourceManager.__dict__["optimize_load"]
+            for engine in ["inline", "threaded"]:
+                file_name = os.path.join(path, engine, "profile.json")
+                supervisor = run(engine, file_name)
+                expected = run(engine, None)
+                self.assertIsNone(expected.profiler)
+                self.assertEqual(
+                    supervisor.device_thread_manager.get("eud_1").device._sum_kwh,
+                    expected.device_thread_manager.get("eud_1").device._sum_kwh
+                )
+                with open(file_name) as f:
+                    report = json.load(f)
+                self.assertEqual(sorted(report["devices"].keys()), ["eud_1", "gc_1", "pv_1"])
+                self.assertTrue(report["devices"]["eud_1"]["event_types"]["LpdmTtieEvent"]["count"] > 0)
+                self.assertTrue(report["methods"]["GridController.on_power_change"]["count"] > 0)
+                self.assertTrue(report["methods"]["PowerSourceManager.optimize_load"]["count"] > 0)
+                self.assertTrue(report["supervisor"]["routing"]["count"] > 0)
+                self.assertEqual(report["supervisor"]["routing"]["count"], report["supervisor"]["queue_wait"]["count"])
+                # the methods aren't timed after the simulation
+                self.assertIs(GridController.__dict__["on_power_change"], on_power_change)
+                self.assertIs(PowerSourceManager.__dict__["optimize_load"], optimize_load)
+        finally:
+            shutil.rmtree(path)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import time
+import random
+from lpdm_event import LpdmPowerEvent, LpdmInitEvent
+from supervisor.supervisor import Supervisor
+
+class CountingDevice(object):
+    """Minimal device that counts the events it receives"""
+    def __init__(self, config):
+        self.count = 0
+
+    def init(self):
+        pass
+
+    def set_initialized(self, initialized=True):
+        pass
+
+    def process_supervisor_event(self, the_event):
+        self.count += 1
+
+class TestRouting(unittest.TestCase):
+    def build_supervisor(self, n_devices):
+        """Create a supervisor with n_devices running inline"""
+        supervisor = Supervisor()
+        supervisor.set_engine("inline")
+        for i in range(n_devices):
+            supervisor.add_device(CountingDevice, {"device_id": "device_{}".format(i)})
+        for t in supervisor.device_thread_manager.threads:
+            t.dispatch(LpdmInitEvent())
+        return supervisor
+
+    def time_routing(self, n_devices, n_events=20000):
+        """Return the time per event to route n_events power events to random devices"""
+        supervisor = self.build_supervisor(n_devices)
+        rand = random.Random(0)
+        for i in range(n_events):
+            target = "device_{}".format(rand.randint(0, n_devices - 1))
+            supervisor.queue.put(LpdmPowerEvent("gc_1", target, 0, 100.0))
+        start = time.time()
+        supervisor.process_supervisor_events()
+        elapsed = time.time() - start
+        total = sum(t.device.count for t in supervisor.device_thread_manager.threads)
+        self.assertEqual(total, n_events)
+        return elapsed / n_events
+
+    def test_route_to_target_device(self):
+        """Test events are routed to their target device"""
+        supervisor = self.build_supervisor(3)
+        supervisor.queue.put(LpdmPowerEvent("gc_1", "device_1", 0, 100.0))
+        supervisor.queue.put(LpdmPowerEvent("gc_1", "device_1", 0, 200.0))
+        supervisor.process_supervisor_events()
+        self.assertEqual([t.device.count for t in supervisor.device_thread_manager.threads], [0, 2, 0])
+
+    def test_routing_time_flat(self):
+        """Micro-benchmark: the routing time per event should not grow with the number of devices"""
+        t_small = min(self.time_routing(10) for i in range(3))
+        t_large = min(self.time_routing(10000) for i in range(3))
+        # a linear search would be ~1000x slower, allow for noise and cache effects
+        self.assertLess(t_large, 3 * t_small)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import logging
+import unittest
+from lpdm_event import LpdmFlushEvent, event_type
+from scenario_generator import generate_scenario
+from supervisor.supervisor import Supervisor
+from device.simulated.grid_controller import GridController
+from device.simulated.eud import Eud
+from device.simulated.hvac import Hvac
+
+class TestSkipRepeatedPrices(unittest.TestCase):
+    def setUp(self):
+        logger = logging.getLogger("lpdm")
+        logger.addHandler(logging.NullHandler())
+        logger.setLevel(logging.CRITICAL)
+
+    def test_repeated_price(self):
+        """Test the same price is only sent once to the devices that ignore it until the flush event is delivered"""
+        events = []
+        gc = GridController({"device_id": "gc_1", "skip_repeated_prices": True, "broadcast": events.append})
+        gc.add_device("eud_1", Eud, 1)
+        gc.add_device("eud_2", Eud, 2)
+        gc.add_device("hvac_1", Hvac, 3)
+        gc.send_price_change_to_devices()
+        gc.send_price_change_to_devices()
+        gc.set_price(0.3)
+        gc.send_price_change_to_devices()
+        self.assertEqual(
+            [(e.target_device_id, e.value) for e in events if e.type_code == event_type.PRICE_CHANGE], [
+                ("eud_1", 0.1), ("eud_2", 0.1), ("hvac_1", 0.1),
+                ("hvac_1", 0.1),
+                ("eud_1", 0.3), ("eud_2", 0.3), ("hvac_1", 0.3)
+            ]
+        )
+        flush_events = [e for e in events if e.type_code == event_type.FLUSH]
+        self.assertEqual([(e.source_device_id, e.target_device_id) for e in flush_events], [("gc_1", "gc_1")])
+        # once the flush event is delivered the price is sent to all of the devices again
+        del events[:]
+        gc.process_supervisor_event(flush_events[0])
+        gc.send_price_change_to_devices()
+        self.assertEqual([e.target_device_id for e in events], ["eud_1", "eud_2", "hvac_1", "gc_1"])
+
+    def run_scenario(self, config, skip_repeated_prices):
+        """Run a scenario, returns the state of the devices and the number of price events routed"""
+        supervisor = Supervisor()
+        supervisor.load_config(dict(config, engine="inline", skip_repeated_prices=skip_repeated_prices))
+        price_events = []
+        route_event = supervisor.event_handlers[event_type.PRICE_CHANGE]
+        def count_price_event(the_event):
+            price_events.append(the_event.target_device_id)
+            route_event(the_event)
+        supervisor.event_handlers[event_type.PRICE_CHANGE] = count_price_event
+        supervisor.run_simulation()
+        self.assertIsNone(supervisor.error)
+        states = {}
+        for t in supervisor.device_thread_manager.threads:
+            states[t.device_id] = dict(
+                (key, value) for key, value in t.device.__dict__.items()
+                if isinstance(value, (int, float, str)) and not key in ["_skip_repeated_prices", "_flush_queued"]
+            )
+            if isinstance(t.device, GridController):
+                states[t.device_id]["loads"] = [(p.device_id, p.load) for p in t.device.power_source_manager.get()]
+                states[t.device_id]["device_loads"] = [(d.device_id, d.load) for d in t.device.device_manager.devices()]
+        return states, len(price_events)
+
+    def test_same_results(self):
+        """Test the devices end up in the same state when the unchanged prices aren't sent again"""
+        config = generate_scenario(60, n_power_sources=2, batteries=True, seed=1, run_time_days=2)
+        # the euds that turn on at the same time change their power together
+        config["batch_ttie"] = True
+        states, n_price_events = self.run_scenario(config, False)
+        skipped_states, n_skipped_price_events = self.run_scenario(config, True)
+        self.assertEqual(states, skipped_states)
+        self.assertTrue(n_skipped_price_events < n_price_events)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+from lpdm_event import LpdmTtieEvent
+from supervisor.ttie_event_manager import TtieEventManager
+
+class TestTtieEventManager(unittest.TestCase):
+    def setUp(self):
+        self.manager = TtieEventManager()
+
+    def test_get_in_time_order(self):
+        """Test the events are returned in order of time"""
+        for device_id, value in [("eud_1", 300), ("eud_2", 100), ("eud_3", 200)]:
+            self.manager.add(LpdmTtieEvent(device_id, value))
+        self.assertEqual([self.manager.get().value for i in range(3)], [100, 200, 300])
+        self.assertIsNone(self.manager.get())
+
+    def test_ties_in_order_added(self):
+        """Test events with the same time are returned in the order they were added"""
+        for device_id in ["eud_3", "eud_1", "eud_2"]:
+            self.manager.add(LpdmTtieEvent(device_id, 100))
+        self.assertEqual(
+            [self.manager.get().target_device_id for i in range(3)], ["eud_3", "eud_1", "eud_2"]
+        )
+
+    def test_replace_pending_ttie(self):
+        """Test a new ttie from a device replaces its pending ttie"""
+        self.manager.add(LpdmTtieEvent("eud_1", 100))
+        self.manager.add(LpdmTtieEvent("eud_2", 150))
+        self.manager.add(LpdmTtieEvent("eud_1", 200))
+        self.assertEqual(self.manager.get().target_device_id, "eud_2")
+        the_event = self.manager.get()
+        self.assertEqual((the_event.target_device_id, the_event.value), ("eud_1", 200))
+        self.assertIsNone(self.manager.get())
+
+    def test_keep_ttie_that_is_due(self):
+        """Test a ttie at the current time is not replaced before it's dispatched"""
+        self.manager.add(LpdmTtieEvent("eud_1", 100))
+        self.manager.add(LpdmTtieEvent("eud_2", 100))
+        self.manager.get()
+        # eud_2 is woken up by another event at t=100 and schedules its next ttie
+        self.manager.add(LpdmTtieEvent("eud_2", 200))
+        self.assertEqual(self.manager.get().value, 100)
+        self.assertEqual(self.manager.get().value, 200)
+        self.assertIsNone(self.manager.get())
+
+    def test_cancel_and_reschedule(self):
+        """Test cancelling and rescheduling a device's ttie"""
+        self.manager.add(LpdmTtieEvent("eud_1", 100))
+        self.manager.add(LpdmTtieEvent("eud_2", 150))
+        self.assertEqual(self.manager.cancel("eud_1").value, 100)
+        self.assertIsNone(self.manager.cancel("eud_1"))
+        self.manager.reschedule("eud_2", 50)
+        self.assertEqual(self.manager.peek().value, 50)
+        self.assertEqual(self.manager.get().value, 50)
+        self.assertIsNone(self.manager.get())
+
+    def test_get_all_at(self):
+        """Test getting all of the ttie events with the same time"""
+        self.manager.add(LpdmTtieEvent("eud_1", 100))
+        self.manager.add(LpdmTtieEvent("eud_2", 200))
+        self.manager.add(LpdmTtieEvent("eud_3", 100))
+        self.manager.add(LpdmTtieEvent("eud_4", 100))
+        self.manager.add(LpdmTtieEvent("eud_3", 300))
+        self.assertEqual([e.target_device_id for e in self.manager.get_all_at(100)], ["eud_1", "eud_4"])
+        self.assertEqual(self.manager.get_all_at(100), [])
+        self.assertEqual(self.manager.get().value, 200)
+
+    def test_suppressed_wake_ups(self):
+        """Test replaced and repeated tties are counted, and a repeat is only dropped when it can't change the order"""
+        self.manager.add(LpdmTtieEvent("eud_1", 100))
+        # repeated right away: dropped
+        self.manager.add(LpdmTtieEvent("eud_1", 100))
+        self.manager.add(LpdmTtieEvent("eud_2", 100))
+        # repeated after eud_2's ttie: replaced, so eud_1 now comes after eud_2
+        self.manager.add(LpdmTtieEvent("eud_1", 100))
+        # superseded by a later ttie
+        self.manager.add(LpdmTtieEvent("eud_3", 50))
+        self.manager.add(LpdmTtieEvent("eud_3", 150))
+        self.assertEqual([self.manager.get().target_device_id for i in range(3)], ["eud_2", "eud_1", "eud_3"])
+        self.assertIsNone(self.manager.get())
+        self.assertEqual(
+            self.manager.stats(),
+            {"added": 6, "returned": 3, "skipped": 0, "superseded": 2, "duplicates": 1, "suppressed": 3}
+        )
+
+    def test_due_ttie_not_suppressed(self):
+        """Test a repeat of a ttie that is due isn't dropped, the device hasn't been woken up for it yet"""
+        self.manager.add(LpdmTtieEvent("eud_1", 100))
+        self.manager.add(LpdmTtieEvent("eud_2", 100))
+        self.manager.get()
+        self.manager.add(LpdmTtieEvent("eud_2", 100))
+        self.assertEqual([self.manager.get().target_device_id for i in range(2)], ["eud_2", "eud_2"])
+        self.assertEqual(self.manager.stats()["suppressed"], 0)
+
+    def test_skipped_wake_ups_keep_their_place(self):
+        """Test a ttie with skipped wake ups is returned where it would be if the device was woken up for them"""
+        self.manager.add(LpdmTtieEvent("eud_1", 100))
+        self.manager.add(LpdmTtieEvent("quiet", 300, skipped=[100, 200]))
+        self.manager.add(LpdmTtieEvent("eud_2", 100))
+        returned = []
+        for i in range(4):
+            # each device sends its next ttie when it's woken up
+            the_event = self.manager.get()
+            returned.append(the_event.target_device_id)
+            self.manager.add(LpdmTtieEvent(the_event.target_device_id, the_event.value + 100))
+        # woken up at 100 and 200, quiet between eud_1 and eud_2
+        returned.extend([self.manager.get().target_device_id for i in range(3)])
+        self.assertEqual(returned, ["eud_1", "eud_2", "eud_1", "eud_2", "eud_1", "quiet", "eud_2"])
+        self.assertEqual(self.manager.stats()["skipped"], 2)
+
+    def test_skipped_wake_up_passed(self):
+        """Test an event for a device at one of its skipped wake ups is only after the wake up once it has passed"""
+        self.manager.add(LpdmTtieEvent("eud_1", 100))
+        self.manager.add(LpdmTtieEvent("quiet", 300, skipped=[100, 200]))
+        self.manager.add(LpdmTtieEvent("eud_2", 100))
+        self.manager.get()
+        self.assertFalse(self.manager.skipped_wake_up_passed("quiet"))
+        self.manager.get()
+        self.assertTrue(self.manager.skipped_wake_up_passed("quiet"))
+        # the device has been woken up for it
+        self.assertFalse(self.manager.skipped_wake_up_passed("quiet"))
+        self.assertFalse(self.manager.skipped_wake_up_passed("eud_1"))
+
+if __name__ == "__main__":
+    unittest.main()